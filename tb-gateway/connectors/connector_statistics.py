@@ -0,0 +1,27 @@
+#     Copyright 2025. ThingsBoard
+#
+#     Licensed under the Apache License, Version 2.0 (the "License");
+#     you may not use this file except in compliance with the License.
+#     You may obtain a copy of the License at
+#
+#         http://www.apache.org/licenses/LICENSE-2.0
+#
+#     Unless required by applicable law or agreed to in writing, software
+#     distributed under the License is distributed on an "AS IS" BASIS,
+#     WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#     See the License for the specific language governing permissions and
+#     limitations under the License.
+
+from thingsboard_gateway.gateway.statistics.statistics_service import StatisticsService
+
+
+def count_connector_peak(connector_name, stat_parameter_name, value):
+    """
+    Reports a gauge (queue depth, lag) as its peak value since the last statistics send.
+    Connector statistics are counters reset on every send, so the counter is raised to the value instead of summed.
+    """
+    if not StatisticsService.ENABLED:
+        return
+    reported_value = StatisticsService.CONNECTOR_STATISTICS_STORAGE.get(connector_name, {}).get(stat_parameter_name, 0)
+    if value > reported_value:
+        StatisticsService.count_connector_message(connector_name, stat_parameter_name, count=value - reported_value)
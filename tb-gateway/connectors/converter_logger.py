@@ -0,0 +1,88 @@
+#     Copyright 2025. ThingsBoard
+#
+#     Licensed under the Apache License, Version 2.0 (the "License");
+#     you may not use this file except in compliance with the License.
+#     You may obtain a copy of the License at
+#
+#         http://www.apache.org/licenses/LICENSE-2.0
+#
+#     Unless required by applicable law or agreed to in writing, software
+#     distributed under the License is distributed on an "AS IS" BASIS,
+#     WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#     See the License for the specific language governing permissions and
+#     limitations under the License.
+
+from logging import DEBUG, INFO, WARNING, ERROR
+from time import monotonic
+
+
+class ConverterLogger:
+    """
+    Logging helper for per-message hot paths of converters.
+    Every message has a key (string or tuple, e.g. ("interfacesFound", device_name));
+    a key is emitted at most messages_per_period times per period_in_seconds,
+    suppressed messages are counted and reported with the next emitted one.
+    Calls of every key are counted as well, the counters are logged at debug level and reset once per period.
+    Arguments are formatted by the underlying logger only when a record is emitted.
+    """
+
+    def __init__(self, logger, period_in_seconds=60.0, messages_per_period=1):
+        self._log = logger
+        self.__period = period_in_seconds
+        self.__messages_per_period = messages_per_period
+        self.__windows = {}
+        self.__counters = {}
+        self.__counters_start_time = monotonic()
+
+    def debug(self, key, msg, *args):
+        self.log(DEBUG, key, msg, *args)
+
+    def info(self, key, msg, *args):
+        self.log(INFO, key, msg, *args)
+
+    def warning(self, key, msg, *args):
+        self.log(WARNING, key, msg, *args)
+
+    def error(self, key, msg, *args):
+        self.log(ERROR, key, msg, *args)
+
+    def log(self, level, key, msg, *args):
+        current_time = monotonic()
+        if current_time - self.__counters_start_time >= self.__period:
+            self.__flush_counters(current_time)
+        self.__counters[key] = self.__counters.get(key, 0) + 1
+        if not self._log.isEnabledFor(level):
+            return
+
+        window = self.__windows.get(key)
+        if window is None or current_time - window[0] >= self.__period:
+            suppressed = 0 if window is None else window[2]
+            window = [current_time, 0, 0]
+            self.__windows[key] = window
+        else:
+            suppressed = 0
+
+        if window[1] >= self.__messages_per_period:
+            window[2] += 1
+            return
+
+        window[1] += 1
+        if suppressed:
+            self._log.log(level, msg + " (%d similar messages suppressed)", *args, suppressed)
+        else:
+            self._log.log(level, msg, *args)
+
+    def get_counters(self):
+        return dict(self.__counters)
+
+    def reset_counters(self):
+        self.__counters = {}
+        self.__counters_start_time = monotonic()
+
+    def __flush_counters(self, current_time):
+        if self.__counters and self._log.isEnabledFor(DEBUG):
+            self._log.debug("Converter messages in the last %.0f seconds: %s",
+                            current_time - self.__counters_start_time,
+                            ", ".join("%s: %d" % (key, count) for key, count in self.__counters.items()))
+        self.__counters = {}
+        self.__counters_start_time = current_time
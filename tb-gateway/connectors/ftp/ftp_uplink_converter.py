@@ -17,9 +17,9 @@ import re
 from simplejson import dumps
 
 from thingsboard_gateway.connectors.ftp.ftp_converter import FTPConverter
+from thingsboard_gateway.connectors.report_strategy_cache import get_report_strategy, convert_key_to_datapoint_key
 from thingsboard_gateway.gateway.constants import REPORT_STRATEGY_PARAMETER
 from thingsboard_gateway.gateway.entities.converted_data import ConvertedData
-from thingsboard_gateway.gateway.entities.report_strategy_config import ReportStrategyConfig
 from thingsboard_gateway.gateway.entities.telemetry_entry import TelemetryEntry
 from thingsboard_gateway.gateway.statistics.decorators import CollectStatistics
 from thingsboard_gateway.gateway.statistics.statistics_service import StatisticsService
@@ -33,13 +33,7 @@ class FTPUplinkConverter(FTPConverter):
         self.__data_types = {"attributes": "attributes", "timeseries": "telemetry"}
 
     def _get_device_report_strategy(self, device_name):
-        device_report_strategy = None
-        try:
-            device_report_strategy = ReportStrategyConfig(self.__config.get(REPORT_STRATEGY_PARAMETER))
-        except ValueError as e:
-            self._log.trace("Report strategy config is not specified for device %s: %s", device_name, e)
-
-        return device_report_strategy
+        return get_report_strategy(self.__config.get(REPORT_STRATEGY_PARAMETER), self._log)
 
     def _get_required_data(self, left_symbol, right_symbol):
         device_name = None
@@ -89,7 +83,7 @@ class FTPUplinkConverter(FTPConverter):
                         value = arr[val_index] if isinstance(val_index, int) else val_index
                         if key == 'ts' and data_type == 'timeseries':
                             continue
-                        datapoint_key = TBUtility.convert_key_to_datapoint_key(key, device_report_strategy,
+                        datapoint_key = convert_key_to_datapoint_key(key, device_report_strategy,
                                                                                information, self._log)
 
                         if data_type == 'attributes':
@@ -155,7 +149,7 @@ class FTPUplinkConverter(FTPConverter):
                         if key == 'ts' and data_type == 'timeseries':
                             continue
 
-                        datapoint_key = TBUtility.convert_key_to_datapoint_key(key, device_report_strategy,
+                        datapoint_key = convert_key_to_datapoint_key(key, device_report_strategy,
                                                                                information, self._log)
                         if data_type == 'attributes':
                             converted_data.add_to_attributes(datapoint_key, val)
@@ -285,7 +279,7 @@ class FTPUplinkConverter(FTPConverter):
 
                             full_value = full_value.replace('${' + str(value_tag) + '}',
                                                             str(value)) if is_valid_value else str(value)
-                        datapoint_key = TBUtility.convert_key_to_datapoint_key(full_key, device_report_strategy,
+                        datapoint_key = convert_key_to_datapoint_key(full_key, device_report_strategy,
                                                                                datatype_config, self._log)
                         if datatype == 'timeseries':
                             ts = None
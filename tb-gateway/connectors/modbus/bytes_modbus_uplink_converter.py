@@ -21,17 +21,19 @@ from pymodbus.pdu import ExceptionResponse
 
 from thingsboard_gateway.connectors.modbus.entities.bytes_uplink_converter_config import BytesUplinkConverterConfig
 from thingsboard_gateway.connectors.modbus.modbus_converter import ModbusConverter
+from thingsboard_gateway.connectors.modbus.tag_decoder import compile_tag_decoder
+from thingsboard_gateway.connectors.report_strategy_cache import get_report_strategy, convert_key_to_datapoint_key
 from thingsboard_gateway.gateway.entities.converted_data import ConvertedData
-from thingsboard_gateway.gateway.entities.report_strategy_config import ReportStrategyConfig
 from thingsboard_gateway.gateway.statistics.decorators import CollectStatistics
 from thingsboard_gateway.gateway.statistics.statistics_service import StatisticsService
-from thingsboard_gateway.tb_utility.tb_utility import TBUtility
 
 
 class BytesModbusUplinkConverter(ModbusConverter):
     def __init__(self, config: BytesUplinkConverterConfig, logger):
         self._log = logger
         self.__config = config
+        # {(id(tag config), byte order, word order): (tag config, compiled decoder or None)}
+        self.__tag_decoders = {}
 
     @CollectStatistics(start_stat_type='receivedBytesFromDevices',
                        end_stat_type='convertedBytesFromDevice')
@@ -57,8 +59,8 @@ class BytesModbusUplinkConverter(ModbusConverter):
                                                         self.__config.word_order)
 
                         if decoded_data is not None:
-                            datapoint_key = TBUtility.convert_key_to_datapoint_key(config['tag'], device_report_strategy,
-                                                                                   config, self._log)
+                            datapoint_key = convert_key_to_datapoint_key(config['tag'], device_report_strategy,
+                                                                         config, self._log)
                             converted_data_append_methods[config_section]({datapoint_key: decoded_data})
 
             self._log.trace("Decoded data: %s", result)
@@ -70,6 +72,27 @@ class BytesModbusUplinkConverter(ModbusConverter):
             return result
 
     def decode_data(self, encoded_data, config, endian_order, word_endian_order):
+        if isinstance(encoded_data, (ModbusIOException, ExceptionResponse)):
+            self._log.exception("Error while decoding data: %s, with config: %s", encoded_data, config)
+            return None
+
+        tag_decoder = self.__get_tag_decoder(config, endian_order, word_endian_order)
+        if tag_decoder is not None:
+            return tag_decoder(encoded_data)
+
+        return self.__decode_with_payload_decoder(encoded_data, config, endian_order, word_endian_order)
+
+    def __get_tag_decoder(self, config, endian_order, word_endian_order):
+        key = (id(config), endian_order, word_endian_order)
+        cached = self.__tag_decoders.get(key)
+        if cached is not None and cached[0] is config:
+            return cached[1]
+
+        tag_decoder = compile_tag_decoder(config, endian_order, word_endian_order, self._log)
+        self.__tag_decoders[key] = (config, tag_decoder)
+        return tag_decoder
+
+    def __decode_with_payload_decoder(self, encoded_data, config, endian_order, word_endian_order):
         decoded_data = None
 
         if not isinstance(encoded_data, ModbusIOException) and not isinstance(encoded_data, ExceptionResponse):
@@ -98,19 +121,11 @@ class BytesModbusUplinkConverter(ModbusConverter):
 
     @staticmethod
     def from_coils(coils, endian_order=Endian.Little, word_endian_order=Endian.Big):
-        _is_wordorder = '_wordorder' in BinaryPayloadDecoder.fromCoils.__code__.co_varnames
-        if _is_wordorder:
-            try:
-                decoder = BinaryPayloadDecoder.fromCoils(coils, byteorder=endian_order,
-                                                         wordorder=word_endian_order)
-            except TypeError:
-                decoder = BinaryPayloadDecoder.fromCoils(coils, wordorder=word_endian_order)
-        else:
-            try:
-                decoder = BinaryPayloadDecoder.fromCoils(coils, byteorder=endian_order,
-                                                         wordorder=word_endian_order)
-            except TypeError:
-                decoder = BinaryPayloadDecoder.fromCoils(coils, wordorder=word_endian_order)
+        try:
+            decoder = BinaryPayloadDecoder.fromCoils(coils, byteorder=endian_order,
+                                                     wordorder=word_endian_order)
+        except TypeError:
+            decoder = BinaryPayloadDecoder.fromCoils(coils, wordorder=word_endian_order)
 
         return decoder
 
@@ -202,7 +217,4 @@ class BytesModbusUplinkConverter(ModbusConverter):
         return result_data
 
     def _get_device_report_strategy(self, report_strategy, device_name):
-        try:
-            return ReportStrategyConfig(report_strategy)
-        except ValueError as e:
-            self._log.trace("Report strategy config is not specified for device %s: %s", device_name, e)
+        return get_report_strategy(report_strategy, self._log)
@@ -44,6 +44,15 @@ WAIT_AFTER_FAILED_ATTEMPTS_MS_PARAMETER = "waitAfterFailedAttemptsMs"
 
 DELAY_BETWEEN_REQUESTS_MS_PARAMETER = "delayBetweenRequestsMs"
 
+COALESCE_READS_PARAMETER = "coalesceReads"
+MAX_READ_GAP_PARAMETER = "maxReadGap"
+MAX_REGISTERS_PER_READ_PARAMETER = "maxRegistersPerRead"
+MAX_BITS_PER_READ_PARAMETER = "maxBitsPerRead"
+
+POLL_JITTER_MS_PARAMETER = "pollJitterMs"
+MAX_CONCURRENT_POLLS_PARAMETER = "maxConcurrentPolls"
+MAX_CONCURRENT_POLLS_PER_MASTER_PARAMETER = "maxConcurrentPollsPerMaster"
+
 FUNCTION_CODE_PARAMETER = "functionCode"
 
 ADDRESS_PARAMETER = "address"
@@ -53,6 +53,8 @@ def with_lock_for_serial(func):
 class Master:
     def __init__(self, client_type, client):
         self.lock = Lock()
+        # Slaves of the master may be polled concurrently, only one of them should open the connection
+        self.__connect_lock = Lock()
         self.client_type = client_type.lower()
         self.__client = client
         self.__previous_request_time = 0
@@ -71,7 +73,9 @@ class Master:
 
     @with_lock_for_serial
     async def connect(self):
-        await self.__client.connect()
+        async with self.__connect_lock:
+            if not self.__client.connected:
+                await self.__client.connect()
 
     @with_lock_for_serial
     async def close(self):
@@ -13,7 +13,7 @@
 #     limitations under the License.
 
 import asyncio
-from asyncio import CancelledError, Queue as AsyncQueue, QueueEmpty
+from asyncio import CancelledError, Queue as AsyncQueue
 from queue import Queue, Empty
 from threading import Thread
 from random import choice
@@ -23,11 +23,14 @@ from time import monotonic, sleep
 from packaging import version
 
 from thingsboard_gateway.connectors.modbus.constants import ADDRESS_PARAMETER, TAG_PARAMETER, \
-    FUNCTION_CODE_PARAMETER
+    FUNCTION_CODE_PARAMETER, POLL_JITTER_MS_PARAMETER, MAX_CONCURRENT_POLLS_PARAMETER, \
+    MAX_CONCURRENT_POLLS_PER_MASTER_PARAMETER, SERIAL_CONNECTION_TYPE_PARAMETER
+from thingsboard_gateway.connectors.modbus.poll_scheduler import PollScheduler
 from thingsboard_gateway.gateway.entities.converted_data import ConvertedData
 from thingsboard_gateway.gateway.statistics.statistics_service import StatisticsService
 from thingsboard_gateway.tb_utility.tb_utility import TBUtility
 from thingsboard_gateway.connectors.connector import Connector
+from thingsboard_gateway.connectors.connector_statistics import count_connector_peak
 from thingsboard_gateway.gateway.constants import STATISTIC_MESSAGE_RECEIVED_PARAMETER, \
     STATISTIC_MESSAGE_SENT_PARAMETER, CONNECTOR_PARAMETER, DEVICE_SECTION_PARAMETER, DATA_PARAMETER, \
     RPC_METHOD_PARAMETER, RPC_PARAMS_PARAMETER, RPC_ID_PARAMETER
@@ -64,6 +67,7 @@ if installation_required:
 from thingsboard_gateway.connectors.modbus.entities.master import Master  # noqa: E402
 from thingsboard_gateway.connectors.modbus.server import Server  # noqa: E402
 from thingsboard_gateway.connectors.modbus.slave import Slave  # noqa: E402
+from thingsboard_gateway.connectors.modbus.read_planner import is_failed_response  # noqa: E402
 from thingsboard_gateway.connectors.modbus.entities.bytes_downlink_converter_config import \
     BytesDownlinkConverterConfig  # noqa: E402
 from thingsboard_gateway.connectors.modbus.backward_compatibility_adapter import BackwardCompatibilityAdapter  # noqa
@@ -108,7 +112,6 @@ class AsyncModbusConnector(Connector, Thread):
         except RuntimeError:
             self.loop = asyncio.get_event_loop()
 
-        self.process_device_requests = AsyncQueue(100000)
         self.__data_to_convert = Queue(-1)
         self.__data_to_save = Queue(-1)
 
@@ -116,8 +119,17 @@ class AsyncModbusConnector(Connector, Thread):
 
         self._master_connections = {}
 
+        master_config = self.__config.get('master', {'slaves': []})
+        self.__poll_scheduler = PollScheduler(self.get_name(), self.__log, self.__on_poll_due,
+                                              jitter_in_seconds=master_config.get(POLL_JITTER_MS_PARAMETER, 0) / 1000)
+        # Due slaves of every master are polled by the master own workers, so masters do not wait for each other
+        self.__poll_queues = {}
+        self.__max_concurrent_polls = max(master_config.get(MAX_CONCURRENT_POLLS_PARAMETER, 100), 1)
+        self.__max_concurrent_polls_per_master = max(master_config.get(MAX_CONCURRENT_POLLS_PER_MASTER_PARAMETER, 1), 1)
+        self.__active_polls = 0
+
         self.__slaves = []
-        self.__add_slaves(self.__config.get('master', {'slaves': []}).get('slaves', []))
+        self.__add_slaves(master_config.get('slaves', []))
 
     def close(self):
         self.__stopped = True
@@ -128,6 +140,8 @@ class AsyncModbusConnector(Connector, Thread):
         if self.__server:
             self.__server.stop()
 
+        self.loop.call_soon_threadsafe(self.__poll_scheduler.stop)
+
         for slave in self.__slaves:
             slave.close(self.loop)
 
@@ -173,7 +187,7 @@ class AsyncModbusConnector(Connector, Thread):
         Thread(target=self.__save_data, daemon=True, name="Modbus connector data saver thread").start()
 
         try:
-            self.loop.run_until_complete(self.__process_requests())
+            self.loop.run_until_complete(self.__run_polling())
         except CancelledError as e:
             self.__log.debug('Task was cancelled due to connector stop: %s', e.__str__())
         except Exception as e:
@@ -209,8 +223,11 @@ class AsyncModbusConnector(Connector, Thread):
         slave = Slave(self, self.__log, slave_config)
         master = self.__get_master(slave)
         slave.master = master
+        if master not in self.__poll_queues:
+            self.__poll_queues[master] = AsyncQueue(100000)
 
         self.__slaves.append(slave)
+        self.__poll_scheduler.add(slave)
 
     def __add_slaves(self, slaves_config):
         for slave_config in slaves_config:
@@ -225,16 +242,42 @@ class AsyncModbusConnector(Connector, Thread):
     def callback(cls, slave: Slave, queue: Queue):
         queue.put_nowait(slave)
 
-    async def __process_requests(self):
+    def __on_poll_due(self, slave: Slave):
+        self.callback(slave, self.__poll_queues[slave.master])
+
+    async def __run_polling(self):
+        poll_semaphore = asyncio.Semaphore(self.__max_concurrent_polls)
+        workers = []
+        for master, queue in self.__poll_queues.items():
+            # Requests to a serial port can not interleave
+            workers_count = 1 if master.client_type == SERIAL_CONNECTION_TYPE_PARAMETER \
+                else self.__max_concurrent_polls_per_master
+            workers.extend(self.__process_requests(queue, poll_semaphore) for _ in range(workers_count))
+
+        await asyncio.gather(self.__poll_scheduler.run(), *workers)
+
+    async def __process_requests(self, queue: AsyncQueue, poll_semaphore: asyncio.Semaphore):
         while not self.__stopped:
             try:
-                slave = self.process_device_requests.get_nowait()
-                await self.__poll_device(slave)
-            except QueueEmpty:
-                await asyncio.sleep(0.1)
+                slave = await asyncio.wait_for(queue.get(), 1)
+            except asyncio.TimeoutError:
                 continue
+
+            try:
+                count_connector_peak(self.get_name(), 'pollQueueMaxDepth', queue.qsize())
+                async with poll_semaphore:
+                    count_connector_peak(self.get_name(), 'pollQueueMaxLagMs',
+                                         int((monotonic() - slave.last_polled_time) * 1000))
+                    self.__active_polls += 1
+                    count_connector_peak(self.get_name(), 'maxActivePolls', self.__active_polls)
+                    try:
+                        await self.__poll_device(slave)
+                    finally:
+                        self.__active_polls -= 1
             except Exception as e:
                 self.__log.exception('Failed to poll device: %s', e)
+            finally:
+                self.__poll_scheduler.complete(slave)
 
     async def __poll_device(self, slave: Slave):
         self.__log.debug("Polling %s slave", slave)
@@ -273,19 +316,44 @@ class AsyncModbusConnector(Connector, Thread):
             'attributes': {}
         }
 
-        for config_section in ('attributes', 'telemetry'):
-            for config in getattr(slave.uplink_converter_config, config_section):
-                try:
-                    response = await slave.read(config['functionCode'], config['address'], config['objectsCount'])
-                except asyncio.exceptions.TimeoutError:
-                    self.__log.error("Timeout error for device %s function code %s address %s, it may be caused by wrong data in server register.",
-                                     slave.device_name, config['functionCode'], config[ADDRESS_PARAMETER])
-                    continue
+        for block in slave.read_blocks:
+            try:
+                response = await slave.read(block.function_code, block.address, block.objects_count)
+            except asyncio.exceptions.TimeoutError:
+                self.__log.error("Timeout error for device %s function code %s address %s, it may be caused by wrong data in server register.",
+                                 slave.device_name, block.function_code, block.address)
+                continue
 
+            if len(block.tags) == 1:
+                config_section, config = block.tags[0]
                 result[config_section][config['tag']] = response
+                continue
+
+            if is_failed_response(response):
+                self.__log.debug("Failed to read %s for device %s, reading tags one by one", block, slave.device_name)
+                for config_section, config in block.tags:
+                    await self.__read_tag(slave, config_section, config, result)
+                continue
+
+            for config_section, config in block.tags:
+                tag_response = block.slice_response(response, config)
+                if tag_response is None:
+                    await self.__read_tag(slave, config_section, config, result)
+                else:
+                    result[config_section][config['tag']] = tag_response
 
         return result
 
+    async def __read_tag(self, slave: Slave, config_section, config, result):
+        try:
+            response = await slave.read(config['functionCode'], config['address'], config['objectsCount'])
+        except asyncio.exceptions.TimeoutError:
+            self.__log.error("Timeout error for device %s function code %s address %s, it may be caused by wrong data in server register.",
+                             slave.device_name, config['functionCode'], config[ADDRESS_PARAMETER])
+            return
+
+        result[config_section][config['tag']] = response
+
     def __manage_device_connectivity_to_platform(self, slave: Slave):
         if slave.master.connected() and slave.device_name not in self.__gateway.get_devices():
             self.__add_device_to_platform(slave)
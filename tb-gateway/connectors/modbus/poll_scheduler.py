@@ -0,0 +1,115 @@
+#     Copyright 2025. ThingsBoard
+#
+#     Licensed under the Apache License, Version 2.0 (the "License");
+#     you may not use this file except in compliance with the License.
+#     You may obtain a copy of the License at
+#
+#         http://www.apache.org/licenses/LICENSE-2.0
+#
+#     Unless required by applicable law or agreed to in writing, software
+#     distributed under the License is distributed on an "AS IS" BASIS,
+#     WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#     See the License for the specific language governing permissions and
+#     limitations under the License.
+
+import asyncio
+from heapq import heappop, heappush
+from itertools import count
+from random import uniform
+from time import monotonic
+
+from thingsboard_gateway.connectors.connector_statistics import count_connector_peak
+from thingsboard_gateway.gateway.statistics.statistics_service import StatisticsService
+
+
+class PollScheduler:
+    """
+    Poll schedules of all slaves on one deadline heap, run as a task of the connector event loop.
+    A due slave is passed to on_due(slave), polls that are due before complete(slave) is called for the previous one
+    are skipped and counted as overruns.
+    The first poll of a slave is delayed by a random jitter of up to jitter_in_seconds (limited by the poll period),
+    so slaves with the same poll period do not hit the bus at the same time.
+    Dispatched polls, overruns and the peak dispatch lag are reported to the connector statistics.
+    """
+
+    def __init__(self, connector_name, logger, on_due, jitter_in_seconds=0.0):
+        self.__connector_name = connector_name
+        self._log = logger
+        self.__on_due = on_due
+        self.__jitter = jitter_in_seconds
+        self.__stopped = False
+        self.__deadlines = []
+        self.__sequence = count()
+        self.__in_progress = set()
+        self.__wakeup = None
+
+    def add(self, slave):
+        """Schedules the slave polling, should be called from the event loop or before run()."""
+        current_time = monotonic()
+        jitter = uniform(0, min(self.__jitter, slave.poll_period)) if self.__jitter > 0 else 0
+        self.__schedule(current_time + jitter, slave)
+
+    def complete(self, slave):
+        self.__in_progress.discard(slave)
+
+    async def run(self):
+        self.__wakeup = asyncio.Event()
+        while not self.__stopped:
+            try:
+                self.__dispatch_due()
+                self.__wakeup.clear()
+                wait_timeout = self.__get_wait_timeout()
+                try:
+                    await asyncio.wait_for(self.__wakeup.wait(), wait_timeout)
+                except asyncio.TimeoutError:
+                    pass
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                self._log.exception('Error in Modbus poll scheduler: %s', e)
+                await asyncio.sleep(.1)
+
+    def stop(self):
+        self.__stopped = True
+        if self.__wakeup is not None:
+            self.__wakeup.set()
+
+    def __dispatch_due(self):
+        current_time = monotonic()
+        due = []
+        while self.__deadlines and self.__deadlines[0][0] <= current_time:
+            due.append(heappop(self.__deadlines))
+
+        for deadline, _, slave in due:
+            if slave.stopped:
+                continue
+
+            if slave in self.__in_progress:
+                StatisticsService.count_connector_message(self.__connector_name, 'pollOverruns')
+                self._log.debug('Previous poll of %s is still in progress, skipping poll', slave)
+            else:
+                self.__in_progress.add(slave)
+                slave.last_polled_time = current_time
+                StatisticsService.count_connector_message(self.__connector_name, 'pollsDispatched')
+                count_connector_peak(self.__connector_name, 'pollMaxLagMs', int((current_time - deadline) * 1000))
+                try:
+                    self.__on_due(slave)
+                except Exception as e:
+                    self.__in_progress.discard(slave)
+                    self._log.exception('Error scheduling poll of %s: %s', slave, e)
+
+            # Fixed rate, missed polls are dropped instead of being sent in a burst
+            next_deadline = deadline + slave.poll_period
+            if next_deadline <= current_time:
+                next_deadline = current_time + slave.poll_period
+            self.__schedule(next_deadline, slave)
+
+    def __schedule(self, deadline, slave):
+        heappush(self.__deadlines, (deadline, next(self.__sequence), slave))
+        if self.__wakeup is not None and self.__deadlines[0][2] is slave:
+            self.__wakeup.set()
+
+    def __get_wait_timeout(self):
+        if not self.__deadlines:
+            return None
+        return max(self.__deadlines[0][0] - monotonic(), 0)
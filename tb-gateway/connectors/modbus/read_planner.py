@@ -0,0 +1,108 @@
+#     Copyright 2025. ThingsBoard
+#
+#     Licensed under the Apache License, Version 2.0 (the "License");
+#     you may not use this file except in compliance with the License.
+#     You may obtain a copy of the License at
+#
+#         http://www.apache.org/licenses/LICENSE-2.0
+#
+#     Unless required by applicable law or agreed to in writing, software
+#     distributed under the License is distributed on an "AS IS" BASIS,
+#     WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#     See the License for the specific language governing permissions and
+#     limitations under the License.
+
+from pymodbus.exceptions import ModbusIOException
+from pymodbus.pdu import ExceptionResponse
+
+from thingsboard_gateway.connectors.modbus.constants import ADDRESS_PARAMETER, FUNCTION_CODE_PARAMETER, \
+    OBJECTS_COUNT_PARAMETER
+
+# Modbus PDU limits for a single read request
+MAX_REGISTERS_PER_READ = 125
+MAX_BITS_PER_READ = 2000
+
+BITS_READ_FUNCTION_CODES = (1, 2)
+REGISTERS_READ_FUNCTION_CODES = (3, 4)
+
+
+class ReadBlock:
+    """A single read request covering the tags [(config section, tag config), ...]."""
+
+    __slots__ = ('function_code', 'address', 'objects_count', 'tags')
+
+    def __init__(self, function_code, address, objects_count, tags):
+        self.function_code = function_code
+        self.address = address
+        self.objects_count = objects_count
+        self.tags = tags
+
+    def __repr__(self):
+        return f'ReadBlock(functionCode={self.function_code}, address={self.address}, ' \
+               f'objectsCount={self.objects_count}, tags={len(self.tags)})'
+
+    def slice_response(self, response, config):
+        """
+        Returns the part of the block response for the tag config as a response of the same type,
+        or None if the response does not contain the tag objects.
+        """
+        offset = config[ADDRESS_PARAMETER] - self.address
+        objects_count = config[OBJECTS_COUNT_PARAMETER]
+
+        if self.function_code in BITS_READ_FUNCTION_CODES:
+            bits = response.bits[offset:offset + objects_count]
+            if len(bits) < objects_count:
+                return None
+            # Padded to whole bytes, as bits of a response to the tag own request
+            bits += [False] * (-len(bits) % 8)
+            return type(response)(bits)
+
+        registers = response.registers[offset:offset + objects_count]
+        if len(registers) < objects_count:
+            return None
+        return type(response)(registers)
+
+
+def is_failed_response(response):
+    return response is None or isinstance(response, (ModbusIOException, ExceptionResponse)) \
+        or not (hasattr(response, 'registers') or hasattr(response, 'bits'))
+
+
+def plan_reads(tags, max_gap=0, max_registers_per_read=MAX_REGISTERS_PER_READ, max_bits_per_read=MAX_BITS_PER_READ,
+               coalesce=True):
+    """
+    Groups tags [(config section, tag config), ...] read with the same function code into blocks of contiguous
+    addresses, blocks may include up to max_gap unused objects between tags.
+    Tags of other function codes and tags with invalid addresses get a block of their own, as all tags without coalesce.
+    """
+    blocks = []
+    tags_by_function_code = {}
+    for config_section, config in tags:
+        function_code = config.get(FUNCTION_CODE_PARAMETER)
+        if coalesce and function_code in BITS_READ_FUNCTION_CODES + REGISTERS_READ_FUNCTION_CODES \
+                and isinstance(config.get(ADDRESS_PARAMETER), int) \
+                and isinstance(config.get(OBJECTS_COUNT_PARAMETER), int) and config[OBJECTS_COUNT_PARAMETER] > 0:
+            tags_by_function_code.setdefault(function_code, []).append((config_section, config))
+        else:
+            blocks.append(ReadBlock(function_code, config.get(ADDRESS_PARAMETER), config.get(OBJECTS_COUNT_PARAMETER),
+                                    [(config_section, config)]))
+
+    for function_code, function_tags in tags_by_function_code.items():
+        max_objects_count = max_bits_per_read if function_code in BITS_READ_FUNCTION_CODES \
+            else max_registers_per_read
+        function_tags.sort(key=lambda tag: tag[1][ADDRESS_PARAMETER])
+
+        block = None
+        for config_section, config in function_tags:
+            start = config[ADDRESS_PARAMETER]
+            end = start + config[OBJECTS_COUNT_PARAMETER]
+            if block is not None:
+                block_end = block.address + block.objects_count
+                if start <= block_end + max_gap and max(end, block_end) - block.address <= max_objects_count:
+                    block.objects_count = max(end, block_end) - block.address
+                    block.tags.append((config_section, config))
+                    continue
+            block = ReadBlock(function_code, start, end - start, [(config_section, config)])
+            blocks.append(block)
+
+    return blocks
@@ -12,8 +12,7 @@
 #     See the License for the specific language governing permissions and
 #     limitations under the License.
 import asyncio
-from threading import Thread
-from time import sleep, monotonic
+from time import monotonic
 from typing import TYPE_CHECKING, Dict, Union
 
 from _asyncio import Future
@@ -26,9 +25,11 @@ from thingsboard_gateway.connectors.modbus.constants import BAUDRATE_PARAMETER,
     METHOD_PARAMETER, PARITY_PARAMETER, PORT_PARAMETER, REPACK_PARAMETER, RETRIES_PARAMETER, RETRY_ON_EMPTY_PARAMETER, \
     RETRY_ON_INVALID_PARAMETER, RPC_SECTION, SERIAL_CONNECTION_TYPE_PARAMETER, STOPBITS_PARAMETER, STRICT_PARAMETER, TAG_PARAMETER, \
     TIMEOUT_PARAMETER, UNIT_ID_PARAMETER, WAIT_AFTER_FAILED_ATTEMPTS_MS_PARAMETER, WORD_ORDER_PARAMETER, \
-    DELAY_BETWEEN_REQUESTS_MS_PARAMETER
+    DELAY_BETWEEN_REQUESTS_MS_PARAMETER, COALESCE_READS_PARAMETER, MAX_READ_GAP_PARAMETER, \
+    MAX_REGISTERS_PER_READ_PARAMETER, MAX_BITS_PER_READ_PARAMETER
 from thingsboard_gateway.connectors.modbus.entities.bytes_uplink_converter_config import BytesUplinkConverterConfig
 from thingsboard_gateway.connectors.modbus.modbus_converter import ModbusConverter
+from thingsboard_gateway.connectors.modbus.read_planner import MAX_BITS_PER_READ, MAX_REGISTERS_PER_READ, plan_reads
 from thingsboard_gateway.gateway.constants import DEVICE_NAME_PARAMETER, DEVICE_TYPE_PARAMETER, TYPE_PARAMETER, \
     UPLINK_PREFIX, CONVERTER_PARAMETER, DOWNLINK_PREFIX
 from thingsboard_gateway.gateway.statistics.statistics_service import StatisticsService
@@ -39,10 +40,8 @@ if TYPE_CHECKING:
     from thingsboard_gateway.connectors.modbus.entities.master import Master
 
 
-class Slave(Thread):
+class Slave:
     def __init__(self, connector: 'ModbusConnector', logger, config):
-        super().__init__()
-        self.daemon = True
         self.stopped = False
         self._log = logger
         self.connector = connector
@@ -57,8 +56,6 @@ class Slave(Thread):
                 str(config[UNIT_ID_PARAMETER]) + " on host " + str(config.get('host')) + \
                 ":" + str(config[PORT_PARAMETER]) + ' ' + config[DEVICE_NAME_PARAMETER]
 
-        self.callback = connector.callback
-
         self.unit_id = config[UNIT_ID_PARAMETER]
         self.host = config.get(HOST_PARAMETER)
         self.port = config[PORT_PARAMETER]
@@ -104,6 +101,18 @@ class Slave(Thread):
         self.uplink_converter_config = BytesUplinkConverterConfig(**config)
         self.uplink_converter = self.__load_uplink_converter(config)
 
+        # Tags with the same function code are read with as few requests as possible
+        self.read_blocks = plan_reads([(config_section, tag_config)
+                                       for config_section in ('attributes', 'telemetry')
+                                       for tag_config in getattr(self.uplink_converter_config, config_section)],
+                                      max_gap=config.get(MAX_READ_GAP_PARAMETER, 0),
+                                      max_registers_per_read=min(config.get(MAX_REGISTERS_PER_READ_PARAMETER,
+                                                                            MAX_REGISTERS_PER_READ),
+                                                                 MAX_REGISTERS_PER_READ),
+                                      max_bits_per_read=min(config.get(MAX_BITS_PER_READ_PARAMETER, MAX_BITS_PER_READ),
+                                                            MAX_BITS_PER_READ),
+                                      coalesce=config.get(COALESCE_READS_PARAMETER, True))
+
         self.__master: 'Master' = None
         self.available_functions = None
 
@@ -111,32 +120,6 @@ class Slave(Thread):
         for attr_config in self.attributes_updates_config:
             self.shared_attributes_keys.append(attr_config[TAG_PARAMETER])
 
-        self.start()
-
-    def __timer(self):
-        self.__send_callback(monotonic())
-        next_poll_time = monotonic() + self.poll_period
-
-        while not self.stopped and not self.connector.is_stopped():
-            current_time = monotonic()
-            if current_time >= next_poll_time:
-                self.__send_callback(current_time)
-                next_poll_time = current_time + self.poll_period
-
-            sleep_time = max(0.0, next_poll_time - monotonic())
-            sleep(sleep_time)
-
-    def __send_callback(self, current_monotonic):
-        self.last_polled_time = current_monotonic
-
-        try:
-            self.callback(self, self.connector.process_device_requests)
-        except Exception as e:
-            self._log.exception('Error sending slave callback: %s', e)
-
-    def run(self):
-        self.__timer()
-
     def close(self, loop):
         future = asyncio.run_coroutine_threadsafe(self.disconnect(), loop)
         try:
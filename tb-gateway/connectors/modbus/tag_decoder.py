@@ -0,0 +1,192 @@
+#     Copyright 2025. ThingsBoard
+#
+#     Licensed under the Apache License, Version 2.0 (the "License");
+#     you may not use this file except in compliance with the License.
+#     You may obtain a copy of the License at
+#
+#         http://www.apache.org/licenses/LICENSE-2.0
+#
+#     Unless required by applicable law or agreed to in writing, software
+#     distributed under the License is distributed on an "AS IS" BASIS,
+#     WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#     See the License for the specific language governing permissions and
+#     limitations under the License.
+
+from struct import Struct
+
+from thingsboard_gateway.connectors.modbus.constants import FUNCTION_CODE_PARAMETER, OBJECTS_COUNT_PARAMETER, \
+    TYPE_PARAMETER
+
+# struct format of numeric types, values are read from the start of the response as by BinaryPayloadDecoder
+NUMERIC_FORMATS = {
+    '8int': 'b',
+    '8uint': 'B',
+    '16int': 'h',
+    '16uint': 'H',
+    '16float': 'e',
+    '32int': 'i',
+    '32uint': 'I',
+    '32float': 'f',
+    '64int': 'q',
+    '64uint': 'Q',
+    '64float': 'd',
+}
+
+# Types with the size taken from the objects count
+SIZED_TYPES = {
+    'int': 'int',
+    'long': 'int',
+    'integer': 'int',
+    'float': 'float',
+    'double': 'float',
+    'uint': 'uint',
+}
+
+# Bits of every byte value, least significant bit first
+BYTE_BITS = tuple(tuple(bool(value >> bit & 1) for bit in range(8)) for value in range(256))
+
+BIG_ENDIAN = '>'
+
+
+def compile_tag_decoder(config, byte_order, word_order, logger):
+    """
+    Returns a function decoding a read response of the tag config with the same result as BinaryPayloadDecoder,
+    or None if the config can only be decoded with BinaryPayloadDecoder (unknown types, invalid parameters).
+    Byte and word order are resolved once: registers are packed in the byte order matching the word order
+    and the value is unpacked with a precompiled struct in the word order.
+    """
+    function_code = config.get(FUNCTION_CODE_PARAMETER)
+    lower_type = config.get(TYPE_PARAMETER)
+    objects_count = config.get(OBJECTS_COUNT_PARAMETER, config.get("registersCount", config.get("registerCount", 1)))
+    if function_code not in (1, 2, 3, 4) or not isinstance(lower_type, str) or not _is_number(objects_count, int):
+        return None
+    lower_type = lower_type.lower()
+
+    if lower_type in ('bit', 'bits'):
+        value_decoder = _compile_bits_decoder(config, objects_count, from_coils=function_code in (1, 2))
+    elif function_code in (1, 2):
+        # Coils of other types are decoded from the packed bits payload
+        return None
+    elif lower_type in ('string', 'bytes'):
+        value_decoder = _compile_bytes_decoder(lower_type, objects_count, logger)
+    else:
+        value_decoder = _compile_numeric_decoder(config, lower_type, objects_count, byte_order, word_order)
+
+    if value_decoder is None or function_code in (1, 2):
+        return value_decoder
+    return _with_scaling(config, value_decoder)
+
+
+def _compile_bits_decoder(config, objects_count, from_coils):
+    bit = config.get('bit')
+    if bit is not None and not _is_number(bit, int):
+        return None
+    bit_as_boolean = config.get('bitTargetType', 'bool') == 'bool'
+
+    def decode(encoded_data):
+        if from_coils:
+            decoded = _get_first_coils_bytes_bits(encoded_data.bits)
+        else:
+            registers = encoded_data.registers
+            decoded = list(BYTE_BITS[registers[0] >> 8] + BYTE_BITS[registers[0] & 0xFF]) if registers else []
+
+        decoded = decoded[len(decoded) - objects_count:]
+        if bit is not None:
+            return int(decoded[bit if bit < len(decoded) else len(decoded) - 1])
+        if objects_count == 1:
+            return bool(decoded[-1]) if bit_as_boolean else int(decoded[-1])
+        return [bool(value) if bit_as_boolean else int(value) for value in decoded]
+
+    return decode
+
+
+def _get_first_coils_bytes_bits(coils):
+    """Bits of the first 2 bytes of the coils payload, as BinaryPayloadDecoder.fromCoils() packs them."""
+    padding = len(coils) % 8
+    if padding:
+        coils = [False] * padding + coils
+
+    decoded = []
+    for chunk in (coils[0:8], coils[8:16]):
+        if chunk:
+            decoded += chunk[::-1]
+            decoded += [False] * (8 - len(chunk))
+    return decoded
+
+
+def _compile_bytes_decoder(lower_type, objects_count, logger):
+    if objects_count < 1:
+        return None
+    registers_packer = Struct(BIG_ENDIAN + str(objects_count) + 'H')
+    size = objects_count * 2
+
+    def decode(encoded_data):
+        registers = encoded_data.registers
+        if len(registers) >= objects_count:
+            decoded = registers_packer.pack(*registers[:objects_count])
+        else:
+            decoded = Struct(BIG_ENDIAN + str(len(registers)) + 'H').pack(*registers)[:size]
+
+        if lower_type == 'bytes':
+            return decoded.hex()
+        try:
+            return decoded.decode('UTF-8')
+        except UnicodeDecodeError as e:
+            logger.error("Error decoding string from bytes, will be saved as hex: %s", decoded, exc_info=e)
+            return decoded.hex()
+
+    return decode
+
+
+def _compile_numeric_decoder(config, lower_type, objects_count, byte_order, word_order):
+    if lower_type in SIZED_TYPES:
+        lower_type = str(objects_count * 16) + SIZED_TYPES[lower_type]
+    value_format = NUMERIC_FORMATS.get(lower_type)
+    if value_format is None:
+        return None
+
+    value_struct = Struct(word_order + value_format)
+    words_count = max(value_struct.size // 2, 1)
+    if value_struct.size == 1:
+        # The single byte is the high byte of the first register
+        registers_packer = Struct(BIG_ENDIAN + '1H')
+    else:
+        # Registers packed with the byte order equal to the word order are read as one value in the word order,
+        # with the opposite byte order every word gets swapped
+        registers_packer = Struct(('>' if byte_order == word_order else '<') + str(words_count) + 'H')
+    pack = registers_packer.pack
+    unpack_from = value_struct.unpack_from
+
+    if value_format not in ('e', 'f', 'd'):
+        def decode(encoded_data):
+            return unpack_from(pack(*encoded_data.registers[:words_count]))[0]
+
+        return decode
+
+    round_digits = config.get('round', 6)
+    if not _is_number(round_digits, int):
+        return None
+
+    def decode(encoded_data):
+        return float(round(unpack_from(pack(*encoded_data.registers[:words_count]))[0], round_digits))
+
+    return decode
+
+
+def _with_scaling(config, value_decoder):
+    divider = config.get('divider')
+    multiplier = config.get('multiplier')
+    if divider:
+        if not _is_number(divider):
+            return None
+        divider = float(divider)
+        return lambda encoded_data: float(value_decoder(encoded_data)) / divider
+    if multiplier:
+        if not _is_number(multiplier):
+            return None
+        return lambda encoded_data: value_decoder(encoded_data) * multiplier
+    return value_decoder
+
+
+def _is_number(value, number_types=(int, float)):
+    return isinstance(value, number_types) and not isinstance(value, bool)
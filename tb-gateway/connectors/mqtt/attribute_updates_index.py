@@ -0,0 +1,55 @@
+#     Copyright 2025. ThingsBoard
+#
+#     Licensed under the Apache License, Version 2.0 (the "License");
+#     you may not use this file except in compliance with the License.
+#     You may obtain a copy of the License at
+#
+#         http://www.apache.org/licenses/LICENSE-2.0
+#
+#     Unless required by applicable law or agreed to in writing, software
+#     distributed under the License is distributed on an "AS IS" BASIS,
+#     WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#     See the License for the specific language governing permissions and
+#     limitations under the License.
+
+from re import compile as compile_regex
+
+
+class AttributeUpdatesIndex:
+    """
+    attributeUpdates handlers with compiled device and attribute filters.
+    Matching handlers are cached per device name and per attribute key.
+    """
+
+    def __init__(self, attribute_updates, cache_size=10000):
+        self.__handlers = [(compile_regex(handler["deviceNameFilter"]), compile_regex(handler["attributeFilter"]),
+                            handler)
+                           for handler in attribute_updates]
+        self.__cache_size = cache_size
+        self.__device_handlers = {}
+        self.__attribute_matches = {}
+
+    def __bool__(self):
+        return bool(self.__handlers)
+
+    def get_device_handlers(self, device_name):
+        """Returns [(handler_id, attribute_filter, handler), ...] for handlers matching the device name."""
+        handlers = self.__device_handlers.get(device_name)
+        if handlers is None:
+            handlers = [(handler_id, attribute_filter, handler)
+                        for handler_id, (device_filter, attribute_filter, handler) in enumerate(self.__handlers)
+                        if device_filter.match(device_name)]
+            if len(self.__device_handlers) >= self.__cache_size:
+                self.__device_handlers.clear()
+            self.__device_handlers[device_name] = handlers
+        return handlers
+
+    def is_attribute_matched(self, handler_id, attribute_filter, attribute_key):
+        cache_key = (handler_id, attribute_key)
+        matched = self.__attribute_matches.get(cache_key)
+        if matched is None:
+            matched = attribute_filter.match(attribute_key) is not None
+            if len(self.__attribute_matches) >= self.__cache_size:
+                self.__attribute_matches.clear()
+            self.__attribute_matches[cache_key] = matched
+        return matched
@@ -0,0 +1,131 @@
+#     Copyright 2025. ThingsBoard
+#
+#     Licensed under the Apache License, Version 2.0 (the "License");
+#     you may not use this file except in compliance with the License.
+#     You may obtain a copy of the License at
+#
+#         http://www.apache.org/licenses/LICENSE-2.0
+#
+#     Unless required by applicable law or agreed to in writing, software
+#     distributed under the License is distributed on an "AS IS" BASIS,
+#     WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#     See the License for the specific language governing permissions and
+#     limitations under the License.
+
+from functools import lru_cache
+from re import compile as compile_regex
+
+from thingsboard_gateway.connectors.report_strategy_cache import get_report_strategy
+from thingsboard_gateway.gateway.constants import REPORT_STRATEGY_PARAMETER
+from thingsboard_gateway.gateway.entities.datapoint_key import DatapointKey
+
+BYTES_TAG_PATTERN = compile_regex(r'\[\S[0-9:]*]')
+
+LITERAL_OPERATION = 0
+INDEX_OPERATION = 1
+SLICE_OPERATION = 2
+INVALID_OPERATION = 3
+
+# Decimal representation of every byte value, bytes items are rendered by table lookup
+_BYTE_STRINGS = tuple(str(octet) for octet in range(256))
+
+
+def _parse_index(index):
+    return int(index) if index != '' else None
+
+
+def _join_items(items):
+    if isinstance(items, (bytes, bytearray, memoryview)):
+        return ''.join(map(_BYTE_STRINGS.__getitem__, items))
+    if isinstance(items, str):
+        return items
+    return ''.join(str(item) for item in items)
+
+
+class BytesExpression:
+    """
+    An expression like "Device [0:4]" compiled into literal and slice operations.
+    "[i]" is rendered as str(data[i]), "[from:to]" as the concatenated str() of every item of the slice.
+    """
+
+    def __init__(self, expression):
+        self.expression = expression
+        self.__operations = []
+        position = 0
+        for tag in BYTES_TAG_PATTERN.finditer(expression):
+            if tag.start() > position:
+                self.__operations.append((LITERAL_OPERATION, expression[position:tag.start()]))
+            self.__operations.append(self.__compile_tag(tag.group(0)))
+            position = tag.end()
+        if position < len(expression):
+            self.__operations.append((LITERAL_OPERATION, expression[position:]))
+
+        self.constant = None
+        if all(operation[0] == LITERAL_OPERATION for operation in self.__operations):
+            self.constant = expression
+
+    @staticmethod
+    def __compile_tag(tag):
+        indexes = tag[1:-1].split(':')
+        try:
+            if len(indexes) == 2:
+                return SLICE_OPERATION, slice(_parse_index(indexes[0]), _parse_index(indexes[1]))
+            return INDEX_OPERATION, int(indexes[0])
+        except ValueError:
+            # Reported when the expression is evaluated, as it was before compilation
+            return INVALID_OPERATION, indexes
+
+    def evaluate(self, data):
+        if self.constant is not None:
+            return self.constant
+
+        result = []
+        for operation, argument in self.__operations:
+            if operation == LITERAL_OPERATION:
+                result.append(argument)
+            elif operation == INDEX_OPERATION:
+                item = data[argument]
+                result.append(_BYTE_STRINGS[item] if type(item) is int and 0 <= item < 256 else str(item))
+            elif operation == SLICE_OPERATION:
+                result.append(_join_items(data[argument]))
+            else:
+                for index in argument:
+                    _parse_index(index)
+        return ''.join(result)
+
+
+@lru_cache(maxsize=1024)
+def compile_bytes_expression(expression):
+    return BytesExpression(expression)
+
+
+class BytesDatapointPlan:
+    def __init__(self, datapoint_config, device_report_strategy, logger):
+        self.key = compile_bytes_expression(datapoint_config['key'])
+        self.value = compile_bytes_expression(datapoint_config['value'])
+
+        self.report_strategy = get_report_strategy(datapoint_config.get(REPORT_STRATEGY_PARAMETER), logger) \
+                               or device_report_strategy
+
+        self.datapoint_key = None
+        if self.key.constant is not None:
+            self.datapoint_key = DatapointKey(self.key.constant, self.report_strategy)
+
+    def get_datapoint_key(self, data):
+        if self.datapoint_key is not None:
+            return self.datapoint_key
+        return DatapointKey(self.key.evaluate(data), self.report_strategy)
+
+
+class BytesConverterPlan:
+    """The bytes converter configuration with all expressions compiled at load time."""
+
+    def __init__(self, config, logger):
+        self.device_report_strategy = get_report_strategy(config.get(REPORT_STRATEGY_PARAMETER), logger)
+
+        self.device_name = compile_bytes_expression(config['deviceInfo']['deviceNameExpression'])
+        self.device_type = compile_bytes_expression(config['deviceInfo']['deviceProfileExpression'])
+        self.attributes = [BytesDatapointPlan(datapoint_config, self.device_report_strategy, logger)
+                           for datapoint_config in config.get('attributes', [])]
+        self.timeseries = [BytesDatapointPlan(datapoint_config, self.device_report_strategy, logger)
+                           for datapoint_config in config.get('timeseries', [])]
@@ -1,22 +1,20 @@
 import time
-from re import findall
 
 from simplejson import dumps
 
+from thingsboard_gateway.connectors.mqtt.bytes_converter_plan import BytesConverterPlan, compile_bytes_expression
 from thingsboard_gateway.connectors.mqtt.mqtt_uplink_converter import MqttUplinkConverter
-from thingsboard_gateway.gateway.constants import REPORT_STRATEGY_PARAMETER
 from thingsboard_gateway.gateway.entities.converted_data import ConvertedData
-from thingsboard_gateway.gateway.entities.report_strategy_config import ReportStrategyConfig
 from thingsboard_gateway.gateway.entities.telemetry_entry import TelemetryEntry
 from thingsboard_gateway.gateway.statistics.decorators import CollectStatistics
 from thingsboard_gateway.gateway.statistics.statistics_service import StatisticsService
-from thingsboard_gateway.tb_utility.tb_utility import TBUtility
 
 
 class BytesMqttUplinkConverter(MqttUplinkConverter):
     def __init__(self, config, logger):
         self.__config = config.get('converter')
         self._log = logger
+        self.__plan = BytesConverterPlan(self.__config, self._log)
 
     @property
     def config(self):
@@ -25,39 +23,25 @@ class BytesMqttUplinkConverter(MqttUplinkConverter):
     @config.setter
     def config(self, value):
         self.__config = value
+        self.__plan = BytesConverterPlan(self.__config, self._log)
 
     @CollectStatistics(start_stat_type='receivedBytesFromDevices',
                        end_stat_type='convertedBytesFromDevice')
     def convert(self, topic, data):
         StatisticsService.count_connector_message(self._log.name, 'convertersMsgProcessed')
 
-        datatypes = {"attributes": "attributes",
-                     "timeseries": "telemetry"}
-
-        device_name = self.parse_data(self.__config['deviceInfo']['deviceNameExpression'], data)
-
-        device_report_strategy = None
-        try:
-            device_report_strategy = ReportStrategyConfig(self.__config.get(REPORT_STRATEGY_PARAMETER))
-        except ValueError as e:
-            self._log.trace("Report strategy config is not specified for device %s: %s", device_name, e)
-
-        converted_data = ConvertedData(device_name=device_name,
-                                       device_type=self.parse_data(self.__config['deviceInfo']['deviceProfileExpression'], data))
+        plan = self.__plan
+        converted_data = ConvertedData(device_name=plan.device_name.evaluate(data),
+                                       device_type=plan.device_type.evaluate(data))
         timestamp = int(time.time() * 1000)
         try:
-            for datatype in datatypes:
-                for datatype_config in self.__config.get(datatype, []):
-                    key = self.parse_data(datatype_config['key'], data)
-                    value = self.parse_data(datatype_config['value'], data)
-                    datapoint_key = TBUtility.convert_key_to_datapoint_key(key,
-                                                                           device_report_strategy,
-                                                                           datatype_config,
-                                                                           self._log)
-                    if datatype == 'timeseries':
-                        converted_data.add_to_telemetry(TelemetryEntry({datapoint_key: value}, ts=timestamp))
-                    else:
-                        converted_data.add_to_attributes({datapoint_key: value})
+            for datapoint_plan in plan.attributes:
+                converted_data.add_to_attributes({datapoint_plan.get_datapoint_key(data):
+                                                  datapoint_plan.value.evaluate(data)})
+            for datapoint_plan in plan.timeseries:
+                converted_data.add_to_telemetry(TelemetryEntry({datapoint_plan.get_datapoint_key(data):
+                                                                datapoint_plan.value.evaluate(data)},
+                                                               ts=timestamp))
         except Exception as e:
             self._log.error('Error in converter, for config: \n%s\n and message: \n%s\n %s',
                             dumps(self.__config),
@@ -75,23 +59,4 @@ class BytesMqttUplinkConverter(MqttUplinkConverter):
 
     @staticmethod
     def parse_data(expression, data):
-        expression_arr = findall(r'\[\S[0-9:]*]', expression)
-        converted_data = expression
-
-        for exp in expression_arr:
-            indexes = exp[1:-1].split(':')
-
-            data_to_replace = ''
-            if len(indexes) == 2:
-                from_index, to_index = indexes
-                concat_arr = data[
-                             int(from_index) if from_index != '' else None:int(
-                                 to_index) if to_index != '' else None]
-                for sub_item in concat_arr:
-                    data_to_replace += str(sub_item)
-            else:
-                data_to_replace += str(data[int(indexes[0])])
-
-            converted_data = converted_data.replace(exp, data_to_replace)
-
-        return converted_data
+        return compile_bytes_expression(expression).evaluate(data)
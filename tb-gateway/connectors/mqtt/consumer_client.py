@@ -0,0 +1,74 @@
+#     Copyright 2025. ThingsBoard
+#
+#     Licensed under the Apache License, Version 2.0 (the "License");
+#     you may not use this file except in compliance with the License.
+#     You may obtain a copy of the License at
+#
+#         http://www.apache.org/licenses/LICENSE-2.0
+#
+#     Unless required by applicable law or agreed to in writing, software
+#     distributed under the License is distributed on an "AS IS" BASIS,
+#     WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#     See the License for the specific language governing permissions and
+#     limitations under the License.
+
+from thingsboard_gateway.connectors.mqtt.topic_filter_trie import SHARED_SUBSCRIPTION_PREFIX
+
+
+def get_shared_topic_filter(topic_filter, group):
+    """Returns "$share/<group>/<topic filter>", filters that are already shared or start with "$" are kept as is."""
+    if topic_filter.startswith('$'):
+        return topic_filter
+    return SHARED_SUBSCRIPTION_PREFIX + group + '/' + topic_filter
+
+
+class MqttConsumerClient:
+    """
+    An additional connection to the broker that only receives data messages of shared subscriptions.
+    Messages go to the same handler as messages of the main connector client, so the broker spreads the mapping
+    topics load over several connections and network threads.
+    Opt-in with the "consumerClients" broker option: the broker dispatches every message of a shared subscription
+    to any client of the group, so messages of one device may be received and converted out of order.
+    Reconnects are handled by the paho network loop.
+    """
+
+    def __init__(self, name, client, host, port, connect_arguments, get_topic_filters, on_message, logger):
+        self.name = name
+        self._log = logger
+        self.__client = client
+        self.__host = host
+        self.__port = port
+        self.__connect_arguments = connect_arguments
+        self.__get_topic_filters = get_topic_filters
+        self.__connected = False
+
+        self.__client.on_connect = self._on_connect
+        self.__client.on_disconnect = self._on_disconnect
+        self.__client.on_message = on_message
+
+    def start(self):
+        self.__client.connect_async(self.__host, self.__port, **self.__connect_arguments)
+        self.__client.loop_start()
+
+    def stop(self):
+        try:
+            self.__client.disconnect()
+        except Exception as e:
+            self._log.exception(e)
+        self.__client.loop_stop()
+
+    def is_connected(self):
+        return self.__connected
+
+    def _on_connect(self, client, userdata, flags, result_code, *extra_params):
+        if result_code != 0:
+            self._log.error("Consumer client %s connection failed with result code %s", self.name, result_code)
+            return
+
+        self.__connected = True
+        for topic_filter, qos in self.__get_topic_filters():
+            client.subscribe(topic_filter, qos)
+        self._log.info("Consumer client %s connected", self.name)
+
+    def _on_disconnect(self, *args):
+        self.__connected = False
@@ -0,0 +1,204 @@
+#     Copyright 2025. ThingsBoard
+#
+#     Licensed under the Apache License, Version 2.0 (the "License");
+#     you may not use this file except in compliance with the License.
+#     You may obtain a copy of the License at
+#
+#         http://www.apache.org/licenses/LICENSE-2.0
+#
+#     Unless required by applicable law or agreed to in writing, software
+#     distributed under the License is distributed on an "AS IS" BASIS,
+#     WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#     See the License for the specific language governing permissions and
+#     limitations under the License.
+
+from re import compile as compile_regex, search
+
+from jsonpath_rw import parse
+
+from thingsboard_gateway.connectors.report_strategy_cache import get_report_strategy
+from thingsboard_gateway.gateway.constants import REPORT_STRATEGY_PARAMETER
+from thingsboard_gateway.gateway.entities.datapoint_key import DatapointKey
+from thingsboard_gateway.tb_utility.tb_utility import TBUtility
+
+# Same tag syntax as TBUtility.get_values
+TEMPLATE_TAG_PATTERN = compile_regex(r'\$\{[${A-Za-z0-9. ^\]\[*_:"-]*\}')
+WILDCARD_KEY = "*"
+
+
+def _compile_tag_getter(token, value_type, expression_instead_none):
+    """
+    Returns (tag, getter) for a single "${...}" token, getter(data) gives the same result as
+    TBUtility.get_value(token, data, value_type, expression_instead_none=...) for dict and list payloads.
+    """
+    positions = search(r'\${(?:(.*))}', token)
+    if positions is not None:
+        p1, p2 = positions.regs[-1]
+    else:
+        p1, p2 = 0, len(token)
+    tag = token[p1:p2]
+
+    tag_words = tag.split()
+    if not tag_words:
+        return tag, lambda data: None
+
+    key = tag_words[0]
+    as_string = value_type.lower() == "string"
+    prefix = token[0:max(p1 - 2, 0)]
+    suffix = token[p2 + 1:]
+
+    path = tag
+    if " " in path:
+        path = '.'.join('"' + section_key + '"' if " " in section_key else section_key
+                        for section_key in path.split('.'))
+    try:
+        json_path = parse(path)
+    except Exception:
+        json_path = None
+
+    def get(data):
+        if isinstance(data, dict) and key in data:
+            value = data[key]
+            if as_string:
+                value = prefix + str(value) + suffix
+        else:
+            value = None
+            if json_path is not None:
+                try:
+                    matches = json_path.find(data)
+                    if matches:
+                        value = matches[0].value
+                except Exception:
+                    pass
+        if value is None and expression_instead_none:
+            return token
+        return value
+
+    return tag, get
+
+
+class ExpressionTemplate:
+    """
+    A key/value expression like "${temp}" or "${hum}:${temp}" compiled once into placeholders and getters.
+    render() returns the string the converter used to build with TBUtility.get_values and str.replace.
+    """
+
+    def __init__(self, expression, value_type="string", expression_instead_none=False):
+        self.expression = expression
+        self.__value_type = value_type
+        self.__expression_instead_none = expression_instead_none
+        self.__parts = []
+        for token in TEMPLATE_TAG_PATTERN.findall(expression):
+            tag, getter = _compile_tag_getter(token, value_type, expression_instead_none)
+            self.__parts.append(('${' + str(tag) + '}', getter))
+        self.is_constant = not self.__parts
+        self.__single_getter = None
+        if len(self.__parts) == 1 and self.__parts[0][0] == expression:
+            self.__single_getter = self.__parts[0][1]
+
+    def render(self, data):
+        if self.is_constant:
+            return self.expression
+        if not isinstance(data, (dict, list)):
+            return self.__render_with_tb_utility(data)
+        if self.__single_getter is not None:
+            return str(self.__single_getter(data))
+
+        result = self.expression
+        for placeholder, getter in self.__parts:
+            result = result.replace(placeholder, str(getter(data)))
+        return result
+
+    def __render_with_tb_utility(self, data):
+        values = TBUtility.get_values(self.expression, data, self.__value_type,
+                                      expression_instead_none=self.__expression_instead_none)
+        tags = TBUtility.get_values(self.expression, data, get_tag=True)
+        result = self.expression
+        for value, tag in zip(values, tags):
+            result = result.replace('${' + str(tag) + '}', str(value))
+        return result
+
+
+def compile_cast(value_type, use_eval=False):
+    """Returns a function with the result of TBUtility.convert_data_type for string values of the template."""
+    if use_eval:
+        return lambda value: TBUtility.convert_data_type(value, value_type, True)
+
+    new_type = value_type.lower()
+    if 'str' in new_type:
+        def cast(value):
+            return value if isinstance(value, str) else TBUtility.convert_data_type(value, value_type)
+    elif 'int' in new_type or 'long' in new_type:
+        def cast(value):
+            if not isinstance(value, str):
+                return TBUtility.convert_data_type(value, value_type)
+            try:
+                return int(float(value))
+            except ValueError:
+                return value
+    elif new_type == 'float' or new_type == 'double':
+        def cast(value):
+            if not isinstance(value, str):
+                return TBUtility.convert_data_type(value, value_type)
+            try:
+                return float(value)
+            except ValueError:
+                return value
+    else:
+        def cast(value):
+            return TBUtility.convert_data_type(value, value_type)
+    return cast
+
+
+class DatapointPlan:
+    def __init__(self, datapoint_config, device_report_strategy, use_eval, logger):
+        self.config = datapoint_config
+        value_type = datapoint_config["type"]
+        self.key = ExpressionTemplate(datapoint_config["key"], value_type)
+        self.value = ExpressionTemplate(datapoint_config["value"], value_type)
+        self.cast = compile_cast(value_type, use_eval)
+        self.has_ts_field = datapoint_config.get('tsField') is not None
+
+        self.report_strategy = get_report_strategy(datapoint_config.get(REPORT_STRATEGY_PARAMETER), logger) \
+                               or device_report_strategy
+        self.__datapoint_keys = {}
+
+    def get_datapoint_key(self, key):
+        datapoint_key = self.__datapoint_keys.get(key)
+        if datapoint_key is None:
+            if len(self.__datapoint_keys) >= 1000:
+                self.__datapoint_keys.clear()
+            datapoint_key = self.__datapoint_keys[key] = DatapointKey(key, self.report_strategy)
+        return datapoint_key
+
+
+class JsonConverterPlan:
+    """
+    The converter configuration compiled at load time: device name/profile expressions, key/value templates,
+    type casts and report strategies. Converting a message only evaluates the prepared getters.
+    """
+
+    def __init__(self, config, use_eval, logger):
+        self.device_report_strategy = get_report_strategy(config.get(REPORT_STRATEGY_PARAMETER), logger)
+
+        device_info = config.get('deviceInfo', {})
+        self.device_name = self.__compile_device_info(device_info, "deviceNameExpressionSource",
+                                                      "deviceNameExpression")
+        self.device_type = self.__compile_device_info(device_info, "deviceProfileExpressionSource",
+                                                      "deviceProfileExpression")
+
+        self.attributes = self.__compile_datapoints(config.get("attributes", []), use_eval, logger)
+        self.timeseries = self.__compile_datapoints(config.get("timeseries", []), use_eval, logger)
+
+    def __compile_datapoints(self, datapoints_config, use_eval, logger):
+        return [WILDCARD_KEY if isinstance(datapoint_config, str) and datapoint_config == WILDCARD_KEY
+                else DatapointPlan(datapoint_config, self.device_report_strategy, use_eval, logger)
+                for datapoint_config in datapoints_config]
+
+    @staticmethod
+    def __compile_device_info(device_info, expression_source, expression):
+        """Returns the template for "message" and "constant" sources, other sources are resolved by the converter."""
+        expression = device_info.get(expression)
+        if device_info.get(expression_source) in ('message', 'constant') and isinstance(expression, str):
+            return ExpressionTemplate(expression, expression_instead_none=True)
+        return None
@@ -17,12 +17,12 @@ from time import time
 
 from simplejson import dumps
 
+from thingsboard_gateway.connectors.mqtt.json_converter_plan import JsonConverterPlan, WILDCARD_KEY
 from thingsboard_gateway.connectors.mqtt.mqtt_uplink_converter import MqttUplinkConverter
-from thingsboard_gateway.gateway.constants import REPORT_STRATEGY_PARAMETER, \
-    RECEIVED_TS_PARAMETER, CONVERTED_TS_PARAMETER
+from thingsboard_gateway.gateway.constants import RECEIVED_TS_PARAMETER, TELEMETRY_TIMESTAMP_PARAMETER, \
+    TELEMETRY_VALUES_PARAMETER
 from thingsboard_gateway.gateway.entities.attributes import Attributes
 from thingsboard_gateway.gateway.entities.converted_data import ConvertedData
-from thingsboard_gateway.gateway.entities.report_strategy_config import ReportStrategyConfig
 from thingsboard_gateway.gateway.entities.telemetry_entry import TelemetryEntry
 from thingsboard_gateway.gateway.statistics.decorators import CollectStatistics
 from thingsboard_gateway.tb_utility.tb_utility import TBUtility
@@ -38,6 +38,7 @@ class JsonMqttUplinkConverter(MqttUplinkConverter):
         self._log = logger
         self.__config = config.get('converter')
         self.__use_eval = self.__config.get(self.CONFIGURATION_OPTION_USE_EVAL, False)
+        self.__plan = JsonConverterPlan(self.__config, self.__use_eval, self._log)
 
     @property
     def config(self):
@@ -46,6 +47,8 @@ class JsonMqttUplinkConverter(MqttUplinkConverter):
     @config.setter
     def config(self, value):
         self.__config = value
+        self.__use_eval = self.__config.get(self.CONFIGURATION_OPTION_USE_EVAL, False)
+        self.__plan = JsonConverterPlan(self.__config, self.__use_eval, self._log)
 
     @CollectStatistics(start_stat_type='receivedBytesFromDevices',
                        end_stat_type='convertedBytesFromDevice')
@@ -53,77 +56,127 @@ class JsonMqttUplinkConverter(MqttUplinkConverter):
         StatisticsService.count_connector_message(self._log.name, 'convertersMsgProcessed')
 
         if isinstance(data, list):
-            converted_data = []
-            for item in data:
-                converted_data.append(self._convert_single_item(topic, item))
+            converted_data = self._convert_items(topic, data)
             self._log.debug(converted_data)
             return converted_data
         else:
             return self._convert_single_item(topic, data)
 
     def _convert_single_item(self, topic, data):
-        datatypes = {"attributes": "attributes",
-                     "timeseries": "telemetry"}
-
-        device_name = self.parse_device_name(topic, data, self.__config)
-
-        converted_data = ConvertedData(device_name=device_name,
-                                       device_type=self.parse_device_type(topic, data, self.__config),
-                                       metadata={RECEIVED_TS_PARAMETER: int(time() * 1000)})
-        device_report_strategy = None
+        plan = self.__plan
+        received_ts = int(time() * 1000)
+
+        converted_data = ConvertedData(device_name=self.__parse_device_info(topic, data, plan.device_name,
+                                                                            self.parse_device_name),
+                                       device_type=self.__parse_device_info(topic, data, plan.device_type,
+                                                                            self.parse_device_type),
+                                       metadata={RECEIVED_TS_PARAMETER: received_ts})
+        telemetry_rows = {}
+        self.__convert_datapoints(data, received_ts, converted_data, telemetry_rows)
+        return self.__complete_converted_data(converted_data, telemetry_rows)
+
+    def _convert_items(self, topic, items):
+        """
+        Converts a JSON array, items of the same device are merged into one ConvertedData
+        with one telemetry entry per timestamp. Returns a list with ConvertedData per device.
+        """
+        plan = self.__plan
+        received_ts = int(time() * 1000)
+        parse_device_name = self.__get_device_info_parser(topic, plan.device_name, self.parse_device_name,
+                                                          "deviceNameExpressionSource")
+        parse_device_type = self.__get_device_info_parser(topic, plan.device_type, self.parse_device_type,
+                                                          "deviceProfileExpressionSource")
+
+        devices = {}
+        for item in items:
+            device = (parse_device_name(item), parse_device_type(item))
+            device_data = devices.get(device)
+            if device_data is None:
+                device_data = devices[device] = (ConvertedData(device_name=device[0], device_type=device[1],
+                                                               metadata={RECEIVED_TS_PARAMETER: received_ts}), {})
+            self.__convert_datapoints(item, received_ts, *device_data)
+
+        return [self.__complete_converted_data(converted_data, telemetry_rows)
+                for converted_data, telemetry_rows in devices.values()]
+
+    def __convert_datapoints(self, data, received_ts, converted_data, telemetry_rows):
+        """
+        Adds attributes to converted_data and telemetry values to telemetry_rows {ts: {key: value}}.
+        Within a message the first value of a key wins (as in ConvertedData), later messages override earlier ones.
+        """
+        plan = self.__plan
+        message_rows = {}
         try:
-            device_report_strategy = ReportStrategyConfig(self.__config.get(REPORT_STRATEGY_PARAMETER))
-        except ValueError as e:
-            self._log.trace("Report strategy config is not specified for device %s: %s", device_name, e)
-
-        try:
-            for datatype in datatypes:
-                if self.__config.get(USE_RECEIVED_TS_PARAMETER, False) is True:
-                    timestamp = converted_data.metadata["receivedTs"]
-                else:
-                    timestamp = data.get("ts", data.get("timestamp")) if datatype == 'timeseries' else None
-
-                for datatype_config in self.__config.get(datatype, []):
-                    if isinstance(datatype_config, str) and datatype_config == "*":
-                        if datatype == "attributes":
-                            converted_data.add_to_attributes(Attributes(data))
-                        else:
-                            telemetry_entry = TelemetryEntry(data, timestamp)
-                            converted_data.add_to_telemetry(telemetry_entry)
+            for datapoint_plan in plan.attributes:
+                if datapoint_plan is WILDCARD_KEY:
+                    converted_data.add_to_attributes(Attributes(data))
+                    continue
+
+                full_key = datapoint_plan.key.render(data)
+                full_value = datapoint_plan.value.render(data)
+                if full_key != 'None' and full_value != 'None':
+                    converted_data.add_to_attributes(datapoint_plan.get_datapoint_key(full_key),
+                                                     datapoint_plan.cast(full_value))
+
+            if not plan.timeseries:
+                return
+
+            if self.__config.get(USE_RECEIVED_TS_PARAMETER, False) is True:
+                message_ts = received_ts
+            else:
+                message_ts = data.get("ts", data.get("timestamp"))
+
+            for datapoint_plan in plan.timeseries:
+                if datapoint_plan is WILDCARD_KEY:
+                    # Same as TelemetryEntry: {"ts": ..., "values": {...}} messages carry their own timestamp
+                    if data.get(TELEMETRY_TIMESTAMP_PARAMETER) and data.get(TELEMETRY_VALUES_PARAMETER):
+                        self.__add_telemetry_values(message_rows, data[TELEMETRY_TIMESTAMP_PARAMETER],
+                                                    data[TELEMETRY_VALUES_PARAMETER], received_ts)
                     else:
-                        values = TBUtility.get_values(datatype_config["value"], data, datatype_config["type"],
-                                                      expression_instead_none=False)
-                        values_tags = TBUtility.get_values(datatype_config["value"], data, datatype_config["type"],
-                                                           get_tag=True)
-
-                        keys = TBUtility.get_values(datatype_config["key"], data, datatype_config["type"],
-                                                    expression_instead_none=False)
-                        keys_tags = TBUtility.get_values(datatype_config["key"], data, get_tag=True)
-
-                        full_key = datatype_config["key"]
-                        for (key, key_tag) in zip(keys, keys_tags):
-                            is_valid_key = "${" in datatype_config["key"] and "}" in datatype_config["key"]
-                            full_key = full_key.replace('${' + str(key_tag) + '}', str(key)) if is_valid_key else key_tag
-
-                        full_value = datatype_config["value"]
-                        for (value, value_tag) in zip(values, values_tags):
-                            is_valid_value = "${" in datatype_config["value"] and "}" in datatype_config["value"]
-                            full_value = full_value.replace('${' + str(value_tag) + '}', str(value)) if is_valid_value else value
-
-                        if full_key != 'None' and full_value != 'None':
-                            converted_key = TBUtility.convert_key_to_datapoint_key(full_key, device_report_strategy, datatype_config, self._log)
-                            converted_value = TBUtility.convert_data_type(full_value, datatype_config["type"], self.__use_eval)
-                            if datatype == "attributes":
-                                converted_data.add_to_attributes(converted_key, converted_value)
-                            else:
-                                timestamp = TBUtility.resolve_different_ts_formats(data=data, config=datatype_config, logger=self._log, default_ts=False)
-                                telemetry_entry = TelemetryEntry({converted_key: converted_value}, timestamp)
-                                converted_data.add_to_telemetry(telemetry_entry)
+                        self.__add_telemetry_values(message_rows, message_ts, data, received_ts)
+                    continue
+
+                full_key = datapoint_plan.key.render(data)
+                full_value = datapoint_plan.value.render(data)
+                if full_key != 'None' and full_value != 'None':
+                    timestamp = None
+                    if datapoint_plan.has_ts_field:
+                        timestamp = TBUtility.resolve_different_ts_formats(data=data,
+                                                                           config=datapoint_plan.config,
+                                                                           logger=self._log,
+                                                                           default_ts=False)
+                    self.__add_telemetry_values(message_rows, timestamp,
+                                                {datapoint_plan.get_datapoint_key(full_key):
+                                                 datapoint_plan.cast(full_value)},
+                                                received_ts)
         except Exception as e:
             self._log.error('Error in converter, for config: \n%s\n and message: \n%s\n %s', dumps(self.__config),
                             str(data), e)
             StatisticsService.count_connector_message(self._log.name, 'convertersMsgDropped')
 
+        for ts, values in message_rows.items():
+            row = telemetry_rows.get(ts)
+            if row is None:
+                telemetry_rows[ts] = values
+            else:
+                row.update(values)
+
+    @staticmethod
+    def __add_telemetry_values(message_rows, ts, values, received_ts):
+        if ts is None:
+            ts = received_ts
+        row = message_rows.get(ts)
+        if row is None:
+            message_rows[ts] = dict(values)
+            return
+        for key, value in values.items():
+            if key not in row:
+                row[key] = value
+
+    def __complete_converted_data(self, converted_data, telemetry_rows):
+        for ts, values in telemetry_rows.items():
+            converted_data.add_to_telemetry(TelemetryEntry(values, ts))
+
         self._log.debug("Converted data: %s", converted_data)
 
         StatisticsService.count_connector_message(self._log.name, 'convertersAttrProduced',
@@ -132,6 +185,24 @@ class JsonMqttUplinkConverter(MqttUplinkConverter):
                                                   count=converted_data.telemetry_datapoints_count)
         return converted_data
 
+    def __get_device_info_parser(self, topic, template, parse_function, expression_source):
+        """Returns a function of the message, device info taken from the topic is parsed once for all items."""
+        if template is not None:
+            return lambda data: self.__parse_device_info(topic, data, template, parse_function)
+        if self.__config.get('deviceInfo', {}).get(expression_source) == 'topic':
+            device_info = parse_function(topic, None, self.__config)
+            return lambda data: device_info
+        return lambda data: parse_function(topic, data, self.__config)
+
+    def __parse_device_info(self, topic, data, template, parse_function):
+        if template is None:
+            return parse_function(topic, data, self.__config)
+        try:
+            return template.render(data)
+        except Exception as e:
+            self._log.error('Error in converter, for config: \n%s\n and message: \n%s\n %s',
+                            dumps(self.__config), data, e)
+
     @staticmethod
     def create_data_record(key, value, timestamp):
         value_item = {key: value}
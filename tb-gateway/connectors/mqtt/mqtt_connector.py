@@ -12,23 +12,31 @@
 #     See the License for the specific language governing permissions and
 #     limitations under the License.
 
+import os
 import random
 import socket
 import ssl
 import string
-from queue import Queue, Empty
-from re import fullmatch, match, search
+from queue import Queue, Empty, Full
+from re import search
 from threading import Thread, Event
 from time import sleep, time
 
 import orjson
 
+from thingsboard_gateway.connectors.mqtt.attribute_updates_index import AttributeUpdatesIndex
 from thingsboard_gateway.connectors.mqtt.backward_compatibility_adapter import BackwardCompatibilityAdapter
+from thingsboard_gateway.connectors.mqtt.consumer_client import MqttConsumerClient, get_shared_topic_filter
 from thingsboard_gateway.gateway.constant_enums import Status
 from thingsboard_gateway.connectors.connector import Connector
+from thingsboard_gateway.connectors.connector_statistics import count_connector_peak
+from thingsboard_gateway.connectors.converter_logger import ConverterLogger
 from thingsboard_gateway.connectors.mqtt.mqtt_decorators import CustomCollectStatistics
+from thingsboard_gateway.connectors.mqtt.process_pool_converter import ProcessPoolConverter
+from thingsboard_gateway.connectors.mqtt.publish_pipeline import PublishPipeline
+from thingsboard_gateway.connectors.mqtt.rpc_correlation import RpcCorrelationTable, get_response_topic_filter
+from thingsboard_gateway.connectors.mqtt.topic_filter_trie import TopicFilterTrie, strip_shared_subscription_prefix
 from thingsboard_gateway.gateway.constants import DATA_RETRIEVING_STARTED, CONVERTED_TS_PARAMETER
-from thingsboard_gateway.gateway.entities.converted_data import ConvertedData
 from thingsboard_gateway.gateway.statistics.decorators import CollectAllReceivedBytesStatistics
 from thingsboard_gateway.tb_utility.tb_loader import TBModuleLoader
 from thingsboard_gateway.tb_utility.tb_utility import TBUtility
@@ -53,6 +61,14 @@ MQTT_VERSIONS = {
     5: MQTTv5
 }
 
+MAPPING_HANDLER = "mapping"
+CONNECT_REQUEST_HANDLER = "connectRequest"
+DISCONNECT_REQUEST_HANDLER = "disconnectRequest"
+ATTRIBUTE_REQUEST_HANDLER = "attributeRequest"
+
+THREADS_CONVERTER_BACKEND = "threads"
+PROCESS_CONVERTER_BACKEND = "process"
+
 RESULT_CODES_V3 = {
     1: "Connection rejected for unsupported protocol version",
     2: "Connection rejected for rejected client ID",
@@ -186,12 +202,12 @@ class MqttConnector(Connector, Thread):
 
         # Attributes updates requests, i.e., asking ThingsBoard to send updates about an attribute
         self.load_handlers('attributeUpdates', mandatory_keys['attributeUpdates'], self.__attribute_updates)
+        self.__attribute_updates_index = AttributeUpdatesIndex(self.__attribute_updates)
 
         # Setup topic substitution lists for each class of handlers ----------------------------------------------------
         self.__mapping_sub_topics = {}
-        self.__connect_requests_sub_topics = {}
-        self.__disconnect_requests_sub_topics = {}
-        self.__attribute_requests_sub_topics = {}
+        # All handler classes resolved by a single lookup of the message topic
+        self.__topic_handlers = TopicFilterTrie(self.__broker.get('topicCacheSize', 10000))
 
         # Set up external MQTT broker connection -----------------------------------------------------------------------
         client_id = self.__broker.get("clientId", ''.join(random.choice(string.ascii_lowercase) for _ in range(23)))
@@ -201,69 +217,134 @@ class MqttConnector(Connector, Thread):
         self._sessionExpiryInterval = self.__broker.get("sessionExpiryInterval", 0)
 
         self._mqtt_version = self.__broker.get('version', 5)
-        try:
-            if self._mqtt_version != 5:
-                self._client = Client(client_id=client_id, clean_session=self._cleanSession,
-                                      protocol=MQTT_VERSIONS[self._mqtt_version])
-            else:
-                self._client = Client(client_id=client_id, protocol=MQTT_VERSIONS[self._mqtt_version])
-        except KeyError:
+        if self._mqtt_version not in MQTT_VERSIONS:
             self.__log.error('Unknown MQTT version. Starting up on version 5...')
-            self._client = Client(client_id=client_id, protocol=MQTTv5)
             self._mqtt_version = 5
 
         self.name = config.get("name", self.__broker.get(
             "name",
             'Mqtt Broker ' + ''.join(random.choice(string.ascii_lowercase) for _ in range(5))))
 
+        self._client = self.__create_client(client_id)
+
+        # Additional connections sharing the mapping topics subscriptions with the main client, opt-in as
+        # the broker spreads messages of a device over the connections and they may be converted out of order
+        self.__consumer_clients_count = max(self.__broker.get('consumerClients', 1), 1)
+        self.__shared_subscription_group = self.__broker.get('sharedSubscriptionGroup', 'tb_gateway')
+        self.__consumer_clients = []
+        if self.__consumer_clients_count > 1:
+            self.__log.warning("%d consumer clients share the mapping topics subscriptions, messages of a device "
+                               "are not guaranteed to be processed in the order they were published",
+                               self.__consumer_clients_count)
+        for consumer_number in range(1, self.__consumer_clients_count):
+            consumer_client_id = client_id + '_' + str(consumer_number) if self.__broker.get("clientId") \
+                else ''.join(random.choice(string.ascii_lowercase) for _ in range(23))
+            self.__consumer_clients.append(MqttConsumerClient(consumer_client_id,
+                                                              self.__create_client(consumer_client_id),
+                                                              self.__broker['host'],
+                                                              self.__broker.get('port', 1883),
+                                                              self.__get_connect_arguments(),
+                                                              self.__get_consumer_topic_filters,
+                                                              self._on_message,
+                                                              self.__log))
+        # Set up external MQTT broker callbacks ------------------------------------------------------------------------
+        self._client.on_connect = self._on_connect
+        self._client.on_message = self._on_message
+        self._client.on_subscribe = self._on_subscribe
+        self._client.on_disconnect = self._on_disconnect
+        self._client.on_publish = self._on_publish
+        # self._client.on_log = self._on_log
+
+        self.__msg_queue = Queue(self.__broker.get('maxMessageQueue', 1000000000))
+        self.__workers_thread_pool = []
+        self.__max_msg_number_for_worker = self.__broker.get('maxMessageNumberPerWorker', 10)
+        self.__max_number_of_workers = self.__broker.get('maxNumberOfWorkers', 100)
+
+        # Optional conversion in worker processes, for CPU-heavy converters and high message rates
+        self.__converter_backend = self.__broker.get('converterBackend', THREADS_CONVERTER_BACKEND)
+        self.__process_pool = None
+        self.__process_converter_ids = {}
+        self.__process_converter_configs = {}
+        if self.__converter_backend == PROCESS_CONVERTER_BACKEND:
+            process_pool_workers = self.__broker.get('processPoolWorkers', os.cpu_count() or 1)
+            self.__process_pool = ProcessPoolConverter(self._connector_type, self.__converter_log,
+                                                       process_pool_workers,
+                                                       self.__broker.get('processPoolMaxInFlightBatches',
+                                                                         process_pool_workers * 2))
+            self.__process_pool_batch_size = self.__broker.get('processPoolBatchSize', 100)
+        elif self.__converter_backend != THREADS_CONVERTER_BACKEND:
+            self.__log.error('Unknown converter backend "%s", converters will run in threads',
+                             self.__converter_backend)
+            self.__converter_backend = THREADS_CONVERTER_BACKEND
+
+        self.__hot_log = ConverterLogger(self.__log)
+        self.__messages_dropped_queue_full = 0
+        self.__on_message_batch_size = self.__broker.get('onMessageBatchSize', 100)
+        self.__on_message_queue_timeout = self.__broker.get('onMessageQueueTimeoutInSeconds', 1)
+
+        # Publishing towards devices does not wait for broker acknowledgements, see PublishPipeline
+        self.__publish_pipeline = PublishPipeline(self._client, self.__log,
+                                                  self.__broker.get('maxInFlightPublishes', 1000),
+                                                  self.__broker.get('publishTimeoutInSeconds', 10))
+        # 2-way RPC requests waiting for device responses
+        self.__rpc_correlation = RpcCorrelationTable(self.__log, self.__subscribe, self.rpc_cancel_processing,
+                                                     self.__on_rpc_timeout)
+
+        # Messages are routed to the processing threads by topic hash, so messages of a topic received on one
+        # connection keep their order (with consumer clients the broker may deliver them on different connections)
+        on_message_threads_count = max(self.__broker.get('onMessageThreads', self.__consumer_clients_count), 1)
+        self._on_message_queues = [Queue(self.__broker.get('maxProcessingMessageQueue', 1000000000))
+                                   for _ in range(on_message_threads_count)]
+        self._on_message_queue = self._on_message_queues[0]
+        self._on_message_threads = []
+        for thread_number, on_message_queue in enumerate(self._on_message_queues):
+            thread = Thread(name='On Message' + (' ' + str(thread_number) if thread_number else ''),
+                            target=self._process_on_message, args=(on_message_queue,), daemon=True)
+            self._on_message_threads.append(thread)
+            thread.start()
+        self._on_message_thread = self._on_message_threads[0]
+
+    def __create_client(self, client_id):
+        if self._mqtt_version != 5:
+            client = Client(client_id=client_id, clean_session=self._cleanSession,
+                            protocol=MQTT_VERSIONS[self._mqtt_version])
+        else:
+            client = Client(client_id=client_id, protocol=MQTT_VERSIONS[self._mqtt_version])
+
         if "username" in self.__broker["security"]:
-            self._client.username_pw_set(self.__broker["security"].get("username"),
-                                         self.__broker["security"].get("password"))
+            client.username_pw_set(self.__broker["security"].get("username"),
+                                   self.__broker["security"].get("password"))
 
         if "caCert" in self.__broker["security"] \
                 or self.__broker["security"].get("type", "none").lower() == "certificates":
-            
+
             self.__log.debug("Connector connecting with certificates")
             ca_cert = self.__broker["security"].get("pathToCACert")
             private_key = self.__broker["security"].get("pathToPrivateKey")
             cert = self.__broker["security"].get("pathToClientCert")
             if ca_cert is None:
-                self._client.tls_set_context(ssl.SSLContext(ssl.PROTOCOL_TLSv1_2))
+                client.tls_set_context(ssl.SSLContext(ssl.PROTOCOL_TLSv1_2))
             else:
                 try:
-                    self._client.tls_set(ca_certs=ca_cert,
-                                         certfile=cert,
-                                         keyfile=private_key,
-                                         cert_reqs=ssl.CERT_REQUIRED,
-                                         tls_version=ssl.PROTOCOL_TLSv1_2,
-                                         ciphers=None)
+                    client.tls_set(ca_certs=ca_cert,
+                                   certfile=cert,
+                                   keyfile=private_key,
+                                   cert_reqs=ssl.CERT_REQUIRED,
+                                   tls_version=ssl.PROTOCOL_TLSv1_2,
+                                   ciphers=None)
                 except Exception as e:
                     self.__log.error("Cannot setup connection to broker %s using SSL. "
                                      "Please check your configuration.\nError: %s",
                                      self.get_name(), e)
                 if self.__broker["security"].get("insecure", False):
-                    self._client.tls_insecure_set(True)
+                    client.tls_insecure_set(True)
                     self.__log.debug("Connector tls_insecure_set: True")
                 else:
-                    self._client.tls_insecure_set(False)
+                    client.tls_insecure_set(False)
                     self.__log.debug("Connector tls_insecure_set: False")
         else:
             self.__log.debug("Connector connecting anonymously")
-        # Set up external MQTT broker callbacks ------------------------------------------------------------------------
-        self._client.on_connect = self._on_connect
-        self._client.on_message = self._on_message
-        self._client.on_subscribe = self._on_subscribe
-        self._client.on_disconnect = self._on_disconnect
-        # self._client.on_log = self._on_log
-
-        self.__msg_queue = Queue(self.__broker.get('maxMessageQueue', 1000000000))
-        self.__workers_thread_pool = []
-        self.__max_msg_number_for_worker = self.__broker.get('maxMessageNumberPerWorker', 10)
-        self.__max_number_of_workers = self.__broker.get('maxNumberOfWorkers', 100)
-
-        self._on_message_queue = Queue(self.__broker.get('maxProcessingMessageQueue', 1000000000))
-        self._on_message_thread = Thread(name='On Message', target=self._process_on_message, daemon=True)
-        self._on_message_thread.start()
+        return client
 
     def get_config(self):
         return self.config
@@ -327,6 +408,9 @@ class MqttConnector(Connector, Thread):
 
     def open(self):
         self.__stopped = False
+        self.__rpc_correlation.start()
+        for consumer_client in self.__consumer_clients:
+            consumer_client.start()
         self.start()
 
     def run(self):
@@ -341,6 +425,7 @@ class MqttConnector(Connector, Thread):
                     self.__connect()
 
                 self.__threads_manager()
+                self.__publish_pipeline.check_timeouts()
 
                 self.__stop_event.wait(timeout=0.2)
             except TimeoutError:
@@ -351,15 +436,8 @@ class MqttConnector(Connector, Thread):
     def __connect(self):
         while not self._connected and not self.__stopped:
             try:
-                if self._mqtt_version != 5:
-                    self._client.connect(self.__broker['host'], self.__broker.get('port', 1883))
-                else:
-                    properties = Properties(PacketTypes.CONNECT)
-                    properties.SessionExpiryInterval = self._sessionExpiryInterval
-                    self._client.connect(self.__broker['host'],
-                                         self.__broker.get('port', 1883),
-                                         clean_start=self._cleanStart,
-                                         properties=properties)
+                self._client.connect(self.__broker['host'], self.__broker.get('port', 1883),
+                                     **self.__get_connect_arguments())
                 self._client.loop_start()
                 if not self._connected:
                     sleep(1)
@@ -370,6 +448,22 @@ class MqttConnector(Connector, Thread):
                 self.__log.exception("Error while connecting to broker %s: %s", self.get_name(), e)
                 sleep(10)
 
+    def __get_connect_arguments(self):
+        if self._mqtt_version != 5:
+            return {}
+        properties = Properties(PacketTypes.CONNECT)
+        properties.SessionExpiryInterval = self._sessionExpiryInterval
+        return {'clean_start': self._cleanStart, 'properties': properties}
+
+    def __get_mapping_topic_filter(self, topic_filter):
+        if self.__consumer_clients_count > 1:
+            return get_shared_topic_filter(topic_filter, self.__shared_subscription_group)
+        return topic_filter
+
+    def __get_consumer_topic_filters(self):
+        return [(self.__get_mapping_topic_filter(mapping["topicFilter"]), mapping.get("subscriptionQos", 1))
+                for mapping in self.__mapping]
+
     def close(self):
         self.__stopped = True
         self.__stop_event.set()
@@ -378,8 +472,14 @@ class MqttConnector(Connector, Thread):
         except Exception as e:
             self.__log.exception(e)
         self._client.loop_stop()
+        self.__publish_pipeline.fail_all()
+        self.__rpc_correlation.stop()
+        for consumer_client in self.__consumer_clients:
+            consumer_client.stop()
         for worker in self.__workers_thread_pool:
             worker.stop()
+        if self.__process_pool is not None:
+            self.__process_pool.stop()
         self.__log.info('%s has been stopped.', self.get_name())
         self.__log.stop()
 
@@ -395,6 +495,7 @@ class MqttConnector(Connector, Thread):
             self.__subscribes_sent[message[1]] = topic
         except Exception as e:
             self.__log.exception(e)
+        return message[1]
 
     def _on_connect(self, client, userdata, flags, result_code, *extra_params):
         if result_code == 0:
@@ -411,9 +512,12 @@ class MqttConnector(Connector, Thread):
                              extra_params)
 
             self.__mapping_sub_topics = {}
+            self.__topic_handlers.clear()
+            process_converter_ids = {}
+            process_converter_configs = {}
 
             # Setup data upload requests handling ----------------------------------------------------------------------
-            for mapping in self.__mapping:
+            for mapping_index, mapping in enumerate(self.__mapping):
                 try:
                     # Load converter for this mapping entry ------------------------------------------------------------
                     # mappings are guaranteed to have topicFilter and converter fields. See __init__
@@ -459,6 +563,13 @@ class MqttConnector(Connector, Thread):
                         self.__log.debug('Converter %s for topic %s - found in cache!', converter_class_name,
                                          mapping["topicFilter"])
 
+                    if self.__process_pool is not None:
+                        # Mappings may share a topic filter, so every mapping gets its own converter id,
+                        # a shared converter is loaded from the first mapping using it, as in this process
+                        converter_id = ('shared', sharing_id) if sharing_id else ('mapping', mapping_index)
+                        process_converter_ids[converter] = converter_id
+                        process_converter_configs.setdefault(converter_id, (converter_class_name, mapping))
+
                     # Setup regexp topic acceptance list ---------------------------------------------------------------
                     # Check if topic is shared subscription type
                     # (an exception is aws topics that do not support shared subscription)
@@ -473,9 +584,14 @@ class MqttConnector(Connector, Thread):
                         self.__mapping_sub_topics[regex_topic] = []
 
                     self.__mapping_sub_topics[regex_topic].append(converter)
+                    # Mappings with "rawPayload" pass the message payload bytes to the converter as is
+                    self.__topic_handlers.add(strip_shared_subscription_prefix(mapping["topicFilter"]),
+                                              MAPPING_HANDLER,
+                                              (converter, mapping["converter"].get("rawPayload", False)))
 
                     # Subscribe to appropriate topic -------------------------------------------------------------------
-                    self.__subscribe(mapping["topicFilter"], mapping.get("subscriptionQos", 1))
+                    self.__subscribe(self.__get_mapping_topic_filter(mapping["topicFilter"]),
+                                     mapping.get("subscriptionQos", 1))
 
                     self.__log.info('Connector "%s" subscribe to %s',
                                     self.get_name(),
@@ -488,22 +604,38 @@ class MqttConnector(Connector, Thread):
             for request in [entry for entry in self.__connect_requests if entry is not None]:
                 # requests are guaranteed to have topicFilter field. See __init__
                 self.__subscribe(request["topicFilter"], request.get("subscriptionQos", 1))
-                topic_filter = TBUtility.topic_to_regex(request.get("topicFilter"))
-                self.__connect_requests_sub_topics[topic_filter] = request
+                self.__topic_handlers.add(request["topicFilter"], CONNECT_REQUEST_HANDLER, request)
 
             # Setup disconnection requests handling --------------------------------------------------------------------
             for request in [entry for entry in self.__disconnect_requests if entry is not None]:
                 # requests are guaranteed to have topicFilter field. See __init__
                 self.__subscribe(request["topicFilter"], request.get("subscriptionQos", 1))
-                topic_filter = TBUtility.topic_to_regex(request.get("topicFilter"))
-                self.__disconnect_requests_sub_topics[topic_filter] = request
+                self.__topic_handlers.add(request["topicFilter"], DISCONNECT_REQUEST_HANDLER, request)
 
             # Setup attributes requests handling -----------------------------------------------------------------------
             for request in [entry for entry in self.__attribute_requests if entry is not None]:
                 # requests are guaranteed to have topicFilter field. See __init__
                 self.__subscribe(request["topicFilter"], request.get("subscriptionQos", 1))
-                topic_filter = TBUtility.topic_to_regex(request.get("topicFilter"))
-                self.__attribute_requests_sub_topics[topic_filter] = request
+                self.__topic_handlers.add(request["topicFilter"], ATTRIBUTE_REQUEST_HANDLER, request)
+
+            # Setup RPC responses handling ----------------------------------------------------------------------------
+            # One wildcard subscription per response topic template instead of a subscription per request
+            if self.__broker.get('rpcResponseWildcardSubscriptions', True):
+                self.__rpc_correlation.set_response_filters(self.__get_rpc_response_filters())
+
+            # Restore response topic subscriptions of RPCs still waiting for a response
+            self.__rpc_correlation.resubscribe()
+
+            # Updated in place, the process pool dispatcher holds a reference to the converter ids
+            stale_converters = self.__process_converter_ids.keys() - process_converter_ids.keys()
+            self.__process_converter_ids.update(process_converter_ids)
+            for converter in stale_converters:
+                self.__process_converter_ids.pop(converter, None)
+
+            if self.__process_pool is not None and (not self.__process_pool.is_started()
+                                                    or process_converter_configs != self.__process_converter_configs):
+                self.__process_converter_configs = process_converter_configs
+                self.__process_pool.start(process_converter_configs)
         else:
             result_codes = RESULT_CODES_V5 if self._mqtt_version == 5 else RESULT_CODES_V3
             rc = result_code.value if self._mqtt_version == 5 else result_code
@@ -514,10 +646,28 @@ class MqttConnector(Connector, Thread):
 
         self._init_send_current_converter_config()
 
+    def __get_rpc_response_filters(self):
+        response_filters = {}
+        for rpc_config in self.__server_side_rpc:
+            if not rpc_config.get("responseTopicExpression") or not rpc_config.get("responseTimeout"):
+                continue
+            response_filter = get_response_topic_filter(rpc_config["responseTopicExpression"])
+            if response_filter is None:
+                self.__log.warning("Response topic %s has no constant levels, "
+                                   "it will be subscribed to for every RPC request",
+                                   rpc_config["responseTopicExpression"])
+                continue
+            qos = rpc_config.get("responseTopicQoS", 1)
+            response_filters[response_filter] = max(qos, response_filters.get(response_filter, qos))
+        return response_filters
+
     def _on_disconnect(self, *args):
         self._connected = False
         self.__log.debug('"%s" was disconnected. %s', self.get_name(), str(args))
 
+    def _on_publish(self, client, userdata, mid, *args):
+        self.__publish_pipeline.on_publish(mid)
+
     def _on_log(self, *args):
         self.__log.debug(args)
 
@@ -539,11 +689,20 @@ class MqttConnector(Connector, Thread):
         if self.__subscribes_sent.get(mid) is not None:
             del self.__subscribes_sent[mid]
 
+        self.__rpc_correlation.on_subscribed(mid)
+
     def put_data_to_convert(self, converter, message, content) -> bool:
-        if not self.__msg_queue.full():
-            self.__msg_queue.put((converter.convert, message.topic, content), True, 100)
+        try:
+            self.__msg_queue.put_nowait((converter, message.topic, content))
             return True
-        return False
+        except Full:
+            self.__messages_dropped_queue_full += 1
+            StatisticsService.count_connector_message(self.name, stat_parameter_name='messagesDroppedQueueFull')
+            self.__hot_log.warning("convertQueueFull",
+                                   "Converter queue is full (%d messages dropped in total), "
+                                   "dropping message from topic %s",
+                                   self.__messages_dropped_queue_full, message.topic)
+            return False
 
     def _save_converted_msg(self, topic, data):
         data.add_to_metadata({DATA_RETRIEVING_STARTED: int(time() * 1000)})
@@ -552,7 +711,28 @@ class MqttConnector(Connector, Thread):
             self.statistics['MessagesSent'] += 1
             self.__log.debug("Successfully converted message from topic %s", topic)
 
+    def _save_converted_batch(self, batch, results):
+        converted_ts = int(time() * 1000)
+        for (_, topic, _), converted_data in zip(batch, results):
+            if not isinstance(converted_data, list):
+                converted_data = [converted_data]
+            for converted_item in converted_data:
+                if converted_item and (converted_item.telemetry_datapoints_count > 0 or
+                                       converted_item.attributes_datapoints_count > 0):
+                    converted_item.add_to_metadata({CONVERTED_TS_PARAMETER: converted_ts})
+                    self._save_converted_msg(topic, converted_item)
+
     def __threads_manager(self):
+        if self.__process_pool is not None:
+            if len(self.__workers_thread_pool) == 0:
+                dispatcher = MqttConnector.ProcessPoolDispatcher(self.__msg_queue, self.__process_pool,
+                                                                 self.__process_converter_ids,
+                                                                 self._save_converted_batch,
+                                                                 self.__process_pool_batch_size, self.__log)
+                self.__workers_thread_pool.append(dispatcher)
+                dispatcher.start()
+            return
+
         if len(self.__workers_thread_pool) == 0:
             worker = MqttConnector.ConverterWorker("Main Worker", self.__msg_queue, self._save_converted_msg)
             self.__workers_thread_pool.append(worker)
@@ -575,7 +755,14 @@ class MqttConnector(Connector, Thread):
         StatisticsService.count_connector_message(self.name, stat_parameter_name='connectorMsgsReceived')
         StatisticsService.count_connector_bytes(self.name, message.payload,
                                                 stat_parameter_name='connectorBytesReceived')
-        self._on_message_queue.put((client, userdata, message))
+        if len(self._on_message_queues) == 1:
+            self._on_message_queue.put((client, userdata, message))
+        else:
+            self._on_message_queues[hash(message.topic) % len(self._on_message_queues)].put((client, userdata,
+                                                                                            message))
+
+    def __get_on_message_queue_depth(self):
+        return sum(on_message_queue.qsize() for on_message_queue in self._on_message_queues)
 
     @staticmethod
     def _parse_device_info(device_info, topic, content):
@@ -606,176 +793,207 @@ class MqttConnector(Connector, Thread):
 
         return found_device_name, found_device_type
 
-    def _process_on_message(self):
+    def _process_on_message(self, on_message_queue=None):
+        on_message_queue = on_message_queue or self._on_message_queue
         while not self.__stopped:
-            if not self._on_message_queue.empty():
-                client, userdata, message = self._on_message_queue.get_nowait()
-
-                self.statistics['MessagesReceived'] += 1
-                content = TBUtility.decode(message)
-
-                # Check if message topic exists in mappings "i.e., I'm posting telemetry/attributes" -------------------
-                topic_handlers = [regex for regex in self.__mapping_sub_topics if fullmatch(regex, message.topic)]
-
-                if topic_handlers:
-                    # Note: every topic may be associated to one or more converter.
-                    # This means that a single MQTT message
-                    # may produce more than one message towards ThingsBoard. This also means that I cannot return after
-                    # the first successful conversion: I got to use all the available ones.
-                    # I will use a flag to understand whether at least one converter succeeded
-                    request_handled = False
-
-                    for topic in topic_handlers:
-                        available_converters = self.__mapping_sub_topics[topic]
-                        for converter in available_converters:
-                            try:
-                                request_handled = self.put_data_to_convert(converter, message, content)
-                            except Exception as e:
-                                self.__log.exception(e)
-
-                    if not request_handled:
-                        self.__log.error('Cannot find converter for the topic:"%s"! Client: %s, User data: %s',
-                                         message.topic,
-                                         str(client),
-                                         str(userdata))
-
-                    # Note: if I'm in this branch, this was for sure a telemetry/attribute push message
-                    # => Execution must end here both in case of failure and success
-                    continue
+            try:
+                batch = [on_message_queue.get(timeout=self.__on_message_queue_timeout)]
+            except Empty:
+                continue
 
-                # Check if message topic exists in connection handlers "i.e., I'm connecting a device" -----------------
-                topic_handlers = [regex for regex in self.__connect_requests_sub_topics if
-                                  fullmatch(regex, message.topic)]
+            while len(batch) < self.__on_message_batch_size:
+                try:
+                    batch.append(on_message_queue.get_nowait())
+                except Empty:
+                    break
 
-                if topic_handlers:
-                    for topic in topic_handlers:
-                        handler = self.__connect_requests_sub_topics[topic]
+            StatisticsService.count_connector_message(self.name, stat_parameter_name='onMessageBatches')
+            count_connector_peak(self.name, 'onMessageQueueMaxDepth', self.__get_on_message_queue_depth())
+            count_connector_peak(self.name, 'convertQueueMaxDepth', self.__msg_queue.qsize())
 
-                        # Get device name, either from topic or from content
-                        device_info = handler.get("deviceInfo", {})
+            for client, userdata, message in batch:
+                try:
+                    self.__process_message(client, userdata, message)
+                except Exception as e:
+                    self.__log.exception("Error during processing message from topic %s: %s", message.topic, e)
 
-                        found_device_name, found_device_type = MqttConnector._parse_device_info(device_info,
-                                                                                                message.topic, content)
+    def __process_message(self, client, userdata, message):
+        self.statistics['MessagesReceived'] += 1
 
-                        if found_device_name is None:
-                            self.__log.error("Device name missing from connection request")
-                            continue
+        # The payload is decoded only for handlers that need the content, see _decode_payload
+        handlers = self.__topic_handlers.match(message.topic)
 
-                        # Note: device must be added even if it is already known locally: else ThingsBoard
-                        # will not send RPCs and attribute updates
-                        self.__log.info("Connecting device %s of type %s", found_device_name, found_device_type)
-                        self.__gateway.add_device(found_device_name, {"connector": self}, device_type=found_device_type)
+        # Check if message topic exists in mappings "i.e., I'm posting telemetry/attributes" -------------------
+        available_converters = handlers.get(MAPPING_HANDLER)
 
-                    # Note: if I'm in this branch, this was for sure a connection message
-                    # => Execution must end here both in case of failure and success
-                    continue
+        if available_converters:
+            # Note: every topic may be associated to one or more converter.
+            # This means that a single MQTT message
+            # may produce more than one message towards ThingsBoard. This also means that I cannot return after
+            # the first successful conversion: I got to use all the available ones.
+            # I will use a flag to understand whether at least one converter succeeded
+            request_handled = False
+            content = None
 
-                # Check if message topic exists in disconnection handlers "i.e., I'm disconnecting a device" -----------
-                topic_handlers = [regex for regex in self.__disconnect_requests_sub_topics if
-                                  fullmatch(regex, message.topic)]
-                if topic_handlers:
-                    for topic in topic_handlers:
-                        handler = self.__disconnect_requests_sub_topics[topic]
+            for converter, raw_payload in available_converters:
+                try:
+                    if raw_payload:
+                        request_handled = self.put_data_to_convert(converter, message, message.payload)
+                        continue
+                    if content is None:
+                        content = self._decode_payload(message)
+                    request_handled = self.put_data_to_convert(converter, message, content)
+                except Exception as e:
+                    self.__log.exception(e)
 
-                        # Get device name, either from topic or from content
-                        device_info = handler.get("deviceInfo", {})
-                        found_device_name, found_device_type = MqttConnector._parse_device_info(device_info,
-                                                                                                message.topic, content)
+            if not request_handled:
+                self.__log.error('Cannot find converter for the topic:"%s"! Client: %s, User data: %s',
+                                 message.topic,
+                                 str(client),
+                                 str(userdata))
 
-                        if found_device_name is None:
-                            self.__log.error("Device name missing from disconnection request")
-                            continue
+            # Note: if I'm in this branch, this was for sure a telemetry/attribute push message
+            # => Execution must end here both in case of failure and success
+            return
 
-                        if found_device_name in self.__gateway.get_devices():
-                            self.__log.info("Disconnecting device %s of type %s", found_device_name, found_device_type)
-                            self.__gateway.del_device(found_device_name)
-                        else:
-                            self.__log.info("Device %s was not connected", found_device_name)
+        content = self._decode_payload(message) if handlers else None
+
+        # Check if message topic exists in connection handlers "i.e., I'm connecting a device" -----------------
+        topic_handlers = handlers.get(CONNECT_REQUEST_HANDLER)
 
-                        break
+        if topic_handlers:
+            for handler in topic_handlers:
+                # Get device name, either from topic or from content
+                device_info = handler.get("deviceInfo", {})
 
-                    # Note: if I'm in this branch, this was for sure a disconnection message
-                    # => Execution must end here both in case of failure and success
+                found_device_name, found_device_type = MqttConnector._parse_device_info(device_info,
+                                                                                        message.topic, content)
+
+                if found_device_name is None:
+                    self.__log.error("Device name missing from connection request")
                     continue
 
-                # Check if message topic exists in attribute request handlers "i.e., I'm asking for a shared attribute"
-                topic_handlers = [regex for regex in self.__attribute_requests_sub_topics if
-                                  fullmatch(regex, message.topic)]
-                if topic_handlers:
-                    try:
-                        for topic in topic_handlers:
-                            handler = self.__attribute_requests_sub_topics[topic]
-
-                            found_attribute_names = None
-
-                            # Get device name, either from topic or from content
-                            device_info = handler.get("deviceInfo", {})
-                            found_device_name, _ = MqttConnector._parse_device_info(device_info, message.topic, content)
-
-                            # Get attribute name, either from topic or from content
-                            if handler.get("attributeNameExpressionSource") == "topic":
-                                attribute_name_match = search(handler["attributeNameExpression"], message.topic)
-                                if attribute_name_match is not None:
-                                    found_attribute_names = attribute_name_match.group(0)
-                            elif handler.get("attributeNameExpressionSource") == "message" or handler.get(
-                                    "attributeNameExpressionSource") == "constant":
-                                found_attribute_names = list(filter(lambda x: x is not None,
-                                                                    TBUtility.get_values(
-                                                                        handler["attributeNameExpression"],
-                                                                        content)))
-
-                            if found_device_name is None:
-                                self.__log.error("Device name missing from attribute request")
-                                continue
-
-                            if found_attribute_names is None:
-                                self.__log.error("Attribute name missing from attribute request")
-                                continue
-
-                            self.__log.info("Will retrieve attribute %s of %s", found_attribute_names,
-                                            found_device_name)
-                            scope = 'shared'
-                            if handler.get('scope') is not None:
-                                scope = handler.get('scope')
-                            if content and TBUtility.get_value(f'${scope}', content, get_tag=True) is not None:
-                                scope = TBUtility.get_value(f'${scope}', content, get_tag=True)
-
-                            request_arguments = (
-                                    found_device_name,
-                                    found_attribute_names,
-                                    lambda data, *args: self.notify_attribute(
-                                        data,
-                                        found_attribute_names,
-                                        handler.get("topicExpression"),
-                                        handler.get("valueExpression"),
-                                        handler.get('retain', False)))
-
-                            if scope == 'client':
-                                self.__gateway.tb_client.client.gw_request_client_attributes(*request_arguments)
-                            else:
-                                self.__gateway.tb_client.client.gw_request_shared_attributes(*request_arguments)
-                            break
+                # Note: device must be added even if it is already known locally: else ThingsBoard
+                # will not send RPCs and attribute updates
+                self.__log.info("Connecting device %s of type %s", found_device_name, found_device_type)
+                self.__gateway.add_device(found_device_name, {"connector": self}, device_type=found_device_type)
 
-                    except Exception as e:
-                        self.__log.exception(e)
+            # Note: if I'm in this branch, this was for sure a connection message
+            # => Execution must end here both in case of failure and success
+            return
 
-                    # Note: if I'm in this branch, this was for sure an attribute request message
-                    # => Execution must end here both in case of failure and success
+        # Check if message topic exists in disconnection handlers "i.e., I'm disconnecting a device" -----------
+        topic_handlers = handlers.get(DISCONNECT_REQUEST_HANDLER)
+        if topic_handlers:
+            for handler in topic_handlers:
+                # Get device name, either from topic or from content
+                device_info = handler.get("deviceInfo", {})
+                found_device_name, found_device_type = MqttConnector._parse_device_info(device_info,
+                                                                                        message.topic, content)
+
+                if found_device_name is None:
+                    self.__log.error("Device name missing from disconnection request")
                     continue
 
-                # Check if message topic exists in RPC handlers --------------------------------------------------------
-                # The gateway is expecting for this message => no wildcards here, the topic must be evaluated as is
+                if found_device_name in self.__gateway.get_devices():
+                    self.__log.info("Disconnecting device %s of type %s", found_device_name, found_device_type)
+                    self.__gateway.del_device(found_device_name)
+                else:
+                    self.__log.info("Device %s was not connected", found_device_name)
 
-                if self.__gateway.is_rpc_in_progress(message.topic):
-                    self.__log.info("RPC response arrived. Forwarding it to thingsboard.")
-                    self.__gateway.rpc_with_reply_processing(message.topic, content)
-                    continue
+                break
 
-                self.__log.debug("Received message to topic \"%s\" with unknown interpreter data: \n\n\"%s\"",
-                                 message.topic,
-                                 content)
-            else:
-                sleep(.2)
+            # Note: if I'm in this branch, this was for sure a disconnection message
+            # => Execution must end here both in case of failure and success
+            return
+
+        # Check if message topic exists in attribute request handlers "i.e., I'm asking for a shared attribute"
+        topic_handlers = handlers.get(ATTRIBUTE_REQUEST_HANDLER)
+        if topic_handlers:
+            try:
+                for handler in topic_handlers:
+                    found_attribute_names = None
+
+                    # Get device name, either from topic or from content
+                    device_info = handler.get("deviceInfo", {})
+                    found_device_name, _ = MqttConnector._parse_device_info(device_info, message.topic, content)
+
+                    # Get attribute name, either from topic or from content
+                    if handler.get("attributeNameExpressionSource") == "topic":
+                        attribute_name_match = search(handler["attributeNameExpression"], message.topic)
+                        if attribute_name_match is not None:
+                            found_attribute_names = attribute_name_match.group(0)
+                    elif handler.get("attributeNameExpressionSource") == "message" or handler.get(
+                            "attributeNameExpressionSource") == "constant":
+                        found_attribute_names = list(filter(lambda x: x is not None,
+                                                            TBUtility.get_values(
+                                                                handler["attributeNameExpression"],
+                                                                content)))
+
+                    if found_device_name is None:
+                        self.__log.error("Device name missing from attribute request")
+                        continue
+
+                    if found_attribute_names is None:
+                        self.__log.error("Attribute name missing from attribute request")
+                        continue
+
+                    self.__log.info("Will retrieve attribute %s of %s", found_attribute_names,
+                                    found_device_name)
+                    scope = 'shared'
+                    if handler.get('scope') is not None:
+                        scope = handler.get('scope')
+                    if content and TBUtility.get_value(f'${scope}', content, get_tag=True) is not None:
+                        scope = TBUtility.get_value(f'${scope}', content, get_tag=True)
+
+                    request_arguments = (
+                            found_device_name,
+                            found_attribute_names,
+                            lambda data, *args: self.notify_attribute(
+                                data,
+                                found_attribute_names,
+                                handler.get("topicExpression"),
+                                handler.get("valueExpression"),
+                                handler.get('retain', False)))
+
+                    if scope == 'client':
+                        self.__gateway.tb_client.client.gw_request_client_attributes(*request_arguments)
+                    else:
+                        self.__gateway.tb_client.client.gw_request_shared_attributes(*request_arguments)
+                    break
+
+            except Exception as e:
+                self.__log.exception(e)
+
+            # Note: if I'm in this branch, this was for sure an attribute request message
+            # => Execution must end here both in case of failure and success
+            return
+
+        # Check if message topic exists in RPC handlers --------------------------------------------------------
+        # The gateway is expecting for this message => no wildcards here, the topic must be evaluated as is
+
+        rpc_content = self.__rpc_correlation.resolve(message.topic)
+        if rpc_content is not None:
+            self.__log.info("RPC response arrived. Forwarding it to thingsboard.")
+            self.__gateway.send_rpc_reply(device=rpc_content.get("device"), req_id=rpc_content["data"]["id"],
+                                          content=content if handlers else self._decode_payload(message),
+                                          to_connector_rpc=True if rpc_content.get('device') is None else False) # noqa
+            return
+
+        self.__log.debug("Received message to topic \"%s\" with unknown interpreter data: \n\n\"%s\"",
+                         message.topic,
+                         message.payload)
+
+    @staticmethod
+    def _decode_payload(message):
+        """
+        Same result as TBUtility.decode: orjson parses the payload buffer without decoding it to str first,
+        payloads orjson does not accept (not JSON, invalid UTF-8, NaN, big integers) go through TBUtility.decode.
+        """
+        try:
+            return orjson.loads(message.payload)
+        except (orjson.JSONDecodeError, TypeError):
+            return TBUtility.decode(message)
 
     def notify_attribute(self, incoming_data, attribute_name, topic_expression, value_expression, retain):
         if incoming_data.get("device") is None or incoming_data.get("value", incoming_data.get('values')) is None:
@@ -794,51 +1012,62 @@ class MqttConnector(Connector, Thread):
         else:
             data = orjson.dumps(attribute_values)
 
-        self._client.publish(topic, data, retain=retain).wait_for_publish()
+        self.__publish_pipeline.publish(topic, data, retain=retain)
 
     @CollectAllReceivedBytesStatistics(start_stat_type='allReceivedBytesFromTB')
     def on_attributes_update(self, content):
-        if self.__attribute_updates:
-            for attribute_update in self.__attribute_updates:
-                if match(attribute_update["deviceNameFilter"], content["device"]):
-                    for attribute_key in content["data"]:
-                        if match(attribute_update["attributeFilter"], attribute_key):
-                            received_value = content["data"][attribute_key]
-                            if isinstance(received_value, dict) or isinstance(received_value, list):
-                                received_value = orjson.dumps(received_value)
-                            elif isinstance(received_value, bool):
-                                received_value = str(received_value).lower()
-                            elif isinstance(received_value, float) or isinstance(received_value, int):
-                                received_value = str(received_value)
-                            elif received_value is None:
-                                received_value = "null"
-                            try:
-                                topic = attribute_update["topicExpression"] \
-                                    .replace("${deviceName}", str(content["device"])) \
-                                    .replace("${attributeKey}", str(attribute_key)) \
-                                    .replace("${attributeValue}", received_value)
-                            except KeyError as e:
-                                self.__log.exception("Cannot form topic, key %s - not found", e)
-                                raise e
-                            try:
-                                data = attribute_update["valueExpression"] \
-                                    .replace("${attributeKey}", str(attribute_key)) \
-                                    .replace("${attributeValue}", received_value) \
-                                    .replace("${deviceName}", str(content["device"]))
-
-                            except KeyError as e:
-                                self.__log.exception("Cannot form topic, key %s - not found", e)
-                                raise e
-
-                            self._publish(topic, data, attribute_update.get('retain', False))
-                            self.__log.debug("Attribute Update data: %s for device %s to topic: %s", data,
-                                             content["device"], topic)
-                        else:
-                            self.__log.error("Cannot find attributeName by filter in message with data: %s", content)
-                else:
-                    self.__log.error("Cannot find deviceName by filter in message with data: %s", content)
-        else:
+        if not self.__attribute_updates_index:
             self.__log.error("Attribute updates config not found.")
+            return
+
+        device_name = content["device"]
+        device_handlers = self.__attribute_updates_index.get_device_handlers(device_name)
+        if not device_handlers:
+            self.__log.error("Cannot find deviceName by filter in message with data: %s", content)
+            return
+
+        published = 0
+        for attribute_key, received_value in content["data"].items():
+            attribute_matched = False
+            for handler_id, attribute_filter, attribute_update in device_handlers:
+                if not self.__attribute_updates_index.is_attribute_matched(handler_id, attribute_filter,
+                                                                           attribute_key):
+                    continue
+                attribute_matched = True
+
+                if isinstance(received_value, dict) or isinstance(received_value, list):
+                    received_value = orjson.dumps(received_value)
+                elif isinstance(received_value, bool):
+                    received_value = str(received_value).lower()
+                elif isinstance(received_value, float) or isinstance(received_value, int):
+                    received_value = str(received_value)
+                elif received_value is None:
+                    received_value = "null"
+                try:
+                    topic = attribute_update["topicExpression"] \
+                        .replace("${deviceName}", str(device_name)) \
+                        .replace("${attributeKey}", str(attribute_key)) \
+                        .replace("${attributeValue}", received_value)
+                except KeyError as e:
+                    self.__log.exception("Cannot form topic, key %s - not found", e)
+                    raise e
+                try:
+                    data = attribute_update["valueExpression"] \
+                        .replace("${attributeKey}", str(attribute_key)) \
+                        .replace("${attributeValue}", received_value) \
+                        .replace("${deviceName}", str(device_name))
+                except KeyError as e:
+                    self.__log.exception("Cannot form topic, key %s - not found", e)
+                    raise e
+
+                self._publish(topic, data, attribute_update.get('retain', False))
+                published += 1
+                self.__log.debug("Attribute Update data: %s for device %s to topic: %s", data, device_name, topic)
+
+            if not attribute_matched:
+                self.__log.error("Cannot find attributeName by filter in message with data: %s", content)
+
+        self.__log.debug("Queued %d attribute update messages for device %s", published, device_name)
 
     def __process_rpc_request(self, content, rpc_config):
         try:
@@ -848,43 +1077,7 @@ class MqttConnector(Connector, Thread):
             expects_response = rpc_config.get("responseTopicExpression")
             defines_timeout = rpc_config.get("responseTimeout")
 
-            # 2-way RPC setup
-            if expects_response and defines_timeout:
-                expected_response_topic = rpc_config["responseTopicExpression"] \
-                    .replace("${methodName}", str(content['data']['method'])) \
-                    .replace("${requestId}", str(content["data"]["id"]))
-
-                if content.get('device'):
-                    expected_response_topic = expected_response_topic.replace("${deviceName}", str(content["device"]))
-
-                expected_response_topic = TBUtility.replace_params_tags(expected_response_topic, content)
-
-                timeout = time() * 1000 + rpc_config.get("responseTimeout")
-
-                # Start listening on the response topic
-                self.__log.info("Subscribing to: %s", expected_response_topic)
-                self.__subscribe(expected_response_topic, rpc_config.get("responseTopicQoS", 1))
-
-                # Wait for subscription to be carried out
-                sub_response_timeout = 10
-
-                while expected_response_topic in self.__subscribes_sent.values():
-                    sub_response_timeout -= 1
-                    sleep(0.1)
-                    if sub_response_timeout == 0:
-                        break
-
-                # Ask the gateway to enqueue this as an RPC response
-                self.__gateway.register_rpc_request_timeout(content,
-                                                            timeout,
-                                                            expected_response_topic,
-                                                            self.rpc_cancel_processing)
-
-                # Wait for RPC to be successfully enqueued, which never fails.
-                while self.__gateway.is_rpc_in_progress(expected_response_topic):
-                    sleep(0.1)
-
-            elif expects_response and not defines_timeout:
+            if expects_response and not defines_timeout:
                 self.__log.info("2-way RPC without timeout: treating as 1-way")
 
             # Actually reach out for the device
@@ -912,32 +1105,60 @@ class MqttConnector(Connector, Thread):
             for (tag, value) in zip(data_to_send_tags, data_to_send_values):
                 data_to_send = data_to_send.replace('${' + tag + '}', orjson.dumps(value).decode('utf-8'))
 
-            try:
-                self.__log.info("Publishing to: %s with data %s", request_topic, data_to_send)
-                result = None
-                try:
-                    result = self._publish(request_topic, data_to_send, rpc_config.get('retain', False))
-                except Exception as e:
-                    self.__log.exception("Error during publishing to target broker: %r", e)
-                    self.__gateway.send_rpc_reply(device=content.get("device"),
-                                                  req_id=content["data"]["id"],
-                                                  content={
-                                                      "error": str.format("Error on publish to target broker: %r",
-                                                                          str(e))},
-                                                  success_sent=False, to_connector_rpc=True if content.get('device') is None else False) # noqa
-                    return
-                if not expects_response or not defines_timeout:
-                    self.__log.info("One-way RPC: sending ack to ThingsBoard immediately")
-                    self.__gateway.send_rpc_reply(device=content.get('device'), req_id=content["data"]["id"],
-                                                  success_sent=result is not None, to_connector_rpc=True if content.get('device') is None else False) # noqa
-
-                # Everything went out smoothly: RPC is served
+            # 2-way RPC setup
+            if expects_response and defines_timeout:
+                expected_response_topic = rpc_config["responseTopicExpression"] \
+                    .replace("${methodName}", str(content['data']['method'])) \
+                    .replace("${requestId}", str(content["data"]["id"]))
+
+                if content.get('device'):
+                    expected_response_topic = expected_response_topic.replace("${deviceName}", str(content["device"]))
+
+                expected_response_topic = TBUtility.replace_params_tags(expected_response_topic, content)
+
+                def send_request(pending_rpc):
+                    def on_published(published):
+                        if not published and self.__rpc_correlation.cancel(pending_rpc):
+                            self.__send_rpc_publish_error(content, "message was not published")
+
+                    self.__send_rpc_request(content, request_topic, data_to_send, rpc_config, on_published)
+
+                # The request is published when the response topic subscription is acknowledged
+                self.__log.info("Subscribing to: %s", expected_response_topic)
+                self.__rpc_correlation.request(expected_response_topic, rpc_config.get("responseTopicQoS", 1),
+                                               rpc_config["responseTimeout"] / 1000, content, send_request)
                 return
-            except Exception as e:
-                self.__log.exception("Error during publishing RPC response: ", exc_info=e)
+
+            def on_published(published):
+                self.__log.info("One-way RPC: sending ack to ThingsBoard on publish completion")
+                self.__gateway.send_rpc_reply(device=content.get('device'), req_id=content["data"]["id"],
+                                              success_sent=published, to_connector_rpc=True if content.get('device') is None else False) # noqa
+
+            self.__send_rpc_request(content, request_topic, data_to_send, rpc_config, on_published)
         except Exception as e:
             self.__log.exception("Error during processing RPC request: ", exc_info=e)
 
+    def __send_rpc_request(self, content, request_topic, data_to_send, rpc_config, callback):
+        self.__log.info("Publishing to: %s with data %s", request_topic, data_to_send)
+        try:
+            self._publish(request_topic, data_to_send, rpc_config.get('retain', False), callback=callback)
+        except Exception as e:
+            self.__log.exception("Error during publishing to target broker: %r", e)
+            self.__send_rpc_publish_error(content, str(e))
+
+    def __send_rpc_publish_error(self, content, error):
+        self.__gateway.send_rpc_reply(device=content.get("device"),
+                                      req_id=content["data"]["id"],
+                                      content={"error": str.format("Error on publish to target broker: %r", error)},
+                                      success_sent=False, to_connector_rpc=True if content.get('device') is None else False) # noqa
+
+    def __on_rpc_timeout(self, pending_rpc):
+        # Same reply as the gateway sends for requests registered with register_rpc_request_timeout
+        self.__log.info("RPC response timeout for topic %s", pending_rpc.topic)
+        self.__gateway.send_rpc_reply(device=pending_rpc.content.get("device"),
+                                      req_id=pending_rpc.content["data"]["id"],
+                                      success_sent=False, to_connector_rpc=True if pending_rpc.content.get('device') is None else False) # noqa
+
     @CollectAllReceivedBytesStatistics(start_stat_type='allReceivedBytesFromTB')
     def server_side_rpc_handler(self, content):
         try:
@@ -987,15 +1208,13 @@ class MqttConnector(Connector, Thread):
             self.__log.exception("Error during handling RPC request", exc_info=e)
 
     @CustomCollectStatistics(start_stat_type='allBytesSentToDevices')
-    def _publish(self, request_topic, data_to_send, retain):
-        result = False
-        try:
-            if self._connected and self._client is not None and self._client.is_connected():
-                self._client.publish(request_topic, data_to_send, retain).wait_for_publish()
-                result = True
-        except Exception as e:
-            self.__log.error("Error during publishing to target broker: %r", e)
-        return result
+    def _publish(self, request_topic, data_to_send, retain, callback=None):
+        """Queues the message without waiting for the broker, callback receives the publish result."""
+        if self._connected and self._client is not None and self._client.is_connected():
+            return self.__publish_pipeline.publish(request_topic, data_to_send, retain=retain, callback=callback)
+        if callback is not None:
+            callback(False)
+        return False
 
     def rpc_cancel_processing(self, topic):
         self.__log.info("RPC canceled or terminated. Unsubscribing from %s", topic)
@@ -1031,6 +1250,10 @@ class MqttConnector(Connector, Thread):
 
                 self.__gateway.update_connector_config_file(self.name, self.config)
 
+                # Converters in worker processes are loaded from mappings, so they have to be reloaded
+                if self.__process_pool is not None and self.__process_pool.is_started():
+                    self.__process_pool.start(self.__process_converter_configs)
+
     def _init_send_current_converter_config(self):
         if self.__gateway.tb_client is not None and self.__gateway.tb_client.is_connected():
             for converter_obj in self.get_converters():
@@ -1057,23 +1280,27 @@ class MqttConnector(Connector, Thread):
         def run(self):
             while not self.stopped:
                 try:
-                    batch = []
-                    for _ in range(self.__batch_size):
+                    try:
+                        batch = [self.__msg_queue.get(timeout=1)]
+                    except Empty:
+                        continue
+
+                    while len(batch) < self.__batch_size:
                         try:
                             batch.append(self.__msg_queue.get_nowait())
                         except Empty:
                             break
 
-                    if not batch:
-                        self.__stop_event.wait(0.01)
-                        continue
-
-                    for convert_function, config, incoming_data in batch:
-                        converted_data: ConvertedData = convert_function(config, incoming_data)
-                        converted_data.add_to_metadata({CONVERTED_TS_PARAMETER: int(time() * 1000)})
-                        if converted_data and (converted_data.telemetry_datapoints_count > 0 or
-                                               converted_data.attributes_datapoints_count > 0):
-                            self.__send_result(config, converted_data)
+                    for converter, topic, incoming_data in batch:
+                        converted_data = converter.convert(topic, incoming_data)
+                        # JSON arrays are converted into a list with ConvertedData per device
+                        if not isinstance(converted_data, list):
+                            converted_data = [converted_data]
+                        for converted_item in converted_data:
+                            if converted_item and (converted_item.telemetry_datapoints_count > 0 or
+                                                   converted_item.attributes_datapoints_count > 0):
+                                converted_item.add_to_metadata({CONVERTED_TS_PARAMETER: int(time() * 1000)})
+                                self.__send_result(topic, converted_item)
                 except Exception as e:
                     # Log the exception if needed
                     print("Error in worker: ", e)
@@ -1082,3 +1309,39 @@ class MqttConnector(Connector, Thread):
         def stop(self):
             self.stopped = True
             self.__stop_event.set()
+
+    class ProcessPoolDispatcher(Thread):
+        def __init__(self, incoming_queue, process_pool, converter_ids, send_results, batch_size, logger):
+            super().__init__()
+            self.stopped = False
+            self.name = "Process Pool Dispatcher"
+            self.daemon = True
+            self.__msg_queue = incoming_queue
+            self.__process_pool = process_pool
+            self.__converter_ids = converter_ids
+            self.__send_results = send_results
+            self.__batch_size = batch_size
+            self.__log = logger
+
+        def run(self):
+            while not self.stopped:
+                try:
+                    try:
+                        batch = [self.__msg_queue.get(timeout=1)]
+                    except Empty:
+                        continue
+
+                    while len(batch) < self.__batch_size:
+                        try:
+                            batch.append(self.__msg_queue.get_nowait())
+                        except Empty:
+                            break
+
+                    process_batch = [(self.__converter_ids.get(converter), topic, content)
+                                     for converter, topic, content in batch]
+                    self.__process_pool.submit(process_batch, self.__send_results)
+                except Exception as e:
+                    self.__log.exception("Error sending messages to converter processes: %s", e)
+
+        def stop(self):
+            self.stopped = True
@@ -4,11 +4,10 @@ from thingsboard_gateway.gateway.statistics.decorators import CollectStatistics
 class CustomCollectStatistics(CollectStatistics):
     def __call__(self, func):
         def inner(*args, **kwargs):
-            try:
-                _, __, data, ___ = args
+            # _publish(self, request_topic, data_to_send, retain, callback=None), data may be passed by keyword
+            data = args[2] if len(args) > 2 else kwargs.get('data_to_send')
+            if data is not None:
                 self.collect(self.start_stat_type, data)
-            except ValueError:
-                pass
 
             return func(*args, **kwargs)
 
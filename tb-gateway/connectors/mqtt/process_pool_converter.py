@@ -0,0 +1,163 @@
+#     Copyright 2025. ThingsBoard
+#
+#     Licensed under the Apache License, Version 2.0 (the "License");
+#     you may not use this file except in compliance with the License.
+#     You may obtain a copy of the License at
+#
+#         http://www.apache.org/licenses/LICENSE-2.0
+#
+#     Unless required by applicable law or agreed to in writing, software
+#     distributed under the License is distributed on an "AS IS" BASIS,
+#     WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#     See the License for the specific language governing permissions and
+#     limitations under the License.
+
+from concurrent.futures import ProcessPoolExecutor, wait
+from inspect import isclass
+from logging import Handler
+from logging.handlers import QueueHandler, QueueListener
+from multiprocessing import get_context
+from threading import BoundedSemaphore, RLock
+
+from thingsboard_gateway.connectors.converter_logger import ConverterLogger
+from thingsboard_gateway.gateway.statistics.statistics_service import StatisticsService
+from thingsboard_gateway.tb_utility.tb_loader import TBModuleLoader
+from thingsboard_gateway.tb_utility.tb_logger import TbLogger
+
+# Time to wait for batches in flight to be converted when the converter processes are stopped or restarted
+DRAIN_TIMEOUT_IN_SECONDS = 5.0
+
+# Converters and logger of the current worker process, {converter_id: converter}
+_worker_converters = {}
+_worker_logger = None
+_worker_hot_log = None
+
+
+def _init_worker(connector_type, converter_configs, logger_name, log_level, log_queue):
+    global _worker_logger, _worker_hot_log
+    # Records are sent to the connector process and handled there by the converter logger handlers
+    _worker_logger = TbLogger(logger_name, log_level)
+    _worker_logger.propagate = False
+    _worker_logger.addHandler(QueueHandler(log_queue))
+    _worker_hot_log = ConverterLogger(_worker_logger)
+
+    for converter_id, (converter_class_name, mapping) in converter_configs.items():
+        # import_module returns the list of import errors if the class is not found
+        converter_class = TBModuleLoader.import_module(connector_type, converter_class_name)
+        if not isclass(converter_class):
+            _worker_logger.error("Cannot load converter %s in conversion process: %s",
+                                 converter_class_name, converter_class)
+            continue
+        try:
+            _worker_converters[converter_id] = converter_class(mapping, _worker_logger)
+        except Exception as e:
+            _worker_logger.exception("Cannot create converter %s in conversion process: %s", converter_class_name, e)
+
+
+def _convert_batch(batch):
+    results = []
+    for converter_id, topic, content in batch:
+        converter = _worker_converters.get(converter_id)
+        if converter is None:
+            results.append(None)
+            continue
+        try:
+            results.append(converter.convert(topic, content))
+        except Exception as e:
+            _worker_hot_log.error(("conversionError", converter_id), "Error converting message from topic %s: %r",
+                                  topic, e)
+            results.append(None)
+    return results
+
+
+class _LoggerHandler(Handler):
+    """Passes records received from the worker processes to the handlers of the logger."""
+
+    def __init__(self, logger):
+        super().__init__()
+        self.__logger = logger
+
+    def emit(self, record):
+        self.__logger.handle(record)
+
+
+class ProcessPoolConverter:
+    """
+    Runs uplink converters in worker processes, every process loads all configured converters once at start.
+    Messages are shipped in batches, at most max_in_flight_batches batches are processed at the same time.
+    Log records of the workers are sent back and handled by the logger of this process.
+    """
+
+    def __init__(self, connector_type, logger, workers, max_in_flight_batches):
+        self._log = logger
+        self.__connector_type = connector_type
+        self.__workers = workers
+        self.__in_flight = BoundedSemaphore(max_in_flight_batches)
+        self.__lock = RLock()
+        self.__executor = None
+        self.__log_listener = None
+        self.__pending = {}
+
+    def start(self, converter_configs):
+        with self.__lock:
+            self.stop()
+            context = get_context('spawn')
+            log_queue = context.Queue()
+            self.__log_listener = QueueListener(log_queue, _LoggerHandler(self._log))
+            self.__log_listener.start()
+            self.__executor = ProcessPoolExecutor(max_workers=self.__workers,
+                                                  mp_context=context,
+                                                  initializer=_init_worker,
+                                                  initargs=(self.__connector_type, converter_configs, self._log.name,
+                                                            self._log.getEffectiveLevel(), log_queue))
+        self._log.info("Started %d converter processes for %d converters", self.__workers, len(converter_configs))
+
+    def is_started(self):
+        return self.__executor is not None
+
+    def submit(self, batch, callback):
+        """
+        Sends [(converter_id, topic, content), ...] to a worker process, blocks while too many batches are in flight.
+        callback receives the batch and the list of conversion results in the same order.
+        """
+        self.__in_flight.acquire()
+        try:
+            with self.__lock:
+                future = self.__executor.submit(_convert_batch, batch)
+                self.__pending[future] = len(batch)
+        except Exception:
+            self.__in_flight.release()
+            raise
+
+        def done(completed_future):
+            self.__in_flight.release()
+            self.__pending.pop(completed_future, None)
+            if completed_future.cancelled():
+                # Counted by stop()
+                return
+            try:
+                callback(batch, completed_future.result())
+            except Exception as e:
+                self._log.exception("Error processing converted batch: %s", e)
+
+        future.add_done_callback(done)
+
+    def stop(self):
+        """Waits up to DRAIN_TIMEOUT_IN_SECONDS for the batches in flight, the queued ones are dropped and counted."""
+        with self.__lock:
+            if self.__executor is not None:
+                pending = dict(self.__pending)
+                if pending:
+                    wait(pending, timeout=DRAIN_TIMEOUT_IN_SECONDS)
+                # Batches already running are completed by the workers, the queued ones are dropped
+                dropped_messages = sum(messages_count for future, messages_count in pending.items() if future.cancel())
+                self.__executor.shutdown(wait=False, cancel_futures=True)
+                self.__executor = None
+                if dropped_messages:
+                    self._log.warning("Converter processes stopped, %d queued messages were dropped without conversion",
+                                      dropped_messages)
+                    StatisticsService.count_connector_message(self._log.name, 'convertersMsgDropped',
+                                                              count=dropped_messages)
+            if self.__log_listener is not None:
+                self.__log_listener.stop()
+                self.__log_listener = None
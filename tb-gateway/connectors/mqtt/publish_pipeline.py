@@ -0,0 +1,119 @@
+#     Copyright 2025. ThingsBoard
+#
+#     Licensed under the Apache License, Version 2.0 (the "License");
+#     you may not use this file except in compliance with the License.
+#     You may obtain a copy of the License at
+#
+#         http://www.apache.org/licenses/LICENSE-2.0
+#
+#     Unless required by applicable law or agreed to in writing, software
+#     distributed under the License is distributed on an "AS IS" BASIS,
+#     WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#     See the License for the specific language governing permissions and
+#     limitations under the License.
+
+from threading import BoundedSemaphore, Lock
+from time import monotonic
+
+from paho.mqtt.client import MQTT_ERR_SUCCESS, MQTT_ERR_AGAIN
+
+MAX_EARLY_COMPLETIONS = 10000
+
+
+class PublishPipeline:
+    """
+    Non-blocking publishing with a bounded number of messages waiting for completion.
+    Completion is reported by the client on_publish callback (PUBACK/PUBCOMP for QoS > 0, socket write for QoS 0),
+    a callback passed to publish() is called with True on completion or with False on failure or timeout.
+    """
+
+    def __init__(self, client, logger, max_in_flight=1000, timeout_in_seconds=10.0):
+        self._log = logger
+        self.__client = client
+        self.__max_in_flight = max_in_flight
+        self.__slots = BoundedSemaphore(max_in_flight)
+        self.__timeout = timeout_in_seconds
+        self.__lock = Lock()
+        self.__in_flight = {}
+        # on_publish may be called before publish() returns the message id
+        self.__completed_early = set()
+        self.__metrics = {'published': 0, 'failed': 0, 'timedOut': 0}
+
+    def publish(self, topic, payload, qos=0, retain=False, callback=None):
+        """Returns False if the message was not queued, the callback is still called in this case."""
+        if not self.__slots.acquire(timeout=self.__timeout):
+            self._log.warning("Publish window of %d messages is full, dropping message to topic %s",
+                              self.__max_in_flight, topic)
+            self.__complete(None, callback, False)
+            return False
+
+        try:
+            message_info = self.__client.publish(topic, payload, qos=qos, retain=retain)
+        except Exception as e:
+            self._log.error("Error during publishing to target broker: %r", e)
+            self.__complete(None, callback, False, release_slot=True)
+            return False
+
+        if message_info.rc not in (MQTT_ERR_SUCCESS, MQTT_ERR_AGAIN):
+            self._log.error("Message to topic %s was not queued, error code: %s", topic, message_info.rc)
+            self.__complete(None, callback, False, release_slot=True)
+            return False
+
+        with self.__lock:
+            if message_info.mid in self.__completed_early:
+                self.__completed_early.discard(message_info.mid)
+                completed = True
+            else:
+                self.__in_flight[message_info.mid] = (callback, monotonic() + self.__timeout)
+                completed = False
+
+        if completed:
+            self.__complete(message_info.mid, callback, True, release_slot=True)
+        return True
+
+    def on_publish(self, mid):
+        with self.__lock:
+            entry = self.__in_flight.pop(mid, None)
+            if entry is None:
+                if len(self.__completed_early) >= MAX_EARLY_COMPLETIONS:
+                    self.__completed_early.clear()
+                self.__completed_early.add(mid)
+                return
+        self.__complete(mid, entry[0], True, release_slot=True)
+
+    def check_timeouts(self):
+        current_time = monotonic()
+        with self.__lock:
+            expired = [(mid, entry[0]) for mid, entry in self.__in_flight.items() if entry[1] <= current_time]
+            for mid, _ in expired:
+                del self.__in_flight[mid]
+        for mid, callback in expired:
+            self.__metrics['timedOut'] += 1
+            self.__complete(mid, callback, False, release_slot=True)
+        if expired:
+            self._log.warning("%d published messages were not acknowledged in %.1f seconds",
+                              len(expired), self.__timeout)
+
+    def fail_all(self):
+        with self.__lock:
+            pending = list(self.__in_flight.items())
+            self.__in_flight.clear()
+            self.__completed_early.clear()
+        for mid, (callback, _) in pending:
+            self.__complete(mid, callback, False, release_slot=True)
+
+    def get_in_flight_count(self):
+        return len(self.__in_flight)
+
+    def get_metrics(self):
+        return {**self.__metrics, 'inFlight': len(self.__in_flight)}
+
+    def __complete(self, mid, callback, success, release_slot=False):
+        if release_slot:
+            self.__slots.release()
+        self.__metrics['published' if success else 'failed'] += 1
+        if callback is not None:
+            try:
+                callback(success)
+            except Exception as e:
+                self._log.exception("Error in publish completion callback for message %s: %s", mid, e)
@@ -0,0 +1,331 @@
+#     Copyright 2025. ThingsBoard
+#
+#     Licensed under the Apache License, Version 2.0 (the "License");
+#     you may not use this file except in compliance with the License.
+#     You may obtain a copy of the License at
+#
+#         http://www.apache.org/licenses/LICENSE-2.0
+#
+#     Unless required by applicable law or agreed to in writing, software
+#     distributed under the License is distributed on an "AS IS" BASIS,
+#     WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#     See the License for the specific language governing permissions and
+#     limitations under the License.
+
+from collections import deque
+from heapq import heappop, heappush
+from itertools import count
+from re import compile as compile_regex
+from threading import Condition, Thread
+from time import monotonic
+
+from thingsboard_gateway.connectors.mqtt.topic_filter_trie import TopicFilterTrie
+
+MAX_EARLY_SUBSCRIBES = 10000
+
+RESPONSE_FILTER_HANDLER = "rpcResponse"
+
+# Same tag syntax as the "${...}" placeholders of responseTopicExpression
+RESPONSE_TOPIC_TAG_PATTERN = compile_regex(r'\$\{[^}]*}')
+
+RPC_TIMEOUT_TIMER = 0
+SUBSCRIBE_TIMEOUT_TIMER = 1
+
+
+def get_response_topic_filter(topic_expression):
+    """
+    Returns the topic filter covering all topics of a response topic expression: every level with a "${...}" tag
+    is replaced with "+". Returns None if no level stays literal, as such a filter would receive all device traffic.
+    """
+    levels = topic_expression.split('/')
+    filter_levels = ['+' if RESPONSE_TOPIC_TAG_PATTERN.search(level) or level in ('+', '#') else level
+                     for level in levels]
+    if all(level == '+' for level in filter_levels):
+        return None
+    return '/'.join(filter_levels)
+
+
+class PendingRpc:
+    __slots__ = ('topic', 'content', 'deadline', 'completed')
+
+    def __init__(self, topic, content, deadline):
+        self.topic = topic
+        self.content = content
+        self.deadline = deadline
+        self.completed = False
+
+
+class ResponseTopic:
+    __slots__ = ('qos', 'response_filter', 'subscribed', 'waiting', 'rpcs')
+
+    def __init__(self, qos, response_filter=None):
+        self.qos = qos
+        # Wildcard subscription receiving responses on this topic, no own subscription is needed then
+        self.response_filter = response_filter
+        self.subscribed = False
+        # Requests to publish once the response topic subscription is acknowledged
+        self.waiting = []
+        self.rpcs = deque()
+
+
+class RpcCorrelationTable(Thread):
+    """
+    2-way RPC requests waiting for a response, keyed by response topic.
+    The request is published when the broker acknowledges the response topic subscription (or after
+    subscription_timeout_in_seconds, as before), responses are matched with resolve() in arrival order.
+    Topics covered by a response filter (see set_response_filters) are published to without a subscription round trip.
+    A single thread runs the publish continuations and expires requests from one deadline heap.
+    Used instead of the gateway register_rpc_request_timeout(), which keeps one request per response topic and
+    only releases it on timeout; the connector replies with the same send_rpc_reply() calls as the gateway
+    rpc_with_reply_processing() and cancel_rpc_request() did.
+    """
+
+    def __init__(self, logger, subscribe, unsubscribe, on_timeout, subscription_timeout_in_seconds=1.0):
+        super().__init__()
+        self.name = "MQTT RPC correlation"
+        self.daemon = True
+        self._log = logger
+        self.__subscribe = subscribe
+        self.__unsubscribe = unsubscribe
+        self.__on_timeout = on_timeout
+        self.__subscription_timeout = subscription_timeout_in_seconds
+        self.__stopped = False
+        self.__condition = Condition()
+        self.__timers = []
+        self.__timer_sequence = count()
+        self.__ready = deque()
+        self.__topics = {}
+        # {topic filter: (qos, subscribed)}
+        self.__response_filters = {}
+        self.__response_filters_trie = TopicFilterTrie()
+        self.__subscribes_in_progress = {}
+        # SUBACK may be received before subscribe() returns the message id
+        self.__completed_subscribes = set()
+        self.__metrics = {'responded': 0, 'timedOut': 0}
+
+    def request(self, topic, qos, timeout_in_seconds, content, send_request):
+        """
+        Registers the RPC and calls send_request(pending_rpc) once the response topic is subscribed.
+        Returns the pending RPC, it may be passed to cancel().
+        """
+        rpc = PendingRpc(topic, content, monotonic() + timeout_in_seconds)
+        with self.__condition:
+            response_topic = self.__topics.get(topic)
+            subscribe_needed = False
+            if response_topic is None:
+                response_topic = self.__topics[topic] = self.__create_response_topic(topic, qos)
+                subscribe_needed = response_topic.response_filter is None
+            response_topic.rpcs.append(rpc)
+            self.__schedule(rpc.deadline, RPC_TIMEOUT_TIMER, rpc)
+            if response_topic.subscribed:
+                self.__ready.append((send_request, rpc))
+                self.__condition.notify()
+            else:
+                response_topic.waiting.append((send_request, rpc))
+
+        if subscribe_needed:
+            self.__send_subscribe(topic, qos)
+        return rpc
+
+    def on_subscribed(self, mid):
+        with self.__condition:
+            topic = self.__subscribes_in_progress.pop(mid, None)
+            if topic is None:
+                if len(self.__completed_subscribes) >= MAX_EARLY_SUBSCRIBES:
+                    self.__completed_subscribes.clear()
+                self.__completed_subscribes.add(mid)
+                return
+            self.__set_subscribed(topic)
+
+    def resolve(self, topic):
+        """Returns the content of the oldest RPC waiting for a response on the topic or None."""
+        with self.__condition:
+            response_topic = self.__topics.get(topic)
+            if response_topic is None:
+                return None
+            rpc = None
+            while response_topic.rpcs:
+                candidate = response_topic.rpcs.popleft()
+                if not candidate.completed:
+                    candidate.completed = True
+                    rpc = candidate
+                    break
+            unsubscribe_needed = self.__release_topic(topic, response_topic)
+
+        if unsubscribe_needed:
+            self.__unsubscribe(topic)
+        if rpc is None:
+            return None
+        self.__metrics['responded'] += 1
+        return rpc.content
+
+    def cancel(self, rpc):
+        """Returns False if the RPC was already completed by a response or timeout."""
+        with self.__condition:
+            if rpc.completed:
+                return False
+            rpc.completed = True
+            response_topic = self.__topics.get(rpc.topic)
+            unsubscribe_needed = False
+            if response_topic is not None:
+                try:
+                    response_topic.rpcs.remove(rpc)
+                except ValueError:
+                    pass
+                unsubscribe_needed = self.__release_topic(rpc.topic, response_topic)
+
+        if unsubscribe_needed:
+            self.__unsubscribe(rpc.topic)
+        return True
+
+    def set_response_filters(self, response_filters):
+        """
+        Subscribes to {topic filter: qos} once, RPCs with response topics matching a filter are demultiplexed
+        by resolve(). Called on connect, pending RPCs keep their subscriptions.
+        """
+        with self.__condition:
+            self.__response_filters = {topic_filter: (qos, False) for topic_filter, qos in response_filters.items()}
+            self.__response_filters_trie.clear()
+            for topic_filter in response_filters:
+                self.__response_filters_trie.add(topic_filter, RESPONSE_FILTER_HANDLER, topic_filter)
+        for topic_filter, qos in response_filters.items():
+            self.__send_subscribe(topic_filter, qos)
+
+    def resubscribe(self):
+        """Subscribes again to the response topics of pending RPCs, called after reconnect."""
+        with self.__condition:
+            topics = [(topic, response_topic.qos) for topic, response_topic in self.__topics.items()
+                      if response_topic.response_filter is None]
+        for topic, qos in topics:
+            self.__send_subscribe(topic, qos)
+
+    def get_pending_count(self):
+        return sum(len(response_topic.rpcs) for response_topic in tuple(self.__topics.values()))
+
+    def get_metrics(self):
+        return {**self.__metrics, 'pending': self.get_pending_count()}
+
+    def run(self):
+        while not self.__stopped:
+            try:
+                with self.__condition:
+                    while not self.__stopped and not self.__ready and not self.__is_timer_expired():
+                        self.__condition.wait(self.__get_wait_timeout())
+                    ready = self.__ready
+                    self.__ready = deque()
+                    expired = self.__pop_expired_timers()
+
+                for send_request, rpc in ready:
+                    if not rpc.completed:
+                        self.__call(send_request, rpc)
+
+                for kind, item in expired:
+                    if kind == RPC_TIMEOUT_TIMER:
+                        self.__expire(item)
+                    else:
+                        self.__on_subscribe_timeout(item)
+            except Exception as e:
+                self._log.exception("Error in RPC correlation: %s", e)
+
+    def stop(self):
+        with self.__condition:
+            self.__stopped = True
+            self.__condition.notify()
+
+    def __send_subscribe(self, topic, qos):
+        try:
+            mid = self.__subscribe(topic, qos)
+        except Exception as e:
+            self._log.exception("Error subscribing to RPC response topic %s: %s", topic, e)
+            mid = None
+
+        with self.__condition:
+            if mid is None or mid in self.__completed_subscribes:
+                self.__completed_subscribes.discard(mid)
+                self.__set_subscribed(topic)
+            else:
+                self.__subscribes_in_progress[mid] = topic
+                self.__schedule(monotonic() + self.__subscription_timeout, SUBSCRIBE_TIMEOUT_TIMER, topic)
+
+    def __create_response_topic(self, topic, qos):
+        response_filters = self.__response_filters_trie.match(topic).get(RESPONSE_FILTER_HANDLER)
+        if not response_filters:
+            return ResponseTopic(qos)
+        response_topic = ResponseTopic(qos, response_filters[0])
+        response_topic.subscribed = self.__response_filters[response_filters[0]][1]
+        return response_topic
+
+    def __set_subscribed(self, topic):
+        response_filter = self.__response_filters.get(topic)
+        if response_filter is not None:
+            self.__response_filters[topic] = (response_filter[0], True)
+            for response_topic in self.__topics.values():
+                if response_topic.response_filter == topic:
+                    self.__flush(response_topic)
+
+        response_topic = self.__topics.get(topic)
+        if response_topic is not None:
+            self.__flush(response_topic)
+
+    def __flush(self, response_topic):
+        response_topic.subscribed = True
+        if response_topic.waiting:
+            self.__ready.extend(response_topic.waiting)
+            response_topic.waiting = []
+            self.__condition.notify()
+
+    def __on_subscribe_timeout(self, topic):
+        with self.__condition:
+            response_filter = self.__response_filters.get(topic)
+            response_topic = self.__topics.get(topic)
+            if response_filter is not None:
+                subscribed = response_filter[1]
+            elif response_topic is not None:
+                subscribed = response_topic.subscribed
+            else:
+                return
+            if subscribed:
+                return
+            self._log.warning("Subscription to RPC response topic %s was not acknowledged in %.1f seconds, "
+                              "sending requests anyway", topic, self.__subscription_timeout)
+            self.__set_subscribed(topic)
+
+    def __expire(self, rpc):
+        if self.cancel(rpc):
+            self.__metrics['timedOut'] += 1
+            self.__call(self.__on_timeout, rpc)
+
+    def __release_topic(self, topic, response_topic):
+        if response_topic.rpcs:
+            return False
+        del self.__topics[topic]
+        return response_topic.response_filter is None
+
+    def __schedule(self, deadline, kind, item):
+        heappush(self.__timers, (deadline, next(self.__timer_sequence), kind, item))
+        if self.__timers[0][0] == deadline:
+            self.__condition.notify()
+
+    def __is_timer_expired(self):
+        return bool(self.__timers) and self.__timers[0][0] <= monotonic()
+
+    def __get_wait_timeout(self):
+        if not self.__timers:
+            return None
+        return max(self.__timers[0][0] - monotonic(), 0)
+
+    def __pop_expired_timers(self):
+        expired = []
+        current_time = monotonic()
+        while self.__timers and self.__timers[0][0] <= current_time:
+            _, _, kind, item = heappop(self.__timers)
+            if kind == RPC_TIMEOUT_TIMER and item.completed:
+                continue
+            expired.append((kind, item))
+        return expired
+
+    def __call(self, function, rpc):
+        try:
+            function(rpc)
+        except Exception as e:
+            self._log.exception("Error processing RPC request for response topic %s: %s", rpc.topic, e)
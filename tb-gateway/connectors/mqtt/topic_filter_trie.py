@@ -0,0 +1,118 @@
+#     Copyright 2025. ThingsBoard
+#
+#     Licensed under the Apache License, Version 2.0 (the "License");
+#     you may not use this file except in compliance with the License.
+#     You may obtain a copy of the License at
+#
+#         http://www.apache.org/licenses/LICENSE-2.0
+#
+#     Unless required by applicable law or agreed to in writing, software
+#     distributed under the License is distributed on an "AS IS" BASIS,
+#     WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#     See the License for the specific language governing permissions and
+#     limitations under the License.
+
+from collections import OrderedDict
+from threading import Lock
+
+SHARED_SUBSCRIPTION_PREFIX = '$share/'
+
+
+def strip_shared_subscription_prefix(topic_filter):
+    """
+    Returns the topic filter without the first two levels of a "$" prefixed (shared) subscription,
+    e.g. "$share/<group>/" or "$queue/", as the mapping regex did; AWS "$aws/..." topics are kept as is.
+    """
+    if topic_filter.startswith('$') and not topic_filter.startswith('$aws'):
+        return '/'.join(topic_filter.split('/')[2:])
+    return topic_filter
+
+
+class _Node:
+    __slots__ = ('children', 'entries')
+
+    def __init__(self):
+        self.children = {}
+        self.entries = []
+
+
+class TopicFilterTrie:
+    """
+    Maps MQTT topic filters ("+" and "#" wildcards) to handlers of several kinds (mapping, connect requests, ...).
+    A topic is resolved to handlers of all kinds in one walk over its levels,
+    results are kept in an LRU cache until the trie is modified.
+    """
+
+    def __init__(self, cache_size=10000):
+        self.__root = _Node()
+        self.__cache = OrderedDict()
+        self.__cache_size = cache_size
+        self.__sequence = 0
+        self.__lock = Lock()
+
+    def add(self, topic_filter, handler_kind, handler):
+        with self.__lock:
+            node = self.__root
+            for level in topic_filter.split('/'):
+                child = node.children.get(level)
+                if child is None:
+                    child = node.children[level] = _Node()
+                node = child
+            node.entries.append((self.__sequence, handler_kind, handler))
+            self.__sequence += 1
+            self.__cache.clear()
+
+    def clear(self, handler_kind=None):
+        with self.__lock:
+            if handler_kind is None:
+                self.__root = _Node()
+            else:
+                self.__remove_kind(self.__root, handler_kind)
+            self.__cache.clear()
+
+    def match(self, topic):
+        """Returns {handler_kind: [handler, ...]} for all filters matching the topic, in the order they were added."""
+        with self.__lock:
+            result = self.__cache.get(topic)
+            if result is not None:
+                self.__cache.move_to_end(topic)
+                return result
+
+            entries = []
+            levels = topic.split('/')
+            self.__collect(self.__root, levels, 0, entries, levels[0].startswith('$'))
+            entries.sort(key=lambda entry: entry[0])
+
+            result = {}
+            for _, handler_kind, handler in entries:
+                result.setdefault(handler_kind, []).append(handler)
+
+            self.__cache[topic] = result
+            if len(self.__cache) > self.__cache_size:
+                self.__cache.popitem(last=False)
+            return result
+
+    def __collect(self, node, levels, depth, entries, is_system_topic):
+        # Wildcards on the first level must not match topics starting with "$" (MQTT spec, 4.7.2)
+        allow_wildcards = not (depth == 0 and is_system_topic)
+
+        multi_level = node.children.get('#')
+        if multi_level is not None and allow_wildcards:
+            entries.extend(multi_level.entries)
+
+        if depth == len(levels):
+            entries.extend(node.entries)
+            return
+
+        child = node.children.get(levels[depth])
+        if child is not None:
+            self.__collect(child, levels, depth + 1, entries, is_system_topic)
+
+        single_level = node.children.get('+')
+        if single_level is not None and allow_wildcards:
+            self.__collect(single_level, levels, depth + 1, entries, is_system_topic)
+
+    def __remove_kind(self, node, handler_kind):
+        node.entries = [entry for entry in node.entries if entry[1] != handler_kind]
+        for child in node.children.values():
+            self.__remove_kind(child, handler_kind)
@@ -18,12 +18,11 @@ from time import time
 from asyncua.ua.uatypes import VariantType
 
 from thingsboard_gateway.connectors.opcua.opcua_converter import OpcUaConverter
+from thingsboard_gateway.connectors.report_strategy_cache import get_report_strategy, convert_key_to_datapoint_key
 from thingsboard_gateway.gateway.constants import TELEMETRY_PARAMETER, ATTRIBUTES_PARAMETER, REPORT_STRATEGY_PARAMETER
 from thingsboard_gateway.gateway.entities.converted_data import ConvertedData
-from thingsboard_gateway.gateway.entities.report_strategy_config import ReportStrategyConfig
 from thingsboard_gateway.gateway.entities.telemetry_entry import TelemetryEntry
 from thingsboard_gateway.gateway.statistics.statistics_service import StatisticsService
-from thingsboard_gateway.tb_utility.tb_utility import TBUtility
 
 DATA_TYPES = {
     'attributes': ATTRIBUTES_PARAMETER,
@@ -75,7 +74,7 @@ class OpcUaUplinkConverter(OpcUaConverter):
                 timestamp = val.ServerTimestamp.timestamp() * 1000
 
             section = DATA_TYPES[config['section']]
-            datapoint_key = TBUtility.convert_key_to_datapoint_key(config['key'], device_report_strategy, config, self._log)
+            datapoint_key = convert_key_to_datapoint_key(config['key'], device_report_strategy, config, self._log)
             if section == TELEMETRY_PARAMETER:
                 return TelemetryEntry({datapoint_key: data}, ts=timestamp), error
             elif section == ATTRIBUTES_PARAMETER:
@@ -95,11 +94,7 @@ class OpcUaUplinkConverter(OpcUaConverter):
 
             converted_data = ConvertedData(device_name=self.__config['device_name'], device_type=self.__config['device_type'])
 
-            device_report_strategy = None
-            try:
-                device_report_strategy = ReportStrategyConfig(self.__config.get(REPORT_STRATEGY_PARAMETER))
-            except ValueError as e:
-                self._log.trace("Report strategy config is not specified for device %s: %s", self.__config['device_name'], e)
+            device_report_strategy = get_report_strategy(self.__config.get(REPORT_STRATEGY_PARAMETER), self._log)
 
             telemetry_batch = []
             attributes_batch = []
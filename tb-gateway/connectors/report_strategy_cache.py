@@ -0,0 +1,109 @@
+#     Copyright 2025. ThingsBoard
+#
+#     Licensed under the Apache License, Version 2.0 (the "License");
+#     you may not use this file except in compliance with the License.
+#     You may obtain a copy of the License at
+#
+#         http://www.apache.org/licenses/LICENSE-2.0
+#
+#     Unless required by applicable law or agreed to in writing, software
+#     distributed under the License is distributed on an "AS IS" BASIS,
+#     WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#     See the License for the specific language governing permissions and
+#     limitations under the License.
+
+import orjson
+
+from thingsboard_gateway.gateway.constants import REPORT_STRATEGY_PARAMETER
+from thingsboard_gateway.gateway.entities.datapoint_key import DatapointKey
+from thingsboard_gateway.gateway.entities.report_strategy_config import ReportStrategyConfig
+
+MAX_CACHED_REPORT_STRATEGIES = 1024
+
+# Cached result for configs that do not describe a report strategy (absent or invalid)
+_NO_REPORT_STRATEGY = object()
+
+# {(config JSON, default config JSON): FrozenReportStrategyConfig or _NO_REPORT_STRATEGY}
+_report_strategies = {}
+
+
+class FrozenReportStrategyConfig(ReportStrategyConfig):
+    """
+    ReportStrategyConfig shared by all converters with an equal config, its attributes can not be changed.
+    ReportStrategyConfig(frozen_config) returns a modifiable copy.
+    """
+
+    __slots__ = ('_frozen',)
+
+    def __init__(self, config, default_report_strategy_config=None):
+        super().__init__(config, default_report_strategy_config)
+        self._frozen = True
+
+    def __setattr__(self, name, value):
+        if getattr(self, '_frozen', False):
+            raise AttributeError("Shared report strategy config can not be modified, "
+                                 "copy it with ReportStrategyConfig(config)")
+        super().__setattr__(name, value)
+
+    def __setstate__(self, state):
+        # Unpickled (e.g. from converter worker processes) without going through __setattr__
+        for name, value in state[1].items():
+            object.__setattr__(self, name, value)
+
+
+def _get_cache_key(config, default_report_strategy_config):
+    # Sorted JSON keeps nested values (e.g. lists) hashable and equal configs equal regardless of key order
+    if default_report_strategy_config:
+        return (orjson.dumps(config, option=orjson.OPT_SORT_KEYS),
+                orjson.dumps(default_report_strategy_config, option=orjson.OPT_SORT_KEYS))
+    return orjson.dumps(config, option=orjson.OPT_SORT_KEYS), None
+
+
+def get_report_strategy(config, logger=None, default_report_strategy_config=None):
+    """
+    Returns the ReportStrategyConfig for the reportStrategy section of a converter or key config,
+    or None if it is absent or invalid. Equal configs share one validated FrozenReportStrategyConfig.
+    The reason of a None result is logged once per config.
+    """
+    if config is None:
+        return None
+    if isinstance(config, ReportStrategyConfig):
+        return config
+    if not isinstance(config, dict):
+        return None
+
+    try:
+        cache_key = _get_cache_key(config, default_report_strategy_config)
+        report_strategy = _report_strategies.get(cache_key)
+    except TypeError:
+        # Values JSON can not represent, nothing to cache
+        cache_key = None
+        report_strategy = None
+
+    if report_strategy is None:
+        try:
+            report_strategy = FrozenReportStrategyConfig(config, default_report_strategy_config)
+        except ValueError as e:
+            report_strategy = _NO_REPORT_STRATEGY
+            if logger is not None:
+                logger.trace("Report strategy config %r is not valid: %s", config, e)
+
+        if cache_key is not None:
+            if len(_report_strategies) >= MAX_CACHED_REPORT_STRATEGIES:
+                _report_strategies.clear()
+            _report_strategies[cache_key] = report_strategy
+
+    return None if report_strategy is _NO_REPORT_STRATEGY else report_strategy
+
+
+def convert_key_to_datapoint_key(key, device_report_strategy, key_config, logger=None):
+    """Same as TBUtility.convert_key_to_datapoint_key, with the key report strategy taken from the cache."""
+    key_report_strategy = device_report_strategy
+    if key_config.get(REPORT_STRATEGY_PARAMETER) is not None:
+        key_report_strategy = get_report_strategy(key_config[REPORT_STRATEGY_PARAMETER], logger) \
+                              or device_report_strategy
+    return DatapointKey(key, key_report_strategy)
+
+
+def clear_report_strategies():
+    _report_strategies.clear()
@@ -0,0 +1,150 @@
+#     Copyright 2025. ThingsBoard
+#
+#     Licensed under the Apache License, Version 2.0 (the "License");
+#     you may not use this file except in compliance with the License.
+#     You may obtain a copy of the License at
+#
+#         http://www.apache.org/licenses/LICENSE-2.0
+#
+#     Unless required by applicable law or agreed to in writing, software
+#     distributed under the License is distributed on an "AS IS" BASIS,
+#     WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#     See the License for the specific language governing permissions and
+#     limitations under the License.
+
+import asyncio
+from copy import deepcopy
+from ipaddress import ip_network
+from re import compile as compile_regex
+from time import monotonic
+
+from puresnmp import Client, credentials, PyWrapper
+from puresnmp.exc import Timeout as SNMPTimeoutException
+
+SYS_DESCR_OID = "1.3.6.1.2.1.1.1.0"
+SYS_OBJECT_ID_OID = "1.3.6.1.2.1.1.2.0"
+SYS_NAME_OID = "1.3.6.1.2.1.1.5.0"
+
+
+class DiscoveryProfile:
+    def __init__(self, config):
+        self.name = config.get('name', '')
+        self.__sys_object_id_pattern = compile_regex(config.get('sysObjectIdPattern', '.*'))
+        self.__sys_descr_pattern = compile_regex(config.get('sysDescrPattern', '.*'))
+        self.device_name_expression = config.get('deviceNameExpression', '${sysName}_${ip}')
+        self.device_type = config.get('deviceType', 'default')
+        self.device_template = config.get('device', {})
+
+    def matches(self, fingerprint):
+        return (self.__sys_object_id_pattern.search(fingerprint['sysObjectID']) is not None
+                and self.__sys_descr_pattern.search(fingerprint['sysDescr']) is not None)
+
+    def create_device_config(self, fingerprint, common_config):
+        device_name = self.device_name_expression
+        for placeholder, value in fingerprint.items():
+            device_name = device_name.replace('${' + placeholder + '}', value)
+        if not device_name:
+            device_name = fingerprint['ip']
+
+        device = deepcopy(self.device_template)
+        device.setdefault('attributes', [])
+        device.setdefault('telemetry', [])
+        device.update({'deviceName': device_name,
+                       'deviceType': self.device_type,
+                       'ip': fingerprint['ip'],
+                       'port': common_config['port'],
+                       'community': common_config['community'],
+                       'timeout': common_config['timeout'],
+                       'discoveryProfile': self.name})
+        return device
+
+
+class SNMPDiscovery:
+    """
+    Sweeps configured networks with sysObjectID/sysDescr/sysName GET requests and builds device configs
+    for hosts matching one of the discovery profiles.
+    Hosts that are already known are not probed again, so every rescan only looks at the remaining addresses.
+    The default device name includes the host address, since sysName is often not unique (e.g. CPEs of one model).
+    """
+
+    def __init__(self, config, logger):
+        self._log = logger
+        self.__networks = [ip_network(network, strict=False) for network in config.get('networks', [])]
+        self.__common_config = {'port': config.get('port', 161),
+                                'community': config.get('community', 'public'),
+                                'timeout': config.get('timeout', 2)}
+        self.__max_concurrency = max(int(config.get('maxConcurrency', 64)), 1)
+        self.__request_interval = 1 / max(float(config.get('requestsPerSecond', 200)), 0.001)
+        self.__rescan_period = config.get('rescanPeriodInSeconds', 3600)
+        self.__profiles = [DiscoveryProfile(profile_config) for profile_config in config.get('profiles', [])]
+        self.__next_request_time = 0
+        self.__last_scan_time = None
+
+    def is_scan_required(self):
+        return self.__last_scan_time is None or monotonic() - self.__last_scan_time >= self.__rescan_period
+
+    async def scan(self, known_ips):
+        self.__last_scan_time = monotonic()
+        addresses = [str(address) for network in self.__networks for address in network.hosts()
+                     if str(address) not in known_ips]
+        self._log.info("Starting SNMP discovery of %d addresses", len(addresses))
+        started = monotonic()
+
+        semaphore = asyncio.Semaphore(self.__max_concurrency)
+        devices = []
+
+        async def probe(address):
+            async with semaphore:
+                await self.__wait_for_request_slot()
+                fingerprint = await self.__get_fingerprint(address)
+            if fingerprint is None:
+                return
+            profile = self.__find_profile(fingerprint)
+            if profile is None:
+                self._log.debug("No discovery profile matches %r", fingerprint)
+                return
+            devices.append(profile.create_device_config(fingerprint, self.__common_config))
+
+        await asyncio.gather(*(probe(address) for address in addresses))
+        self._log.info("SNMP discovery finished in %.2f seconds, found %d new devices",
+                       monotonic() - started, len(devices))
+        return devices
+
+    async def __wait_for_request_slot(self):
+        current_time = monotonic()
+        slot = max(current_time, self.__next_request_time)
+        self.__next_request_time = slot + self.__request_interval
+        if slot > current_time:
+            await asyncio.sleep(slot - current_time)
+
+    async def __get_fingerprint(self, address):
+        client = Client(ip=address,
+                        port=self.__common_config['port'],
+                        credentials=credentials.V1(self.__common_config['community']))
+        client.configure(timeout=self.__common_config['timeout'], retries=0)
+        client = PyWrapper(client)
+        try:
+            sys_object_id, sys_descr, sys_name = await client.multiget(oids=[SYS_OBJECT_ID_OID,
+                                                                             SYS_DESCR_OID,
+                                                                             SYS_NAME_OID])
+        except SNMPTimeoutException:
+            return None
+        except Exception as e:
+            self._log.debug("SNMP discovery request to %s failed: %r", address, e)
+            return None
+
+        return {'ip': address,
+                'sysObjectID': str(sys_object_id).lstrip('.'),
+                'sysDescr': self.__to_str(sys_descr),
+                'sysName': self.__to_str(sys_name)}
+
+    def __find_profile(self, fingerprint):
+        for profile in self.__profiles:
+            if profile.matches(fingerprint):
+                return profile
+
+    @staticmethod
+    def __to_str(value):
+        if isinstance(value, bytes):
+            return value.decode('utf-8', errors='replace')
+        return '' if value is None else str(value)
@@ -0,0 +1,75 @@
+#     Copyright 2025. ThingsBoard
+#
+#     Licensed under the Apache License, Version 2.0 (the "License");
+#     you may not use this file except in compliance with the License.
+#     You may obtain a copy of the License at
+#
+#         http://www.apache.org/licenses/LICENSE-2.0
+#
+#     Unless required by applicable law or agreed to in writing, software
+#     distributed under the License is distributed on an "AS IS" BASIS,
+#     WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#     See the License for the specific language governing permissions and
+#     limitations under the License.
+
+
+def normalize_oid(oid):
+    return str(oid).lstrip('.')
+
+
+class StaticTableCache:
+    """
+    Keeps static table columns (descriptors like hrStorageDescr or hrStorageSize) between polls,
+    so only the dynamic columns have to be walked every cycle.
+    The cache is invalidated when the row index set changes or the device was restarted (sysUpTime went back).
+    """
+
+    def __init__(self, oids, static_oids):
+        static_oids = {normalize_oid(oid) for oid in static_oids}
+        self.static_oids = [oid for oid in oids if normalize_oid(oid) in static_oids]
+        self.dynamic_oids = [oid for oid in oids if oid not in self.static_oids]
+        self.__static_prefixes = tuple(normalize_oid(oid) + '.' for oid in self.static_oids)
+        self.__dynamic_prefixes = tuple(normalize_oid(oid) + '.' for oid in self.dynamic_oids)
+        self.__static_values = {}
+        self.__indexes = None
+        self.__sys_uptime = None
+
+    def is_valid(self, sys_uptime):
+        if self.__indexes is None:
+            return False
+        if sys_uptime is not None and self.__sys_uptime is not None and sys_uptime < self.__sys_uptime:
+            return False
+        return True
+
+    def is_actual_for(self, dynamic_response):
+        return self.__indexes == self.get_indexes(dynamic_response)
+
+    def update(self, response, sys_uptime):
+        self.__static_values = {oid: value for oid, value in response.items()
+                                if normalize_oid(oid).startswith(self.__static_prefixes)}
+        dynamic_response = {oid: value for oid, value in response.items()
+                            if normalize_oid(oid).startswith(self.__dynamic_prefixes)}
+        self.__indexes = self.get_indexes(dynamic_response)
+        self.__sys_uptime = sys_uptime
+
+    def update_sys_uptime(self, sys_uptime):
+        if sys_uptime is not None:
+            self.__sys_uptime = sys_uptime
+
+    def merge(self, dynamic_response):
+        return {**self.__static_values, **dynamic_response}
+
+    def invalidate(self):
+        self.__static_values = {}
+        self.__indexes = None
+        self.__sys_uptime = None
+
+    def get_indexes(self, dynamic_response):
+        indexes = set()
+        for oid in dynamic_response:
+            oid = normalize_oid(oid)
+            for prefix in self.__dynamic_prefixes:
+                if oid.startswith(prefix):
+                    indexes.add(oid[len(prefix):])
+                    break
+        return frozenset(indexes)
@@ -18,9 +18,13 @@ from re import search
 from socket import gethostbyname
 from string import ascii_lowercase
 from threading import Thread
-from time import sleep, time
+from time import monotonic, time
 
 from thingsboard_gateway.connectors.connector import Connector
+from thingsboard_gateway.connectors.snmp.entities.discovery import SNMPDiscovery
+from thingsboard_gateway.connectors.snmp.entities.static_table_cache import StaticTableCache
+from thingsboard_gateway.gateway.constants import CONNECTOR_PARAMETER, RECEIVED_TS_PARAMETER, CONVERTED_TS_PARAMETER, \
+    DATA_RETRIEVING_STARTED
 from thingsboard_gateway.gateway.entities.converted_data import ConvertedData
 from thingsboard_gateway.gateway.statistics.statistics_service import StatisticsService
 from thingsboard_gateway.tb_utility.tb_loader import TBModuleLoader
@@ -45,6 +49,10 @@ if installation_required:
 from puresnmp import Client, credentials, PyWrapper
 from puresnmp.exc import Timeout as SNMPTimeoutException
 
+SYS_UPTIME_OID = "1.3.6.1.2.1.1.3.0"
+RUNTIME_DEVICE_KEYS = ("uplink_converter", "downlink_converter", "previous_poll_time")
+NETWORK_RTT_PARAMETER = "networkRttMs"
+
 
 class SNMPConnector(Connector, Thread):
     def __init__(self, gateway, config, connector_type):
@@ -74,6 +82,13 @@ class SNMPConnector(Connector, Thread):
         self.__methods = ["get", "multiget", "getnext", "walk", "multiwalk", "set", "multiset",
                           "bulkget", "bulkwalk", "table", "bulktable"]
         self.__datatypes = ('attributes', 'telemetry')
+        self.__static_table_caches = {}
+        self.__discovery = None
+        self.__discovery_task = None
+        self.__skipped_discovered_ips = set()
+        self.__pending_config = None
+        if self.__config.get("discovery", {}).get("enabled", False):
+            self.__discovery = SNMPDiscovery(self.__config["discovery"], self._log)
 
         self.__loop = asyncio.new_event_loop()
 
@@ -91,6 +106,12 @@ class SNMPConnector(Connector, Thread):
 
     async def _run(self):
         while not self.__stopped:
+            if self.__pending_config is not None:
+                config, self.__pending_config = self.__pending_config, None
+                self.__apply_config(config)
+            if (self.__discovery is not None and self.__discovery.is_scan_required()
+                    and (self.__discovery_task is None or self.__discovery_task.done())):
+                self.__discovery_task = self.__loop.create_task(self.__discover_devices())
             current_time = time() * 1000
             for device in self.__devices:
                 try:
@@ -102,7 +123,26 @@ class SNMPConnector(Connector, Thread):
             if self.__stopped:
                 break
             else:
-                sleep(.2)
+                await asyncio.sleep(.2)
+
+        if self.__discovery_task is not None and not self.__discovery_task.done():
+            self.__discovery_task.cancel()
+
+    async def __discover_devices(self):
+        try:
+            known_ips = {device["ip"] for device in self.__devices} | self.__skipped_discovered_ips
+            for device in await self.__discovery.scan(known_ips):
+                if self.__find_device_by_name(device["deviceName"]) is not None:
+                    self._log.warning("Discovered device \"%s\" with ip %s has the same name as a known device, "
+                                      "skipping it", device["deviceName"], device["ip"])
+                    self.__skipped_discovered_ips.add(device["ip"])
+                    continue
+                self.__fill_device_converters(device)
+                self.__devices.append(device)
+                self._log.info("Discovered device \"%s\" with ip %s using profile \"%s\"",
+                               device["deviceName"], device["ip"], device["discoveryProfile"])
+        except Exception as e:
+            self._log.exception(e)
 
     def close(self):
         self.__stopped = True
@@ -126,14 +166,104 @@ class SNMPConnector(Connector, Thread):
     def get_config(self):
         return self.__config
 
+    def update_config(self, config):
+        """
+        Applies a new connector configuration without restarting the connector.
+        The device lists are diffed by device name on the connector event loop between two poll passes:
+        unchanged devices keep their converters, poll phase and cached tables,
+        edited devices keep their poll phase, removed devices are dropped with their cached state.
+        """
+        if self.__loop.is_closed():
+            self._log.error("Cannot apply configuration update, connector event loop is closed")
+            return
+        self.__loop.call_soon_threadsafe(self.__set_pending_config, config)
+
+    def __set_pending_config(self, config):
+        self.__pending_config = config
+
+    def __apply_config(self, config):
+        try:
+            current_devices = {device["deviceName"]: device for device in self.__devices}
+            devices = []
+            for device_config in config.get("devices", []):
+                device = current_devices.pop(device_config["deviceName"], None)
+                if device is not None and self.__get_device_config(device) == device_config:
+                    devices.append(device)
+                    continue
+
+                if device is not None:
+                    device_config["previous_poll_time"] = device.get("previous_poll_time", 0)
+                    self.__drop_static_table_caches(device["deviceName"])
+                    self._log.info("Device \"%s\" configuration updated", device_config["deviceName"])
+                else:
+                    self._log.info("Device \"%s\" added", device_config["deviceName"])
+                self.__fill_device_converters(device_config)
+                devices.append(device_config)
+
+            for device_name, device in current_devices.items():
+                if "discoveryProfile" in device:
+                    devices.append(device)
+                    continue
+                self.__drop_device_state(device)
+                self._log.info("Device \"%s\" removed", device_name)
+
+            if config.get("discovery") != self.__config.get("discovery"):
+                if self.__discovery_task is not None and not self.__discovery_task.done():
+                    self.__discovery_task.cancel()
+                self.__discovery = None
+                self.__skipped_discovered_ips = set()
+                if config.get("discovery", {}).get("enabled", False):
+                    self.__discovery = SNMPDiscovery(config["discovery"], self._log)
+
+            self.__config = config
+            self.__devices = devices
+        except Exception as e:
+            self._log.exception("Failed to apply configuration update: %r", e)
+
+    @staticmethod
+    def __get_device_config(device):
+        return {key: value for key, value in device.items() if key not in RUNTIME_DEVICE_KEYS}
+
+    def __drop_static_table_caches(self, device_name):
+        for cache_key in [cache_key for cache_key in self.__static_table_caches if cache_key[0] == device_name]:
+            del self.__static_table_caches[cache_key]
+
+    def __drop_device_state(self, device):
+        self.__drop_static_table_caches(device["deviceName"])
+        # Converters keeping per-device state between polls (e.g. rate history) can release it
+        clear_device_state = getattr(device.get("uplink_converter"), "clear_device_state", None)
+        if clear_device_state is not None:
+            try:
+                clear_device_state()
+            except Exception as e:
+                self._log.exception("Failed to clear converter state of device \"%s\": %r", device["deviceName"], e)
+
     def collect_statistic_and_send(self, connector_name, connector_id, data):
+        data.metadata.update({'sendToStorageTs': int(time() * 1000)})
+
         self.statistics["MessagesReceived"] = self.statistics["MessagesReceived"] + 1
         self.__gateway.send_to_storage(connector_name, connector_id, data)
         self.statistics["MessagesSent"] = self.statistics["MessagesSent"] + 1
 
     async def __process_data(self, device):
+        data_retrieving_started = int(time() * 1000)
         common_parameters = self.__get_common_parameters(device)
         device_responses = {}
+        network_time = 0.0
+        sys_uptime = None
+        if any(datatype_config.get("staticOid") for datatype in self.__datatypes
+               for datatype_config in device[datatype]):
+            try:
+                request_started = monotonic()
+                sys_uptime = await self.__process_methods("get", common_parameters, {"oid": SYS_UPTIME_OID})
+                network_time += monotonic() - request_started
+            except SNMPTimeoutException:
+                self._log.error("Timeout exception on connection to device \"%s\" with ip: \"%s\"",
+                                device["deviceName"],
+                                device["ip"])
+                return
+            except Exception as e:
+                self._log.debug("Cannot read sysUpTime of device \"%s\": %r", device["deviceName"], e)
         for datatype in self.__datatypes:
             for datatype_config in device[datatype]:
                 try:
@@ -145,7 +275,13 @@ class SNMPConnector(Connector, Thread):
                         method = method.lower()
                     if method not in self.__methods:
                         self._log.error("Unknown method: %s, configuration is: %r", method, datatype_config)
-                    response = await self.__process_methods(method, common_parameters, datatype_config)
+                    request_started = monotonic()
+                    if datatype_config.get("staticOid") and method in ("multiwalk", "bulkwalk"):
+                        response = await self.__process_cached_table(device, method, common_parameters,
+                                                                     datatype_config, sys_uptime)
+                    else:
+                        response = await self.__process_methods(method, common_parameters, datatype_config)
+                    network_time += monotonic() - request_started
                     device_responses[datatype_config['key']] = response
 
                     StatisticsService.count_connector_message(self.name, stat_parameter_name='connectorMsgsReceived')
@@ -160,13 +296,50 @@ class SNMPConnector(Connector, Thread):
                     self._log.exception(e)
 
         if device_responses:
+            received_ts = int(time() * 1000)
             converted_data: ConvertedData = device["uplink_converter"].convert(device, device_responses)
 
+            if converted_data is not None:
+                converted_data.add_to_metadata({
+                    CONNECTOR_PARAMETER: self.get_name(),
+                    DATA_RETRIEVING_STARTED: data_retrieving_started,
+                    RECEIVED_TS_PARAMETER: received_ts,
+                    CONVERTED_TS_PARAMETER: int(time() * 1000),
+                    NETWORK_RTT_PARAMETER: int(network_time * 1000)
+                })
+
             if (converted_data is not None and
                     (converted_data.attributes_datapoints_count > 0 or
                      converted_data.telemetry_datapoints_count > 0)):
                 self.collect_statistic_and_send(self.get_name(), self.get_id(), converted_data)
 
+    async def __process_cached_table(self, device, method, common_parameters, datatype_config, sys_uptime):
+        cache_key = (device["deviceName"], datatype_config["key"])
+        cache = self.__static_table_caches.get(cache_key)
+        if cache is None:
+            cache = StaticTableCache(list(datatype_config["oid"]), datatype_config["staticOid"])
+            self.__static_table_caches[cache_key] = cache
+
+        if not cache.is_valid(sys_uptime):
+            response = await self.__process_methods(method, common_parameters, datatype_config)
+            cache.update(response, sys_uptime)
+            return response
+        if not cache.dynamic_oids:
+            cache.update_sys_uptime(sys_uptime)
+            return cache.merge({})
+
+        dynamic_response = await self.__process_methods(method, common_parameters,
+                                                        {**datatype_config, "oid": cache.dynamic_oids})
+        if cache.is_actual_for(dynamic_response):
+            cache.update_sys_uptime(sys_uptime)
+        else:
+            self._log.debug("Index set of \"%s\" changed for device \"%s\", refreshing static columns",
+                            datatype_config["key"], device["deviceName"])
+            static_response = await self.__process_methods(method, common_parameters,
+                                                           {**datatype_config, "oid": cache.static_oids})
+            cache.update({**static_response, **dynamic_response}, sys_uptime)
+        return cache.merge(dynamic_response)
+
     async def __process_methods(self, method, common_parameters, datatype_config):
         client = Client(ip=common_parameters['ip'],
                         port=common_parameters['port'],
@@ -237,16 +410,19 @@ class SNMPConnector(Connector, Thread):
     def __fill_converters(self):
         try:
             for device in self.__devices:
-                device["uplink_converter"] = TBModuleLoader.import_module("snmp", device.get('converter',
-                                                                                             self._default_converters[
-                                                                                                 "uplink"]))(device,
-                                                                                                             self._converter_log)
-                device["downlink_converter"] = TBModuleLoader.import_module("snmp", device.get('downlink_converter',
-                                                                                               self._default_converters[
-                                                                                                   "downlink"]))(device)
+                self.__fill_device_converters(device)
         except Exception as e:
             self._log.exception(e)
 
+    def __fill_device_converters(self, device):
+        device["uplink_converter"] = TBModuleLoader.import_module("snmp", device.get('converter',
+                                                                                     self._default_converters[
+                                                                                         "uplink"]))(device,
+                                                                                                     self._converter_log)
+        device["downlink_converter"] = TBModuleLoader.import_module("snmp", device.get('downlink_converter',
+                                                                                       self._default_converters[
+                                                                                           "downlink"]))(device)
+
     @staticmethod
     def __get_common_parameters(device):
         return {"ip": gethostbyname(device["ip"]),
@@ -1,16 +1,17 @@
 from thingsboard_gateway.connectors.converter import Converter
+from thingsboard_gateway.connectors.converter_logger import ConverterLogger
+from thingsboard_gateway.connectors.report_strategy_cache import get_report_strategy, convert_key_to_datapoint_key
 from thingsboard_gateway.gateway.constants import REPORT_STRATEGY_PARAMETER
 from thingsboard_gateway.gateway.entities.converted_data import ConvertedData
-from thingsboard_gateway.gateway.entities.report_strategy_config import ReportStrategyConfig
 from thingsboard_gateway.gateway.entities.telemetry_entry import TelemetryEntry
 from thingsboard_gateway.gateway.statistics.statistics_service import StatisticsService
 from thingsboard_gateway.gateway.statistics.decorators import CollectStatistics
-from thingsboard_gateway.tb_utility.tb_utility import TBUtility
 
 
 class SNMPUplinkConverter(Converter):
     def __init__(self, config, logger):
         self._log = logger
+        self._hot_log = ConverterLogger(logger)
         self.__config = config
 
     @CollectStatistics(start_stat_type='receivedBytesFromDevices',
@@ -19,15 +20,11 @@ class SNMPUplinkConverter(Converter):
         device_name = self.__config['deviceName']
         device_type = self.__config['deviceType']
 
-        self._log.info("PAKAI DEFAULT KONVERTER")
+        self._hot_log.debug(("converterUsed", device_name), "PAKAI DEFAULT KONVERTER")
 
         converted_data = ConvertedData(device_name=device_name, device_type=device_type)
 
-        device_report_strategy = None
-        try:
-            device_report_strategy = ReportStrategyConfig(self.__config.get(REPORT_STRATEGY_PARAMETER))
-        except ValueError as e:
-            self._log.trace("Report strategy config is not specified for device %s: %s", self.__config['deviceName'], e)
+        device_report_strategy = get_report_strategy(self.__config.get(REPORT_STRATEGY_PARAMETER), self._log)
 
         try:
             for datatype in ('attributes', 'telemetry'):
@@ -53,7 +50,7 @@ class SNMPUplinkConverter(Converter):
                         value = item_data
 
                     if value:
-                        datapoint_key = TBUtility.convert_key_to_datapoint_key(data_key, device_report_strategy,
+                        datapoint_key = convert_key_to_datapoint_key(data_key, device_report_strategy,
                                                                                datatype_config, self._log)
                         if datatype == 'attributes':
                             converted_data.add_to_attributes(datapoint_key, value)
@@ -64,7 +61,7 @@ class SNMPUplinkConverter(Converter):
             StatisticsService.count_connector_message(self._log.name, 'convertersMsgDropped')
             self._log.exception(e)
 
-        self._log.debug(converted_data)
+        self._hot_log.debug(("convertedData", device_name), "%s", converted_data)
         StatisticsService.count_connector_message(self._log.name, 'convertersAttrProduced',
                                                   count=converted_data.attributes_datapoints_count)
         StatisticsService.count_connector_message(self._log.name, 'convertersTsProduced',
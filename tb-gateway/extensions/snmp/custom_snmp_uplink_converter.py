@@ -3,28 +3,96 @@ import os
 import sys
 
 from thingsboard_gateway.connectors.converter import Converter
+from thingsboard_gateway.connectors.converter_logger import ConverterLogger
+from thingsboard_gateway.connectors.report_strategy_cache import get_report_strategy, convert_key_to_datapoint_key
 from thingsboard_gateway.gateway.constants import REPORT_STRATEGY_PARAMETER
 from thingsboard_gateway.gateway.entities.converted_data import ConvertedData
-from thingsboard_gateway.gateway.entities.report_strategy_config import ReportStrategyConfig
 from thingsboard_gateway.gateway.entities.telemetry_entry import TelemetryEntry
 from thingsboard_gateway.gateway.statistics.statistics_service import StatisticsService
 from thingsboard_gateway.gateway.statistics.decorators import CollectStatistics
-from thingsboard_gateway.tb_utility.tb_utility import TBUtility
 from datetime import timedelta
 from puresnmp.types import TimeTicks
-from collections import defaultdict
+from collections import Counter, defaultdict
 import json
 
 sys.path.append(os.path.dirname(os.path.abspath(__file__)))
-from parse_interface_data import parse_interface_data
-from parse_storage_data import parse_storage_data
+from parse_interface_data import parse_interface_data, clear_interface_history
+from parse_storage_data import parse_storage_data, clear_storage_inventory
 from parse_processor_data import parse_processor_data
 
+NESTED_TABLE_OUTPUT_MODE = "nested"
+FLAT_TABLE_OUTPUT_MODE = "flat"
+
+# table name -> (flattened key prefix, row field used as the row name)
+FLAT_TABLE_KEYS = {
+    "interfaces": ("if", "ifKey"),
+    "storages": ("storage", "name"),
+    "processors": ("cpu", "index")
+}
+
 class CustomSNMPUplinkConverter(Converter):
     def __init__(self, config, logger):
         self._log = logger
+        self._hot_log = ConverterLogger(logger)
         self.__config = config
         self.SCALE_MAP = {"cpuTemperature": 0.1}  
+        self.__table_output_mode = str(config.get('tableOutputMode', NESTED_TABLE_OUTPUT_MODE)).lower()
+        if self.__table_output_mode not in (NESTED_TABLE_OUTPUT_MODE, FLAT_TABLE_OUTPUT_MODE):
+            self._log.error("Unknown table output mode \"%s\" for device %s, using \"%s\"",
+                            self.__table_output_mode, config.get('deviceName'), NESTED_TABLE_OUTPUT_MODE)
+            self.__table_output_mode = NESTED_TABLE_OUTPUT_MODE
+
+    def clear_device_state(self):
+        """Drops interface rate history and storage inventory of the device, called when the device is removed."""
+        clear_interface_history(self.__config['deviceName'])
+        clear_storage_inventory(self.__config['deviceName'])
+
+    def __add_table_to_telemetry(self, converted_data, table_name, rows):
+        if self.__table_output_mode == NESTED_TABLE_OUTPUT_MODE:
+            converted_data.add_to_telemetry(TelemetryEntry({table_name: rows}))
+            return
+
+        # Every row field becomes its own datapoint, e.g. "if.ether1.ifInThroughputBps",
+        # so the gateway can split the message by maxPayloadSizeBytes and the server can index the keys
+        prefix, name_field = FLAT_TABLE_KEYS[table_name]
+        row_names = []
+        for row in rows:
+            row_name = row.get(name_field)
+            if row_name is None or row_name == '':
+                row_name = row.get('index', row.get('ifIndex'))
+            row_names.append(str(row_name).replace('.', '_'))
+
+        # Rows sharing a name (e.g. the same ifKey or storage description) get the row index appended,
+        # otherwise their keys would overwrite each other. The suffixed name may itself be a row name
+        # (e.g. "eth0_2"), so it is checked against all names already taken
+        name_counts = Counter(row_names)
+        taken_names = set(name_counts)
+        duplicate_names = [row_name for row_name, name_count in name_counts.items() if name_count > 1]
+        if duplicate_names:
+            self._hot_log.warning(("duplicateRowNames", self.__config.get('deviceName'), table_name),
+                                  "Duplicate %s row names %s for device %s, row index is appended to their keys",
+                                  table_name, duplicate_names, self.__config.get('deviceName'))
+
+        values = {}
+        for row_position, (row, row_name) in enumerate(zip(rows, row_names)):
+            if name_counts[row_name] > 1:
+                row_name = self.__get_free_row_name(f"{row_name}_{row.get('index', row.get('ifIndex', row_position))}",
+                                                    taken_names)
+            for field, value in row.items():
+                if field != name_field:
+                    values[f"{prefix}.{row_name}.{field}"] = value
+        if values:
+            converted_data.add_to_telemetry(TelemetryEntry(values))
+
+    @staticmethod
+    def __get_free_row_name(row_name, taken_names):
+        free_row_name = row_name
+        suffix = 2
+        while free_row_name in taken_names:
+            free_row_name = f"{row_name}_{suffix}"
+            suffix += 1
+        taken_names.add(free_row_name)
+        return free_row_name
 
     @CollectStatistics(start_stat_type='receivedBytesFromDevices',
                        end_stat_type='convertedBytesFromDevice')
@@ -32,53 +100,50 @@ class CustomSNMPUplinkConverter(Converter):
         device_name = self.__config['deviceName']
         device_type = self.__config['deviceType']
 
-        self._log.info("Custom SNMP Uplink Converter Dipakai untuk device: %s", device_name)
+        self._hot_log.debug(("converterUsed", device_name), "Custom SNMP Uplink Converter Dipakai untuk device: %s",
+                            device_name)
         converted_data = ConvertedData(device_name=device_name, device_type=device_type)
-        device_report_strategy = None
-        try:
-             device_report_strategy = ReportStrategyConfig(self.__config.get(REPORT_STRATEGY_PARAMETER))
-        except ValueError as e:
-             self._log.trace("Report strategy config is not specified for device %s: %s", self.__config['deviceName'], e)
+        device_report_strategy = get_report_strategy(self.__config.get(REPORT_STRATEGY_PARAMETER), self._log)
 
         # Handle named metrics first
         if 'interfaceMetrics' in data:
             try:
-                self._log.info("Parsing interface data for device: %s", device_name)
+                self._hot_log.debug(("parsingInterfaces", device_name), "Parsing interface data for device: %s", device_name)
                 interface_data = data['interfaceMetrics']
-                interfaces = parse_interface_data(interface_data, device_name)
-                self._log.info(f"Found {len(interfaces)} interfaces for device: {device_name}")
+                interfaces = parse_interface_data(interface_data, device_name, data.get('sysUpTime'))
+                self._hot_log.info(("interfacesFound", device_name), "Found %d interfaces for device: %s",
+                                   len(interfaces), device_name)
                 
                 if interfaces:
-                    telemetry_entry = TelemetryEntry({"interfaces": interfaces})
-                    converted_data.add_to_telemetry(telemetry_entry)
+                    self.__add_table_to_telemetry(converted_data, "interfaces", interfaces)
                         
             except Exception as e:
                 self._log.exception("Error parsing interface data for device %s: %s", device_name, str(e))
 
         if 'storageMetrics' in data:
             try:
-                self._log.info("Parsing storage data for device: %s", device_name)
+                self._hot_log.debug(("parsingStorages", device_name), "Parsing storage data for device: %s", device_name)
                 storage_data = data['storageMetrics']
                 storages = parse_storage_data(storage_data, device_name)
-                self._log.info(f"Found {len(storages)} storage devices for device: %s", device_name)
+                self._hot_log.info(("storagesFound", device_name), "Found %d storage devices for device: %s",
+                                   len(storages), device_name)
                 
                 if storages:
-                    telemetry_entry = TelemetryEntry({"storages": storages})
-                    converted_data.add_to_telemetry(telemetry_entry)
+                    self.__add_table_to_telemetry(converted_data, "storages", storages)
                         
             except Exception as e:
                 self._log.exception("Error parsing storage data for device %s: %s", device_name, str(e))
 
         if 'hrProcessorLoad' in data:
             try:
-                self._log.info("Parsing processor data for device: %s", device_name)
+                self._hot_log.debug(("parsingProcessors", device_name), "Parsing processor data for device: %s", device_name)
                 processor_data = data['hrProcessorLoad']
                 processors = parse_processor_data(processor_data, device_name)
-                self._log.info(f"Found {len(processors)} processors for device: %s", device_name)
+                self._hot_log.info(("processorsFound", device_name), "Found %d processors for device: %s",
+                                   len(processors), device_name)
                 
                 if processors:
-                    telemetry_entry = TelemetryEntry({"processors": processors})
-                    converted_data.add_to_telemetry(telemetry_entry)
+                    self.__add_table_to_telemetry(converted_data, "processors", processors)
                         
             except Exception as e:
                 self._log.exception("Error parsing processor data for device %s: %s", device_name, str(e))
@@ -87,13 +152,13 @@ class CustomSNMPUplinkConverter(Converter):
         interface_oids_present = any(key.startswith('1.3.6.1.2.1.2.2.1.') or key.startswith('1.3.6.1.2.1.31.1.1.1.') for key in data.keys())
         if interface_oids_present and 'interfaceMetrics' not in data:
             try:
-                self._log.info("Parsing interface data from direct OIDs for device: %s", device_name)
-                interfaces = parse_interface_data(data, device_name)
-                self._log.info(f"Found {len(interfaces)} interfaces for device: %s", device_name)
+                self._hot_log.debug(("parsingInterfaces", device_name), "Parsing interface data from direct OIDs for device: %s", device_name)
+                interfaces = parse_interface_data(data, device_name, data.get('sysUpTime'))
+                self._hot_log.info(("interfacesFound", device_name), "Found %d interfaces for device: %s",
+                                   len(interfaces), device_name)
                 
                 if interfaces:
-                    telemetry_entry = TelemetryEntry({"interfaces": interfaces})
-                    converted_data.add_to_telemetry(telemetry_entry)
+                    self.__add_table_to_telemetry(converted_data, "interfaces", interfaces)
                         
             except Exception as e:
                 self._log.exception("Error parsing direct interface OIDs for device %s: %s", device_name, str(e))
@@ -101,13 +166,13 @@ class CustomSNMPUplinkConverter(Converter):
         storage_oids_present = any(key.startswith('1.3.6.1.2.1.25.2.3.1.') for key in data.keys())
         if storage_oids_present and 'storageMetrics' not in data:
             try:
-                self._log.info("Parsing storage data from direct OIDs for device: %s", device_name)
+                self._hot_log.debug(("parsingStorages", device_name), "Parsing storage data from direct OIDs for device: %s", device_name)
                 storages = parse_storage_data(data, device_name)
-                self._log.info(f"Found {len(storages)} storage devices for device: %s", device_name)
+                self._hot_log.info(("storagesFound", device_name), "Found %d storage devices for device: %s",
+                                   len(storages), device_name)
                 
                 if storages:
-                    telemetry_entry = TelemetryEntry({"storages": storages})
-                    converted_data.add_to_telemetry(telemetry_entry)
+                    self.__add_table_to_telemetry(converted_data, "storages", storages)
                         
             except Exception as e:
                 self._log.exception("Error parsing direct storage OIDs for device %s: %s", device_name, str(e))
@@ -115,13 +180,13 @@ class CustomSNMPUplinkConverter(Converter):
         processor_oids_present = any(key.startswith('1.3.6.1.2.1.25.3.3.1.2.') for key in data.keys())
         if processor_oids_present and 'hrProcessorLoad' not in data:
             try:
-                self._log.info("Parsing processor data from direct OIDs for device: %s", device_name)
+                self._hot_log.debug(("parsingProcessors", device_name), "Parsing processor data from direct OIDs for device: %s", device_name)
                 processors = parse_processor_data(data, device_name)
-                self._log.info(f"Found {len(processors)} processors for device: %s", device_name)
+                self._hot_log.info(("processorsFound", device_name), "Found %d processors for device: %s",
+                                   len(processors), device_name)
                 
                 if processors:
-                    telemetry_entry = TelemetryEntry({"processors": processors})
-                    converted_data.add_to_telemetry(telemetry_entry)
+                    self.__add_table_to_telemetry(converted_data, "processors", processors)
                         
             except Exception as e:
                 self._log.exception("Error parsing direct processor OIDs for device %s: %s", device_name, str(e))
@@ -175,7 +240,7 @@ class CustomSNMPUplinkConverter(Converter):
                         value = str(item_data)
 
                     if value is not None:
-                        datapoint_key = TBUtility.convert_key_to_datapoint_key(
+                        datapoint_key = convert_key_to_datapoint_key(
                             data_key, 
                             device_report_strategy,
                             datatype_config, 
@@ -191,7 +256,7 @@ class CustomSNMPUplinkConverter(Converter):
             StatisticsService.count_connector_message(self._log.name, 'convertersMsgDropped')
             self._log.exception("Error processing non-interface/storage/processor data for device %s: %s", device_name, str(e))
 
-        self._log.debug(converted_data)
+        self._hot_log.debug(("convertedData", device_name), "%s", converted_data)
         StatisticsService.count_connector_message(
             self._log.name, 
             'convertersAttrProduced',
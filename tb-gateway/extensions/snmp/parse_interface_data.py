@@ -1,11 +1,13 @@
-import json
 import re
 import time
 from datetime import timedelta
 
+from snmp_value_decoder import decode_table, decode_phys_address, decode_raw_data
+
 _interface_history = {}
+_interface_identity = {}
 
-def parse_interface_data(raw_data, device_name=None):
+def parse_interface_data(raw_data, device_name=None, sys_uptime=None):
     global _interface_history
     current_time = time.time()
     
@@ -15,79 +17,49 @@ def parse_interface_data(raw_data, device_name=None):
     if device_name not in _interface_history:
         _interface_history[device_name] = {}
     
+    if device_name not in _interface_identity:
+        _interface_identity[device_name] = {'sys_uptime': None, 'keys': {}}
+    
     device_history = _interface_history[device_name]
+    device_identity = _interface_identity[device_name]
+
+    uptime_seconds = get_uptime_seconds(sys_uptime)
+    counters_reset = (uptime_seconds is not None and device_identity['sys_uptime'] is not None
+                      and uptime_seconds < device_identity['sys_uptime'])
+    if counters_reset:
+        device_identity['keys'] = {}
+    if uptime_seconds is not None:
+        device_identity['sys_uptime'] = uptime_seconds
     
-    if isinstance(raw_data, dict):
-        data = raw_data
-    elif isinstance(raw_data, str):
-        try:
-            data = json.loads(raw_data)
-        except json.JSONDecodeError:
-            try:
-                data = eval(raw_data)
-            except:
-                raise ValueError("Cannot parse raw_data as JSON or dict")
-    else:
-        raise ValueError("raw_data must be dict or string")
+    data = decode_raw_data(raw_data)
     
     base_oids = {
         '1.3.6.1.2.1.2.2.1.2': 'ifDescr',
         '1.3.6.1.2.1.2.2.1.3': 'ifType',
         '1.3.6.1.2.1.2.2.1.4': 'ifMtu',
+        '1.3.6.1.2.1.2.2.1.6': 'ifPhysAddress',
         '1.3.6.1.2.1.2.2.1.8': 'ifOperStatus',
         '1.3.6.1.2.1.2.2.1.9': 'ifLastChange',
         '1.3.6.1.2.1.2.2.1.13': 'ifInDiscards',
         '1.3.6.1.2.1.2.2.1.14': 'ifInErrors',
         '1.3.6.1.2.1.2.2.1.20': 'ifOutErrors',
+        '1.3.6.1.2.1.31.1.1.1.1': 'ifName',
         '1.3.6.1.2.1.31.1.1.1.6': 'ifHCInOctets',
         '1.3.6.1.2.1.31.1.1.1.10': 'ifHCOutOctets',
-        '1.3.6.1.2.1.31.1.1.1.15': 'ifHighSpeed'
+        '1.3.6.1.2.1.31.1.1.1.15': 'ifHighSpeed',
+        '1.3.6.1.2.1.31.1.1.1.18': 'ifAlias'
     }
     
-    interfaces = {}
-
-    for oid, value in data.items():
-        matched_base_oid = None
-        for base_oid, attr_name in base_oids.items():
-            if oid.startswith(base_oid + '.'):
-                matched_base_oid = base_oid
-                break
-        
-        if matched_base_oid:
-            if_index = oid.split('.')[-1]
-            
-            if if_index not in interfaces:
-                interfaces[if_index] = {'ifIndex': int(if_index)}
-            
-            processed_value = value
-            if isinstance(value, str):
-                if value.startswith("b'") and value.endswith("'"):
-                    processed_value = value[2:-1]
-                elif value.startswith('b"') and value.endswith('"'):
-                    processed_value = value[2:-1]
-                elif value.isdigit():
-                    processed_value = int(value)
-            elif isinstance(value, bytes):
-                try:
-                    processed_value = value.decode('utf-8')
-                except UnicodeDecodeError:
-                    processed_value = str(value)
-            elif isinstance(value, timedelta):
-                processed_value = str(value)
-            elif isinstance(value, (int, float)):
-                processed_value = value
-            else:
-                try:
-                    json.dumps(value)
-                    processed_value = value
-                except (TypeError, ValueError):
-                    processed_value = str(value)
-            
-            attr_name = base_oids[matched_base_oid]
-            interfaces[if_index][attr_name] = processed_value
+    interfaces = decode_table(data, base_oids, 'ifIndex', {'ifPhysAddress': decode_phys_address})
 
     for if_index, interface in interfaces.items():
         if_idx = int(if_index)
+        if_key = get_interface_key(interface)
+        if if_key is None:
+            if_key = device_identity['keys'].get(if_idx, str(if_idx))
+        else:
+            device_identity['keys'][if_idx] = if_key
+        interface['ifKey'] = if_key
         
         in_octets = interface.get('ifHCInOctets', 0)
         out_octets = interface.get('ifHCOutOctets', 0)
@@ -95,8 +67,8 @@ def parse_interface_data(raw_data, device_name=None):
         interface['ifInThroughputBps'] = 0
         interface['ifOutThroughputBps'] = 0
         
-        if if_idx in device_history:
-            prev_data = device_history[if_idx]
+        if if_key in device_history and not counters_reset:
+            prev_data = device_history[if_key]
             time_diff = current_time - prev_data['timestamp']
             
             if time_diff > 5:
@@ -118,26 +90,57 @@ def parse_interface_data(raw_data, device_name=None):
                 interface['ifInThroughputBps'] = in_bps
                 interface['ifOutThroughputBps'] = out_bps
         
-        device_history[if_idx] = {
+        device_history[if_key] = {
             'timestamp': current_time,
             'in_octets': in_octets,
             'out_octets': out_octets
         }
     
+    for if_idx in [idx for idx in device_identity['keys'] if str(idx) not in interfaces]:
+        del device_identity['keys'][if_idx]
+    
     cutoff_time = current_time - (24 * 60 * 60)
     to_remove = []
-    for if_idx, data in device_history.items():
+    for if_key, data in device_history.items():
         if data['timestamp'] < cutoff_time:
-            to_remove.append(if_idx)
+            to_remove.append(if_key)
     
-    for if_idx in to_remove:
-        del device_history[if_idx]
+    for if_key in to_remove:
+        del device_history[if_key]
     
     return sorted(interfaces.values(), key=lambda x: x['ifIndex'])
 
+def get_interface_key(interface):
+    if_name = interface.get('ifName')
+    if if_name:
+        return str(if_name)
+    if_descr = interface.get('ifDescr')
+    if_phys_address = interface.get('ifPhysAddress')
+    if if_descr and if_phys_address:
+        return f"{if_descr}/{if_phys_address}"
+    if if_descr:
+        return str(if_descr)
+    return None
+
+def get_uptime_seconds(sys_uptime):
+    if sys_uptime is None:
+        return None
+    if isinstance(sys_uptime, timedelta):
+        return sys_uptime.total_seconds()
+    if hasattr(sys_uptime, 'value'):
+        return sys_uptime.value / 100
+    if isinstance(sys_uptime, (int, float)):
+        return sys_uptime / 100
+    return None
+
 def get_interface_history():
     return _interface_history
 
-def clear_interface_history():
-    global _interface_history
+def clear_interface_history(device_name=None):
+    global _interface_history, _interface_identity
+    if device_name is not None:
+        _interface_history.pop(device_name, None)
+        _interface_identity.pop(device_name, None)
+        return
     _interface_history = {}
+    _interface_identity = {}
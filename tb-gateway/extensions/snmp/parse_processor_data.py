@@ -1,48 +1,22 @@
-import json
 import re
 from datetime import timedelta
 
+from snmp_value_decoder import decode_table, decode_int, decode_raw_data
+
 def parse_processor_data(raw_data, device_name=None):
-    if isinstance(raw_data, dict):
-        data = raw_data
-    elif isinstance(raw_data, str):
-        try:
-            data = json.loads(raw_data)
-        except json.JSONDecodeError:
-            try:
-                data = eval(raw_data)
-            except:
-                raise ValueError("Cannot parse raw_data as JSON or dict")
-    else:
-        raise ValueError("raw_data must be dict or string")
+    data = decode_raw_data(raw_data)
     
-    base_oid = '1.3.6.1.2.1.25.3.3.1.2'
+    base_oids = {
+        '1.3.6.1.2.1.25.3.3.1.2': 'load'
+    }
     
-    processors = {}
+    processors = decode_table(data, base_oids, 'index', {'load': decode_int})
 
-    for oid, value in data.items():
-        if oid.startswith(base_oid + '.'):
-            processor_index = oid.split('.')[-1]
-            
-            if processor_index not in processors:
-                processors[processor_index] = {'index': int(processor_index)}
-            
-            processed_value = value
-            if isinstance(value, str):
-                if value.isdigit():
-                    processed_value = int(value)
-            elif isinstance(value, (int, float)):
-                processed_value = int(value)
-            else:
-                try:
-                    processed_value = int(str(value))
-                except (ValueError, TypeError):
-                    processed_value = 0
-            
-            processors[processor_index]['load'] = processed_value
-            processors[processor_index]['load_percent'] = processed_value
-            processors[processor_index]['status'] = get_load_status(processed_value)
-            processors[processor_index]['level'] = get_load_level(processed_value)
+    for processor in processors.values():
+        processed_value = processor['load']
+        processor['load_percent'] = processed_value
+        processor['status'] = get_load_status(processed_value)
+        processor['level'] = get_load_level(processed_value)
     
     processor_list = list(processors.values())
     if len(processor_list) > 1:
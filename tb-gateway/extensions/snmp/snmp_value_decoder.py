@@ -0,0 +1,186 @@
+import json
+import re
+from ast import literal_eval
+from datetime import timedelta
+
+_REPR_ITEM = re.compile(r"""(?:'([^'\\]*)'|"([^"\\]*)"): """
+                        r"""(-?\d+(?:\.\d+)?(?:e[+-]?\d+)?|b?'(?:[^'\\]|\\.)*'|b?"(?:[^"\\]|\\.)*"|True|False|None)"""
+                        r"""(, |\})""")
+_REPR_CONSTANTS = {'True': True, 'False': False, 'None': None}
+
+def decode_string(value):
+    if value.startswith("b'") and value.endswith("'"):
+        return value[2:-1]
+    elif value.startswith('b"') and value.endswith('"'):
+        return value[2:-1]
+    elif value.isdigit():
+        return int(value)
+    return value
+
+def decode_octets(value):
+    try:
+        return value.decode('utf-8')
+    except UnicodeDecodeError:
+        return str(value)
+
+def decode_time_ticks(value):
+    return str(value)
+
+def decode_phys_address(value):
+    if isinstance(value, bytes):
+        return ':'.join('%02x' % octet for octet in value)
+    return decode_value(value)
+
+def decode_int(value):
+    if isinstance(value, str):
+        if value.isdigit():
+            return int(value)
+        return value
+    elif isinstance(value, (int, float)):
+        return int(value)
+    try:
+        return int(str(value))
+    except (ValueError, TypeError):
+        return 0
+
+def keep_value(value):
+    return value
+
+def to_string(value):
+    return str(value)
+
+# Pythonized ASN.1 types: Counter32/Counter64/Gauge32/Integer -> int, OctetString -> bytes,
+# TimeTicks -> timedelta, ObjectIdentifier/string payloads -> str
+_DECODERS_BY_TYPE = {
+    str: decode_string,
+    bytes: decode_octets,
+    timedelta: decode_time_ticks,
+    int: keep_value,
+    float: keep_value,
+    bool: keep_value,
+    type(None): keep_value,
+    list: keep_value,
+    tuple: keep_value,
+    dict: keep_value
+}
+
+def get_decoder(value_type):
+    decoder = _DECODERS_BY_TYPE.get(value_type)
+    if decoder is None:
+        if issubclass(value_type, str):
+            decoder = decode_string
+        elif issubclass(value_type, bytes):
+            decoder = decode_octets
+        elif issubclass(value_type, timedelta):
+            decoder = decode_time_ticks
+        elif issubclass(value_type, (int, float, list, tuple, dict)):
+            decoder = keep_value
+        else:
+            decoder = to_string
+        _DECODERS_BY_TYPE[value_type] = decoder
+    return decoder
+
+def decode_value(value):
+    return get_decoder(type(value))(value)
+
+def decode_table(data, columns, index_name, column_decoders=None):
+    """
+    Groups {oid: value} varbinds of a single-index SNMP table into rows and decodes them column by column.
+    The decoder of a column is taken from column_decoders or chosen once by the type of its first value.
+    """
+    raw_columns = {}
+    for oid, value in data.items():
+        column_oid, _, index = str(oid).lstrip('.').rpartition('.')
+        attr_name = columns.get(column_oid)
+        if attr_name is not None:
+            if attr_name not in raw_columns:
+                raw_columns[attr_name] = ([], [])
+            indexes, values = raw_columns[attr_name]
+            indexes.append(index)
+            values.append(value)
+
+    rows = {}
+    for attr_name, (indexes, values) in raw_columns.items():
+        decoder = None
+        if column_decoders is not None:
+            decoder = column_decoders.get(attr_name)
+        if decoder is None:
+            column_type = type(values[0])
+            column_decoder = get_decoder(column_type)
+            decoded_values = [column_decoder(value) if type(value) is column_type else decode_value(value)
+                              for value in values]
+        else:
+            decoded_values = [decoder(value) for value in values]
+
+        for index, value in zip(indexes, decoded_values):
+            row = rows.get(index)
+            if row is None:
+                row = rows[index] = {index_name: int(index)}
+            row[attr_name] = value
+
+    return rows
+
+def decode_repr_token(token):
+    if token in _REPR_CONSTANTS:
+        return _REPR_CONSTANTS[token]
+    first = token[0]
+    if first == "'" or first == '"':
+        if '\\' not in token:
+            return token[1:-1]
+        return literal_eval(token)
+    if first == 'b':
+        if '\\' not in token:
+            return token[2:-1].encode('ascii')
+        # bytes repr is pure ASCII with backslash escapes
+        return token[2:-1].encode('ascii').decode('unicode_escape').encode('latin-1')
+    if '.' in token or 'e' in token:
+        return float(token)
+    return int(token)
+
+def decode_flat_repr(raw_data):
+    """
+    Decodes the repr() of a flat {oid: value} dict without building an AST.
+    Returns None if the string has any other shape.
+    """
+    if len(raw_data) < 2 or raw_data[0] != '{' or raw_data[-1] != '}':
+        return None
+    if raw_data == '{}':
+        return {}
+    data = {}
+    position = 1
+    end = len(raw_data)
+    match_item = _REPR_ITEM.match
+    while position < end:
+        item = match_item(raw_data, position)
+        if item is None:
+            return None
+        key, double_quoted_key, token, separator = item.groups()
+        data[key if key is not None else double_quoted_key] = decode_repr_token(token)
+        position = item.end()
+        if separator == '}':
+            return data if position == end else None
+    return None
+
+def decode_raw_data(raw_data):
+    """
+    Accepts a dict, its JSON form or its Python literal repr and returns the dict.
+    Nothing is evaluated: literal_eval is only used for shapes the flat repr decoder does not cover.
+    """
+    if isinstance(raw_data, dict):
+        return raw_data
+    if not isinstance(raw_data, str):
+        raise ValueError("raw_data must be dict or string")
+
+    try:
+        data = json.loads(raw_data)
+    except json.JSONDecodeError:
+        data = decode_flat_repr(raw_data)
+        if data is None:
+            try:
+                data = literal_eval(raw_data)
+            except (ValueError, TypeError, SyntaxError, MemoryError, RecursionError):
+                raise ValueError("Cannot parse raw_data as JSON or dict")
+
+    if not isinstance(data, dict):
+        raise ValueError("Cannot parse raw_data as JSON or dict")
+    return data
@@ -0,0 +1,94 @@
+#     Copyright 2025. ThingsBoard
+#
+#     Licensed under the Apache License, Version 2.0 (the "License");
+#     you may not use this file except in compliance with the License.
+#     You may obtain a copy of the License at
+#
+#         http://www.apache.org/licenses/LICENSE-2.0
+#
+#     Unless required by applicable law or agreed to in writing, software
+#     distributed under the License is distributed on an "AS IS" BASIS,
+#     WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#     See the License for the specific language governing permissions and
+#     limitations under the License.
+
+"""
+Compares snmp_value_decoder.decode_raw_data with the json-then-eval parsing the SNMP parsers used before,
+on a generated interface table passed as its Python repr and as JSON.
+
+Run from the tb-gateway directory:
+    python tests/benchmarks/snmp_value_decoder_benchmark.py [--interfaces 48] [--repeat 5] [--number 200]
+"""
+
+import json
+import os
+import sys
+from argparse import ArgumentParser
+from random import Random
+from timeit import repeat
+
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), os.pardir, os.pardir, 'extensions', 'snmp'))
+from snmp_value_decoder import decode_raw_data  # noqa: E402
+
+SEED = 29
+
+# ifTable/ifXTable columns with the value types puresnmp pythonizes them to
+INTERFACE_COLUMNS = {
+    '1.3.6.1.2.1.2.2.1.2': lambda random, index: f'GigabitEthernet0/{index}'.encode(),
+    '1.3.6.1.2.1.2.2.1.3': lambda random, index: 6,
+    '1.3.6.1.2.1.2.2.1.4': lambda random, index: random.choice((1500, 9000)),
+    '1.3.6.1.2.1.2.2.1.6': lambda random, index: bytes(random.randint(0, 255) for _ in range(6)),
+    '1.3.6.1.2.1.2.2.1.8': lambda random, index: random.choice((1, 2)),
+    '1.3.6.1.2.1.31.1.1.1.6': lambda random, index: random.randint(0, 2 ** 64 - 1),
+    '1.3.6.1.2.1.31.1.1.1.10': lambda random, index: random.randint(0, 2 ** 64 - 1),
+    '1.3.6.1.2.1.31.1.1.1.15': lambda random, index: random.choice((100, 1000, 10000)),
+    '1.3.6.1.2.1.31.1.1.1.18': lambda random, index: f"uplink '{index}'" if index % 4 == 0 else '',
+}
+
+
+def generate_interface_table(interfaces_count):
+    random = Random(SEED)
+    data = {'1.3.6.1.2.1.1.3.0': random.randint(0, 2 ** 32 - 1)}
+    for index in range(1, interfaces_count + 1):
+        for column_oid, generate_value in INTERFACE_COLUMNS.items():
+            data[f'{column_oid}.{index}'] = generate_value(random, index)
+    return data
+
+
+def json_then_eval(raw_data):
+    """The parsing the interface, storage and processor parsers did before decode_raw_data."""
+    try:
+        return json.loads(raw_data)
+    except json.JSONDecodeError:
+        return eval(raw_data)
+
+
+def to_json(data):
+    return json.dumps({oid: value.decode('latin-1') if isinstance(value, bytes) else value
+                       for oid, value in data.items()})
+
+
+def main():
+    parser = ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--interfaces', type=int, default=48, help='interfaces in the generated table')
+    parser.add_argument('--repeat', type=int, default=5, help='timing runs, the best one is reported')
+    parser.add_argument('--number', type=int, default=200, help='payloads decoded per timing run')
+    args = parser.parse_args()
+
+    data = generate_interface_table(args.interfaces)
+    payloads = {'repr': repr(data), 'JSON': to_json(data)}
+    parsers = {'json-then-eval': json_then_eval, 'decode_raw_data': decode_raw_data}
+
+    print(f'Python {sys.version.split()[0]}, {args.interfaces} interfaces, {len(data)} varbinds, '
+          f'repr {len(payloads["repr"]) / 1024:.1f} KB, JSON {len(payloads["JSON"]) / 1024:.1f} KB')
+    for payload_name, payload in payloads.items():
+        expected = json_then_eval(payload)
+        for parser_name, parse in parsers.items():
+            if parse(payload) != expected:
+                raise SystemExit(f'{parser_name} decoded the {payload_name} payload differently')
+            best = min(repeat(lambda: parse(payload), repeat=args.repeat, number=args.number)) / args.number
+            print(f'  {parser_name:<16} {payload_name:<5} {best * 1e6:8.0f} us/payload {1 / best:8.0f} payloads/s')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,164 @@
+#     Copyright 2025. ThingsBoard
+#
+#     Licensed under the Apache License, Version 2.0 (the "License");
+#     you may not use this file except in compliance with the License.
+#     You may obtain a copy of the License at
+#
+#         http://www.apache.org/licenses/LICENSE-2.0
+#
+#     Unless required by applicable law or agreed to in writing, software
+#     distributed under the License is distributed on an "AS IS" BASIS,
+#     WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#     See the License for the specific language governing permissions and
+#     limitations under the License.
+
+import logging
+from math import isnan
+from random import Random
+from unittest import TestCase
+
+from pymodbus.bit_read_message import ReadCoilsResponse, ReadDiscreteInputsResponse
+from pymodbus.constants import Endian
+from pymodbus.exceptions import ModbusIOException
+from pymodbus.pdu import ExceptionResponse
+from pymodbus.register_read_message import ReadHoldingRegistersResponse, ReadInputRegistersResponse
+
+from thingsboard_gateway.connectors.modbus.bytes_modbus_uplink_converter import BytesModbusUplinkConverter
+from thingsboard_gateway.connectors.modbus.read_planner import plan_reads, is_failed_response, \
+    MAX_REGISTERS_PER_READ, MAX_BITS_PER_READ
+
+RESPONSE_TYPES = {1: ReadCoilsResponse, 2: ReadDiscreteInputsResponse,
+                  3: ReadHoldingRegistersResponse, 4: ReadInputRegistersResponse}
+# (type, objectsCount) pairs the converter decodes from registers and from bits
+REGISTER_TAG_TYPES = [("16int", 1), ("16uint", 1), ("32float", 2), ("32int", 2), ("64uint", 4), ("64float", 4),
+                      ("string", 3), ("bits", 1), ("16float", 1)]
+BIT_TAG_TYPES = [("bits", 1), ("bits", 5), ("bits", 16), ("8uint", 8), ("16int", 16)]
+MEMORY_SIZE = 4096
+
+
+class ModbusMemory:
+    """Slave memory answering reads the way a pymodbus server does, bit responses are padded to whole bytes."""
+
+    def __init__(self, random):
+        self.__registers = {function_code: [random.randint(0, 0xFFFF) for _ in range(MEMORY_SIZE)]
+                            for function_code in (3, 4)}
+        self.__bits = {function_code: [random.random() < 0.5 for _ in range(MEMORY_SIZE)]
+                       for function_code in (1, 2)}
+
+    def read(self, function_code, address, objects_count):
+        if function_code in (1, 2):
+            bits = self.__bits[function_code][address:address + objects_count]
+            return RESPONSE_TYPES[function_code](bits + [False] * (-len(bits) % 8))
+        return RESPONSE_TYPES[function_code](self.__registers[function_code][address:address + objects_count])
+
+
+def random_tags(random, count):
+    tags = []
+    for index in range(count):
+        function_code = random.choice((1, 2, 3, 4))
+        tag_type, objects_count = random.choice(BIT_TAG_TYPES if function_code in (1, 2) else REGISTER_TAG_TYPES)
+        config = {"tag": f"tag{index}", "type": tag_type, "functionCode": function_code,
+                  "address": random.randint(0, 150), "objectsCount": objects_count}
+        tags.append((random.choice(("attributes", "telemetry")), config))
+    return tags
+
+
+def decoded(converter, response, config):
+    try:
+        value = converter.decode_data(response, config, Endian.Big, Endian.Big)
+    except Exception as e:
+        return "error", type(e).__name__
+    if isinstance(value, float) and isnan(value):
+        return "nan", None
+    return type(value), value
+
+
+class ReadPlannerTests(TestCase):
+    def setUp(self):
+        log = logging.getLogger("test_read_planner")
+        log.setLevel(logging.CRITICAL)
+        self.converter = BytesModbusUplinkConverter(None, log)
+
+    def test_block_slices_match_individual_reads(self):
+        random = Random(1)
+        memory = ModbusMemory(random)
+        for _ in range(300):
+            tags = random_tags(random, random.randint(1, 30))
+            max_gap = random.choice((0, 0, 1, 5, 20))
+            max_registers = random.choice((4, 10, MAX_REGISTERS_PER_READ))
+            max_bits = random.choice((16, 40, MAX_BITS_PER_READ))
+            blocks = plan_reads(tags, max_gap=max_gap, max_registers_per_read=max_registers,
+                                max_bits_per_read=max_bits)
+
+            with self.subTest(tags=tags, max_gap=max_gap, max_registers=max_registers, max_bits=max_bits):
+                planned_tags = [id(config) for block in blocks for _, config in block.tags]
+                self.assertCountEqual([id(config) for _, config in tags], planned_tags)
+
+                for block in blocks:
+                    limit = max_bits if block.function_code in (1, 2) else max_registers
+                    if len(block.tags) > 1:
+                        self.assertLessEqual(block.objects_count, limit)
+                    block_response = memory.read(block.function_code, block.address, block.objects_count)
+
+                    for config_section, config in block.tags:
+                        self.assertEqual(block.function_code, config["functionCode"])
+                        self.assertGreaterEqual(config["address"], block.address)
+                        self.assertLessEqual(config["address"] + config["objectsCount"],
+                                             block.address + block.objects_count)
+
+                        expected = memory.read(config["functionCode"], config["address"], config["objectsCount"])
+                        actual = block.slice_response(block_response, config)
+                        self.assertIs(type(expected), type(actual))
+                        if block.function_code in (1, 2):
+                            self.assertEqual(expected.bits, actual.bits)
+                        else:
+                            self.assertEqual(expected.registers, actual.registers)
+                        self.assertEqual(decoded(self.converter, expected, config),
+                                         decoded(self.converter, actual, config))
+
+    def test_blocks_merge_only_within_max_gap(self):
+        tags = [("telemetry", {"tag": "a", "type": "16int", "functionCode": 3, "address": 0, "objectsCount": 2}),
+                ("telemetry", {"tag": "b", "type": "16int", "functionCode": 3, "address": 2, "objectsCount": 1}),
+                ("attributes", {"tag": "c", "type": "32int", "functionCode": 3, "address": 5, "objectsCount": 2}),
+                ("telemetry", {"tag": "d", "type": "bits", "functionCode": 1, "address": 3, "objectsCount": 2}),
+                ("telemetry", {"tag": "e", "type": "bits", "functionCode": 1, "address": 0, "objectsCount": 1}),
+                ("telemetry", {"tag": "f", "type": "16int", "functionCode": 4, "address": 2, "objectsCount": 1})]
+
+        def layout(blocks):
+            return sorted((block.function_code, block.address, block.objects_count,
+                           tuple(config["tag"] for _, config in block.tags)) for block in blocks)
+
+        self.assertEqual([(1, 0, 1, ("e",)), (1, 3, 2, ("d",)), (3, 0, 3, ("a", "b")), (3, 5, 2, ("c",)),
+                          (4, 2, 1, ("f",))], layout(plan_reads(tags)))
+        self.assertEqual([(1, 0, 5, ("e", "d")), (3, 0, 7, ("a", "b", "c")), (4, 2, 1, ("f",))],
+                         layout(plan_reads(tags, max_gap=2)))
+        self.assertEqual([(3, 0, 3, ("a", "b")), (3, 5, 2, ("c",))],
+                         layout([block for block in plan_reads(tags, max_gap=2, max_registers_per_read=6)
+                                 if block.function_code == 3]))
+        self.assertEqual(len(tags), len(plan_reads(tags, max_gap=2, coalesce=False)))
+
+    def test_tags_with_invalid_address_are_read_alone(self):
+        tags = [("telemetry", {"tag": "a", "type": "16int", "functionCode": 3, "address": 0, "objectsCount": 1}),
+                ("telemetry", {"tag": "b", "type": "16int", "functionCode": 3, "address": "1", "objectsCount": 1}),
+                ("telemetry", {"tag": "c", "type": "16int", "functionCode": 3, "address": 1, "objectsCount": 0}),
+                ("telemetry", {"tag": "d", "type": "16int", "functionCode": 5, "address": 2, "objectsCount": 1}),
+                ("telemetry", {"tag": "e", "type": "16int", "functionCode": 3, "address": 1, "objectsCount": 1})]
+        blocks = plan_reads(tags, max_gap=10)
+        self.assertEqual(4, len(blocks))
+        self.assertEqual([["a", "e"]], [[config["tag"] for _, config in block.tags]
+                                        for block in blocks if len(block.tags) > 1])
+
+    def test_short_response_is_not_sliced(self):
+        tags = [("telemetry", {"tag": "a", "type": "16int", "functionCode": 3, "address": 0, "objectsCount": 1}),
+                ("telemetry", {"tag": "b", "type": "32int", "functionCode": 3, "address": 1, "objectsCount": 2})]
+        block, = plan_reads(tags)
+        response = ReadHoldingRegistersResponse([1, 2])
+        self.assertEqual([1], block.slice_response(response, tags[0][1]).registers)
+        self.assertIsNone(block.slice_response(response, tags[1][1]))
+
+    def test_is_failed_response(self):
+        self.assertTrue(is_failed_response(None))
+        self.assertTrue(is_failed_response(ModbusIOException("timeout")))
+        self.assertTrue(is_failed_response(ExceptionResponse(3, 2)))
+        self.assertFalse(is_failed_response(ReadHoldingRegistersResponse([1])))
+        self.assertFalse(is_failed_response(ReadCoilsResponse([True])))
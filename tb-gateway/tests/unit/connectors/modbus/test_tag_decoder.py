@@ -0,0 +1,158 @@
+#     Copyright 2025. ThingsBoard
+#
+#     Licensed under the Apache License, Version 2.0 (the "License");
+#     you may not use this file except in compliance with the License.
+#     You may obtain a copy of the License at
+#
+#         http://www.apache.org/licenses/LICENSE-2.0
+#
+#     Unless required by applicable law or agreed to in writing, software
+#     distributed under the License is distributed on an "AS IS" BASIS,
+#     WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#     See the License for the specific language governing permissions and
+#     limitations under the License.
+
+import logging
+from math import isnan
+from random import Random
+from unittest import TestCase
+
+from pymodbus.bit_read_message import ReadCoilsResponse
+from pymodbus.constants import Endian
+from pymodbus.register_read_message import ReadHoldingRegistersResponse
+
+from thingsboard_gateway.connectors.modbus.bytes_modbus_uplink_converter import BytesModbusUplinkConverter
+from thingsboard_gateway.connectors.modbus.tag_decoder import compile_tag_decoder
+
+TYPES = ['string', 'bytes', 'bit', 'bits', '8int', '8uint', '16int', '16uint', '16float', '32int', '32uint',
+         '32float', '64int', '64uint', '64float', 'int', 'long', 'integer', 'float', 'double', 'uint', 'INT', 'Bits']
+# Registers that give NaN, infinity, signed zero and the extremes of every width
+SPECIAL_REGISTERS = [0, 1, 0x7FFF, 0x8000, 0xFFFF, 0x7C00, 0xFC00, 0x7E00, 0x3C00, 0x7F80, 0x7FC0, 0x4141, 0xC3A9]
+
+
+def decode_result(decode):
+    """Returns the decoded value with its type, or the exception type; NaN is compared as a marker."""
+    try:
+        value = decode()
+    except Exception as e:
+        return "error", type(e).__name__
+    if isinstance(value, float) and isnan(value):
+        return "nan", None
+    return type(value), value
+
+
+def random_tag(random):
+    function_code = random.choice((1, 2, 3, 4, 3, 4))
+    config = {'tag': 'tag', 'type': random.choice(TYPES), 'functionCode': function_code,
+              'objectsCount': random.choice((0, 1, 1, 2, 2, 3, 4, 4, 5, 8, 16, 17, -1))}
+    option = random.random()
+    if option < 0.1:
+        config['bit'] = random.randint(0, 20)
+    if option > 0.8:
+        config['divider'] = random.choice((10, 2.5, 0))
+    elif option > 0.7:
+        config['multiplier'] = random.choice((3, 0.5, 2))
+    if random.random() < 0.2:
+        config['round'] = random.randint(0, 4)
+    if random.random() < 0.2:
+        config['bitTargetType'] = 'int'
+    return config
+
+
+def random_response(random, function_code):
+    if function_code in (1, 2):
+        bits = [random.random() < 0.5 for _ in range(random.choice((0, 1, 3, 5, 8, 8, 13, 16, 16, 24)))]
+        response = ReadCoilsResponse(bits)
+        if random.random() < 0.3:
+            # Unpadded bits, as responses sliced by hand
+            response.bits = response.bits[:len(bits)]
+        return response
+
+    registers_count = random.choice((0, 1, 2, 3, 4, 5, 8, 16))
+    if random.random() < 0.3:
+        return ReadHoldingRegistersResponse([random.choice(SPECIAL_REGISTERS) for _ in range(registers_count)])
+    return ReadHoldingRegistersResponse([random.randint(0, 0xFFFF) for _ in range(registers_count)])
+
+
+class TagDecoderTests(TestCase):
+    def setUp(self):
+        self.log = logging.getLogger("test_tag_decoder")
+        self.log.setLevel(logging.CRITICAL)
+        self.converter = BytesModbusUplinkConverter(None, self.log)
+        self.decode_with_payload_decoder = self.converter._BytesModbusUplinkConverter__decode_with_payload_decoder
+
+    def test_random_tags_match_binary_payload_decoder(self):
+        random = Random(1)
+        compiled = 0
+        for _ in range(30000):
+            config = random_tag(random)
+            byte_order = random.choice((Endian.Big, Endian.Little))
+            word_order = random.choice((Endian.Big, Endian.Little))
+            response = random_response(random, config['functionCode'])
+
+            expected = decode_result(lambda: self.decode_with_payload_decoder(response, config, byte_order,
+                                                                              word_order))
+            tag_decoder = compile_tag_decoder(config, byte_order, word_order, self.log)
+            if tag_decoder is not None:
+                compiled += 1
+                actual = decode_result(lambda: tag_decoder(response))
+            else:
+                actual = decode_result(lambda: self.converter.decode_data(response, config, byte_order, word_order))
+
+            if expected != actual:
+                self.fail(f"config: {config}, byte order: {byte_order}, word order: {word_order}, "
+                          f"response: {getattr(response, 'registers', None) or response.bits}\n"
+                          f"BinaryPayloadDecoder: {expected}\ncompiled decoder: {actual}")
+
+        # Most random configs are valid and must not fall back to BinaryPayloadDecoder
+        self.assertGreater(compiled, 15000)
+
+    def test_values_of_known_registers(self):
+        cases = [
+            ({'type': '16int', 'objectsCount': 1}, [0xFFFF], -1),
+            ({'type': '32uint', 'objectsCount': 2}, [0x0001, 0x0002], 0x00010002),
+            ({'type': '32float', 'objectsCount': 2}, [0x4148, 0x0000], 12.5),
+            ({'type': 'float', 'objectsCount': 2, 'round': 1}, [0x4148, 0x0000], 12.5),
+            ({'type': '16int', 'objectsCount': 1, 'divider': 10}, [123], 12.3),
+            ({'type': '16uint', 'objectsCount': 1, 'multiplier': 2}, [21], 42),
+            ({'type': 'string', 'objectsCount': 2}, [0x4142, 0x4344], 'ABCD'),
+            ({'type': 'bytes', 'objectsCount': 1}, [0x0A0B], '0a0b'),
+            ({'type': 'bits', 'objectsCount': 1}, [0x0080], True),
+            ({'type': 'bits', 'objectsCount': 1, 'bitTargetType': 'int'}, [0x0080], 1),
+        ]
+        for config, registers, expected in cases:
+            config = {'tag': 'tag', 'functionCode': 3, **config}
+            response = ReadHoldingRegistersResponse(registers)
+            with self.subTest(config=config):
+                tag_decoder = compile_tag_decoder(config, Endian.Big, Endian.Big, self.log)
+                self.assertIsNotNone(tag_decoder)
+                self.assertEqual(expected, tag_decoder(response))
+                self.assertEqual(self.decode_with_payload_decoder(response, config, Endian.Big, Endian.Big),
+                                 tag_decoder(response))
+
+    def test_nan_is_decoded_as_nan(self):
+        for config, registers in (({'type': '16float', 'objectsCount': 1}, [0x7E00]),
+                                  ({'type': '32float', 'objectsCount': 2}, [0x7FC0, 0x0000])):
+            config = {'tag': 'tag', 'functionCode': 4, **config}
+            with self.subTest(config=config):
+                tag_decoder = compile_tag_decoder(config, Endian.Big, Endian.Big, self.log)
+                self.assertTrue(isnan(tag_decoder(ReadHoldingRegistersResponse(registers))))
+
+    def test_unsupported_configs_fall_back_to_binary_payload_decoder(self):
+        for config in ({'type': 'weird', 'functionCode': 3, 'objectsCount': 1},
+                       {'type': '16int', 'functionCode': 1, 'objectsCount': 16},
+                       {'type': '16int', 'functionCode': 5, 'objectsCount': 1},
+                       {'type': '16int', 'functionCode': 3, 'objectsCount': '1'},
+                       {'type': '16int', 'functionCode': 3, 'objectsCount': 1, 'divider': '10'},
+                       {'type': 'bits', 'functionCode': 3, 'objectsCount': 1, 'bit': '1'},
+                       {'type': '32float', 'functionCode': 3, 'objectsCount': 2, 'round': '2'}):
+            with self.subTest(config=config):
+                self.assertIsNone(compile_tag_decoder(config, Endian.Big, Endian.Big, self.log))
+
+    def test_decoder_is_compiled_once_per_tag_and_order(self):
+        config = {'tag': 'tag', 'type': '16int', 'functionCode': 3, 'objectsCount': 1}
+        response = ReadHoldingRegistersResponse([0x0102])
+        self.assertEqual(0x0102, self.converter.decode_data(response, config, Endian.Big, Endian.Big))
+        self.assertEqual(0x0201, self.converter.decode_data(response, config, Endian.Little, Endian.Big))
+        self.assertEqual(0x0102, self.converter.decode_data(response, config, Endian.Big, Endian.Big))
+        self.assertEqual(2, len(self.converter._BytesModbusUplinkConverter__tag_decoders))
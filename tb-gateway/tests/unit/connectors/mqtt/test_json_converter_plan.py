@@ -0,0 +1,242 @@
+#     Copyright 2025. ThingsBoard
+#
+#     Licensed under the Apache License, Version 2.0 (the "License");
+#     you may not use this file except in compliance with the License.
+#     You may obtain a copy of the License at
+#
+#         http://www.apache.org/licenses/LICENSE-2.0
+#
+#     Unless required by applicable law or agreed to in writing, software
+#     distributed under the License is distributed on an "AS IS" BASIS,
+#     WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#     See the License for the specific language governing permissions and
+#     limitations under the License.
+
+import logging
+from copy import deepcopy
+from random import Random
+from unittest import TestCase
+from unittest.mock import patch
+
+from thingsboard_gateway.connectors.mqtt.json_converter_plan import ExpressionTemplate
+from thingsboard_gateway.connectors.mqtt.json_mqtt_uplink_converter import JsonMqttUplinkConverter
+from thingsboard_gateway.gateway.entities.attributes import Attributes
+from thingsboard_gateway.gateway.entities.converted_data import ConvertedData
+from thingsboard_gateway.gateway.entities.telemetry_entry import TelemetryEntry
+from thingsboard_gateway.tb_utility.tb_utility import TBUtility
+
+NOW_IN_SECONDS = 1700000000.5
+NOW_TS = int(NOW_IN_SECONDS * 1000)
+TOPIC = "sensors/SN-001/data"
+
+TYPES = ["string", "double", "int", "integer", "long", "float", "bool", "boolean", "raw"]
+EXPRESSIONS = ["${temp}", "${hum}", "${data.count}", "${a b}", "${missing}", "${temp}:${hum}", "prefix_${name}",
+               "const", "${list[0]}", "${flag}", "${data.inner.x}", "${temp} ${temp}", "${}", "${ts}"]
+MESSAGES = [
+    {"temp": 42.1, "hum": "77", "name": "n1", "data": {"count": "12", "inner": {"x": None}}, "a b": "sp",
+     "list": [1, 2], "flag": "true", "ts": 1700000000000},
+    {"temp": "abc", "hum": 0, "name": None, "data": {"count": 3.7}, "flag": 0, "timestamp": 1600000000000},
+    {"temp": 1, "name": "n2"},
+    {},
+    [{"temp": 1, "name": "n1", "ts": 1}, {"temp": 2, "name": "n1", "ts": 1}, {"temp": 3, "name": "n2"}],
+]
+
+
+def convert_with_tb_utility(config, topic, data, logger):
+    """Reference conversion: the TBUtility based algorithm the converter used before the plan was introduced."""
+    converter = JsonMqttUplinkConverter({"converter": config}, logger)
+    if isinstance(data, list):
+        return [_convert_item_with_tb_utility(converter, config, topic, item, logger) for item in data]
+    return _convert_item_with_tb_utility(converter, config, topic, data, logger)
+
+
+def _convert_item_with_tb_utility(converter, config, topic, data, logger):
+    use_eval = config.get("useEval", False)
+    converted_data = ConvertedData(device_name=converter.parse_device_name(topic, data, config),
+                                   device_type=converter.parse_device_type(topic, data, config),
+                                   metadata={"receivedTs": NOW_TS})
+    for datatype in ("attributes", "timeseries"):
+        if config.get("useReceivedTs", False) is True:
+            timestamp = NOW_TS
+        else:
+            timestamp = data.get("ts", data.get("timestamp")) if datatype == "timeseries" else None
+
+        for datatype_config in config.get(datatype, []):
+            if datatype_config == "*":
+                if datatype == "attributes":
+                    converted_data.add_to_attributes(Attributes(data))
+                else:
+                    converted_data.add_to_telemetry(TelemetryEntry(data, timestamp))
+                continue
+
+            values = TBUtility.get_values(datatype_config["value"], data, datatype_config["type"],
+                                          expression_instead_none=False)
+            values_tags = TBUtility.get_values(datatype_config["value"], data, datatype_config["type"], get_tag=True)
+            keys = TBUtility.get_values(datatype_config["key"], data, datatype_config["type"],
+                                        expression_instead_none=False)
+            keys_tags = TBUtility.get_values(datatype_config["key"], data, get_tag=True)
+
+            full_key = datatype_config["key"]
+            for (key, key_tag) in zip(keys, keys_tags):
+                is_valid_key = "${" in datatype_config["key"] and "}" in datatype_config["key"]
+                full_key = full_key.replace('${' + str(key_tag) + '}', str(key)) if is_valid_key else key_tag
+
+            full_value = datatype_config["value"]
+            for (value, value_tag) in zip(values, values_tags):
+                is_valid_value = "${" in datatype_config["value"] and "}" in datatype_config["value"]
+                full_value = full_value.replace('${' + str(value_tag) + '}', str(value)) if is_valid_value else value
+
+            if full_key != 'None' and full_value != 'None':
+                converted_key = TBUtility.convert_key_to_datapoint_key(full_key, None, datatype_config, logger)
+                converted_value = TBUtility.convert_data_type(full_value, datatype_config["type"], use_eval)
+                if datatype == "attributes":
+                    converted_data.add_to_attributes(converted_key, converted_value)
+                else:
+                    # The old loop assigned this to "timestamp" as well, so a "*" listed after a keyed
+                    # timeseries lost the message ts, the plan keeps it for every "*"
+                    key_timestamp = TBUtility.resolve_different_ts_formats(data=data, config=datatype_config,
+                                                                           logger=logger, default_ts=False)
+                    converted_data.add_to_telemetry(TelemetryEntry({converted_key: converted_value}, key_timestamp))
+    return converted_data
+
+
+def normalize(converted):
+    """
+    Returns {(device name, device type): ({ts: {key: value}}, {key: value})}, values are kept with their type.
+    Items of a list are applied in order, so a later item overrides what an earlier one reported for the same device.
+    """
+    result = {}
+    for converted_data in converted if isinstance(converted, list) else [converted]:
+        telemetry, attributes = result.setdefault((converted_data.device_name, converted_data.device_type), ({}, {}))
+        for entry in converted_data.telemetry:
+            telemetry.setdefault(entry.ts, {}).update({getattr(key, "key", key): (value, type(value))
+                                                       for key, value in entry.values.items()})
+        attributes.update({getattr(key, "key", key): (value, type(value))
+                           for key, value in converted_data.attributes.values.items()})
+    return result
+
+
+class JsonConverterPlanTests(TestCase):
+    def setUp(self):
+        self.log = logging.getLogger("test_json_converter_plan")
+        self.log.setLevel(logging.CRITICAL)
+        # TBUtility logs a traceback for every expression it can not resolve
+        logging.disable(logging.CRITICAL)
+        self.addCleanup(logging.disable, logging.NOTSET)
+        for module in ("thingsboard_gateway.connectors.mqtt.json_mqtt_uplink_converter",
+                       "thingsboard_gateway.gateway.entities.telemetry_entry"):
+            time_patcher = patch(module + ".time", return_value=NOW_IN_SECONDS)
+            time_patcher.start()
+            self.addCleanup(time_patcher.stop)
+
+    def assert_same_as_tb_utility(self, config, data):
+        expected = convert_with_tb_utility(config, TOPIC, deepcopy(data), self.log)
+        actual = JsonMqttUplinkConverter({"converter": config}, self.log).convert(TOPIC, deepcopy(data))
+        self.assertEqual(normalize(expected), normalize(actual), msg=f"config: {config}\nmessage: {data}")
+
+    def test_random_configs_match_tb_utility(self):
+        random = Random(1)
+
+        def datapoints():
+            return [random.choice(["*", {"type": random.choice(TYPES),
+                                         "key": random.choice(EXPRESSIONS + ["k1", "k2"]),
+                                         "value": random.choice(EXPRESSIONS)}])
+                    for _ in range(random.randint(0, 4))]
+
+        for _ in range(250):
+            config = {
+                "type": "json",
+                "deviceInfo": {
+                    "deviceNameExpressionSource": random.choice(["message", "constant", "topic"]),
+                    "deviceNameExpression": random.choice(["${name}", "Dev ${name}", "const", "${data.count}",
+                                                           "SN-[0-9]+"]),
+                    "deviceProfileExpressionSource": random.choice(["message", "constant"]),
+                    "deviceProfileExpression": random.choice(["${name}", "default"])
+                },
+                "attributes": datapoints(),
+                "timeseries": datapoints()
+            }
+            if random.random() < 0.2:
+                config["useReceivedTs"] = True
+            with self.subTest(config=config):
+                self.assert_same_as_tb_utility(config, random.choice(MESSAGES))
+
+    def test_timeseries_timestamps_match_tb_utility(self):
+        device_info = {"deviceNameExpressionSource": "message", "deviceNameExpression": "${name}",
+                       "deviceProfileExpressionSource": "constant", "deviceProfileExpression": "default"}
+        keyed = {"type": "double", "key": "temperature", "value": "${temp}"}
+        with_ts_field = {"type": "double", "key": "humidity", "value": "${hum}", "tsField": "${time}"}
+        messages = [
+            {"name": "n1", "temp": 1.5, "hum": 2, "ts": 1600000000000},
+            {"name": "n1", "temp": 1.5, "hum": 2, "timestamp": 1600000000000},
+            {"name": "n1", "temp": 1.5, "hum": 2, "time": "2024-01-02T03:04:05+00:00"},
+            {"name": "n1", "temp": 1.5, "hum": 2, "time": "not a date"},
+            {"name": "n1", "ts": 1600000000000, "values": {"temp": 1.5}},
+        ]
+        configs = [
+            # Keyed timeseries without tsField are reported with the receive time, not the message "ts"
+            {"timeseries": [keyed]},
+            {"timeseries": [keyed, "*"]},
+            {"timeseries": ["*", keyed]},
+            {"timeseries": [with_ts_field, keyed]},
+            {"timeseries": [keyed], "useReceivedTs": True},
+            {"timeseries": ["*", with_ts_field], "useReceivedTs": True},
+        ]
+        for config in configs:
+            config = {"type": "json", "deviceInfo": device_info, "attributes": [], **config}
+            for message in messages:
+                with self.subTest(config=config, message=message):
+                    self.assert_same_as_tb_utility(config, message)
+
+    def test_keyed_timeseries_without_ts_field_use_received_ts(self):
+        config = {"type": "json",
+                  "deviceInfo": {"deviceNameExpressionSource": "constant", "deviceNameExpression": "dev",
+                                 "deviceProfileExpressionSource": "constant", "deviceProfileExpression": "default"},
+                  "timeseries": [{"type": "int", "key": "temperature", "value": "${temp}"}]}
+        converted_data = JsonMqttUplinkConverter({"converter": config}, self.log).convert(
+            TOPIC, {"temp": 7, "ts": 1600000000000})
+        self.assertEqual({NOW_TS: {"temperature": (7, int)}}, normalize(converted_data)[("dev", "default")][0])
+
+    def test_wildcard_after_keyed_timeseries_keeps_message_ts(self):
+        config = {"type": "json",
+                  "deviceInfo": {"deviceNameExpressionSource": "constant", "deviceNameExpression": "dev",
+                                 "deviceProfileExpressionSource": "constant", "deviceProfileExpression": "default"},
+                  "timeseries": [{"type": "int", "key": "temperature", "value": "${temp}"}, "*"]}
+        converted_data = JsonMqttUplinkConverter({"converter": config}, self.log).convert(
+            TOPIC, {"temp": 7, "ts": 1600000000000})
+        self.assertEqual({NOW_TS: {"temperature": (7, int)},
+                          1600000000000: {"temp": (7, int), "ts": (1600000000000, int)}},
+                         normalize(converted_data)[("dev", "default")][0])
+
+    def test_eval_cast_matches_tb_utility(self):
+        config = {"type": "json", "useEval": True,
+                  "deviceInfo": {"deviceNameExpressionSource": "constant", "deviceNameExpression": "dev",
+                                 "deviceProfileExpressionSource": "constant", "deviceProfileExpression": "default"},
+                  "attributes": [{"type": "int", "key": "sum", "value": "${a} + ${b}"},
+                                 {"type": "double", "key": "product", "value": "${a} * ${b}"},
+                                 {"type": "string", "key": "text", "value": "${a}-${b}"}],
+                  "timeseries": [{"type": "float", "key": "ratio", "value": "${a} / ${b}"}]}
+        self.assert_same_as_tb_utility(config, {"a": 6, "b": 4})
+
+
+class ExpressionTemplateTests(TestCase):
+    def setUp(self):
+        # TBUtility logs a traceback for every expression it can not resolve
+        logging.disable(logging.CRITICAL)
+        self.addCleanup(logging.disable, logging.NOTSET)
+
+    def test_render_matches_tb_utility_get_values(self):
+        for expression in EXPRESSIONS + ["k1", "${temp}${hum}", "a ${name} b ${flag} c"]:
+            for message in MESSAGES[:4]:
+                for expression_instead_none in (False, True):
+                    with self.subTest(expression=expression, message=message,
+                                      expression_instead_none=expression_instead_none):
+                        values = TBUtility.get_values(expression, message,
+                                                      expression_instead_none=expression_instead_none)
+                        tags = TBUtility.get_values(expression, message, get_tag=True)
+                        expected = expression
+                        for value, tag in zip(values, tags):
+                            expected = expected.replace('${' + str(tag) + '}', str(value)) \
+                                if "${" in expression and "}" in expression else tag
+                        template = ExpressionTemplate(expression, expression_instead_none=expression_instead_none)
+                        self.assertEqual(expected, template.render(message))